@@ -0,0 +1,135 @@
+# asyncio conversion engine: bounded concurrency with ordered reassembly
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import requests
+
+DEFAULT_MAX_IN_FLIGHT = 4
+
+# Seconds a chunk may keep being deferred before it counts as failed
+DEFAULT_MAX_DEFER = 600
+
+class ChunkConversionError(RuntimeError):
+    """Raised when a chunk fails; index is the position of the failed chunk"""
+
+    def __init__(self, index, error):
+        super().__init__(f"Chunk {index + 1} failed: {error}")
+        self.index = index
+        self.error = error
+
+class TransientConversionError(RuntimeError):
+    """Raised when a chunk failed for a reason that passes (throttling, network errors,
+    an endpoint that is down), so the run is worth resuming later"""
+
+class ChunkDeferred(RuntimeError):
+    """Raised by a converter to put its chunk back in the queue for retry_in seconds"""
+
+    def __init__(self, message, retry_in):
+        super().__init__(message)
+        self.retry_in = retry_in
+
+def with_thread_sessions(convert_fn):
+    """Wrap convert_fn(session, chunk) so every worker thread uses its own requests.Session"""
+    local = threading.local()
+
+    def convert(chunk):
+        session = getattr(local, 'session', None)
+        if session is None:
+            session = local.session = requests.Session()
+        return convert_fn(session, chunk)
+    return convert
+
+class AsyncConversionEngine:
+    """Run a blocking chunk converter on up to max_in_flight chunks at once.
+
+    Results are always delivered in input order. Chunks are pulled lazily from any
+    iterable, so at most a small window of chunks is held in memory. A chunk whose
+    converter raises ChunkDeferred is resubmitted after retry_in seconds without
+    holding a worker in the meantime, for up to max_defer seconds.
+    """
+
+    def __init__(self, convert_fn, max_in_flight=DEFAULT_MAX_IN_FLIGHT, max_defer=DEFAULT_MAX_DEFER):
+        self.convert_fn = convert_fn
+        self.max_in_flight = max(1, int(max_in_flight))
+        self.max_defer = max_defer
+        # Queue a few extra chunks so workers stay busy while the head chunk is slow
+        self.window = self.max_in_flight * 2
+
+    async def iter_results(self, chunks, start=0):
+        """Async iterator yielding (index, converted) in order"""
+        loop = asyncio.get_running_loop()
+        executor = ThreadPoolExecutor(max_workers=self.max_in_flight)
+        pending = {}
+        queued = {}
+        deferred_since = {}
+        source = iter(chunks)
+        next_index = start
+        submitted = start
+        exhausted = False
+        try:
+            while True:
+                while not exhausted and len(pending) < self.window:
+                    try:
+                        chunk = next(source)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    queued[submitted] = chunk
+                    pending[submitted] = loop.run_in_executor(executor, self.convert_fn, chunk)
+                    submitted += 1
+                if next_index not in pending:
+                    break
+                try:
+                    converted = await pending[next_index]
+                except ChunkDeferred as e:
+                    first = deferred_since.setdefault(next_index, time.monotonic())
+                    if time.monotonic() - first + e.retry_in > self.max_defer:
+                        raise ChunkConversionError(next_index, e) from e
+                    await asyncio.sleep(e.retry_in)
+                    # Requeue every chunk that was deferred meanwhile, not just the head
+                    for index in list(pending):
+                        future = pending[index]
+                        if future.done() and isinstance(future.exception(), ChunkDeferred):
+                            pending[index] = loop.run_in_executor(executor, self.convert_fn, queued[index])
+                    continue
+                except Exception as e:
+                    raise ChunkConversionError(next_index, e) from e
+                del pending[next_index], queued[next_index]
+                deferred_since.pop(next_index, None)
+                yield next_index, converted
+                next_index += 1
+        finally:
+            for future in pending.values():
+                future.cancel()
+            # Let conversions already running finish, so their results reach the caches and
+            # chunk stores before the caller closes them (queued chunks were cancelled above)
+            executor.shutdown(wait=True)
+
+    async def run(self, chunks, on_result=None, start=0):
+        """Convert all chunks, calling on_result(index, converted) in order.
+        
+        Without a callback the converted chunks are collected and returned.
+        """
+        results = []
+        stream = self.iter_results(chunks, start=start)
+        try:
+            async for index, converted in stream:
+                if on_result:
+                    on_result(index, converted)
+                else:
+                    results.append(converted)
+        finally:
+            # A callback may raise (e.g. to pause); close the stream so its workers are released
+            await stream.aclose()
+        return results
+
+def run_conversion(chunks, convert_fn, max_in_flight=DEFAULT_MAX_IN_FLIGHT, on_result=None, start=0,
+                   max_defer=DEFAULT_MAX_DEFER):
+    """Synchronous entry point for the CLI and GUI worker threads"""
+    engine = AsyncConversionEngine(convert_fn, max_in_flight, max_defer)
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(engine.run(chunks, on_result=on_result, start=start))
+    finally:
+        loop.close()
@@ -0,0 +1,249 @@
+# Conversion backends behind one interface, and a router that tries the fastest first
+import abc
+import threading
+import time
+import endpoint_client
+from font_mapping import get_font_info
+from offline_converter import OfflineTableError, get_offline_converter, has_offline_table
+from async_engine import ChunkDeferred, with_thread_sessions
+from server_client import convert_via_server
+from table_learner import record_pair
+from metrics import get_metrics
+from chunk_cache import Fallback
+
+# Backends tried by the router, in fallback order
+DEFAULT_ROUTE = ('cache', 'offline', 'server', 'remote')
+
+# Conversion modes offered by the CLI, the GUIs and the daemon (see backend_route)
+BACKEND_MODES = ('remote', 'offline', 'auto')
+
+# Weight of the newest sample in a backend's latency average
+LATENCY_ALPHA = 0.2
+
+# Seconds a backend that failed is skipped for the font key
+ERROR_COOLDOWN = 30.0
+
+class BackendMiss(Exception):
+    """Raised by a backend that cannot convert a chunk, so the next one is tried"""
+
+class ConversionBackend(abc.ABC):
+    """One way of converting a chunk for a font key.
+
+    convert() returns the converted chunk, raises BackendMiss when this backend cannot
+    answer (a cache miss, a syllable the offline table lacks) and any other exception
+    when it failed. typical_latency (seconds) ranks backends that have no samples yet.
+    """
+
+    name = None
+    typical_latency = 1.0
+
+    def available(self, font_key):
+        """Whether this backend can be asked about font_key at all"""
+        return True
+
+    @abc.abstractmethod
+    def convert(self, chunk, font_key):
+        """Convert chunk to font_key"""
+
+class CacheBackend(ConversionBackend):
+    """Endpoint results already in the chunk cache"""
+
+    name = 'cache'
+    typical_latency = 0.001
+
+    def __init__(self, cache):
+        self.cache = cache
+
+    def convert(self, chunk, font_key):
+        api_url = get_font_info(font_key)['url']
+        converted = self.cache.get(api_url, chunk)
+        if converted is None:
+            raise BackendMiss()
+        get_metrics().record_cache(api_url, True)
+        return converted
+
+class TableBackend(ConversionBackend):
+    """In-process offline table.
+
+    With fallback (other backends follow in the route) a chunk with syllables the table
+    lacks is a miss; alone in the route the table is asked for every font and a missing
+    table or syllable is an error.
+    """
+
+    name = 'offline'
+    typical_latency = 0.005
+
+    def __init__(self, fallback=True):
+        self.fallback = fallback
+
+    def available(self, font_key):
+        return not self.fallback or has_offline_table(font_key)
+
+    def convert(self, chunk, font_key):
+        try:
+            return get_offline_converter(font_key).convert(chunk, strict=True)
+        except OfflineTableError:
+            if not self.fallback:
+                raise
+            raise BackendMiss()
+
+class DaemonBackend(ConversionBackend):
+    """A local conversion daemon (conversion_server.py)"""
+
+    name = 'server'
+    typical_latency = 0.05
+
+    def __init__(self, server_url, record_file=None):
+        self.server_url = server_url
+        self.record_file = record_file
+        self._convert = with_thread_sessions(self._send)
+
+    def _send(self, session, job):
+        font_key, chunk = job
+        converted = convert_via_server(session, self.server_url, font_key, chunk)
+        if self.record_file and not isinstance(converted, Fallback):
+            # The daemon answers with the endpoint's conversion
+            record_pair(self.record_file, get_font_info(font_key)['url'], chunk, converted)
+        return converted
+
+    def convert(self, chunk, font_key):
+        return self._convert((font_key, chunk))
+
+class EndpointBackend(ConversionBackend):
+    """The font's public conversion endpoint: slowest, but it converts everything.
+
+    Requests go through endpoint_client with the shared rate limiter, circuit breaker and
+    metrics; the cache is consulted first and filled with clean answers. With a
+    record_file every clean answer is recorded for table_learner.py.
+    """
+
+    name = 'remote'
+    typical_latency = 2.0
+
+    def __init__(self, cache=None, record_file=None):
+        self.cache = cache
+        self.record_file = record_file
+        # One session per worker thread for better connection management
+        self._convert = with_thread_sessions(self._send)
+
+    def _send(self, session, job):
+        chunk, api_url = job
+        converted = endpoint_client.convert_chunk_with_session(session, chunk, api_url, cache=self.cache)
+        if self.record_file and not isinstance(converted, Fallback):
+            record_pair(self.record_file, api_url, chunk, converted)
+        return converted
+
+    def convert(self, chunk, font_key):
+        return self._convert((chunk, get_font_info(font_key)['url']))
+
+class BackendRouter:
+    """Convert each chunk with the fastest backend that can answer for its font key.
+
+    Backends are ranked per font key by the moving average of their recent attempts
+    (misses included), falling back to typical_latency and then to the given order.
+    A miss moves on to the next backend; a failure does too and skips that backend
+    for ERROR_COOLDOWN seconds. When every backend missed or failed, the last
+    deferral (e.g. an open circuit) or failure is raised.
+    """
+
+    def __init__(self, backends):
+        self.backends = list(backends)
+        self._latency = {}
+        self._counts = {}
+        self._cooldown = {}
+        self._lock = threading.Lock()
+
+    def ranked(self, font_key):
+        """Backends to try for font_key, fastest first"""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [b for b in self.backends
+                          if self._cooldown.get((b.name, font_key), 0) <= now]
+            order = {b.name: i for i, b in enumerate(self.backends)}
+            latency = {b.name: self._latency.get((b.name, font_key), b.typical_latency) for b in self.backends}
+        # With every backend cooling down, trying them all beats failing outright
+        candidates = [b for b in (candidates or self.backends) if b.available(font_key)]
+        return sorted(candidates, key=lambda b: (latency[b.name], order[b.name]))
+
+    def convert(self, chunk, font_key):
+        """Convert one chunk, trying backends fastest first"""
+        deferred = failure = None
+        for backend in self.ranked(font_key):
+            started = time.monotonic()
+            try:
+                converted = backend.convert(chunk, font_key)
+            except BackendMiss:
+                self._record(backend, font_key, started, 'misses')
+                continue
+            except ChunkDeferred as e:
+                deferred = e
+                self._record(backend, font_key, started, 'deferred')
+                continue
+            except Exception as e:
+                failure = e
+                self._record(backend, font_key, started, 'errors', cooldown=True)
+                continue
+            self._record(backend, font_key, started, 'hits')
+            return converted
+        if deferred is not None:
+            raise deferred
+        if failure is not None:
+            raise failure
+        raise RuntimeError(f"No conversion backend could convert a chunk for {font_key}")
+
+    def _record(self, backend, font_key, started, outcome, cooldown=False):
+        now = time.monotonic()
+        key = (backend.name, font_key)
+        with self._lock:
+            if outcome in ('hits', 'misses'):
+                previous = self._latency.get(key)
+                sample = now - started
+                self._latency[key] = sample if previous is None else (
+                    previous + LATENCY_ALPHA * (sample - previous))
+            counts = self._counts.setdefault(key, {'hits': 0, 'misses': 0, 'deferred': 0, 'errors': 0})
+            counts[outcome] += 1
+            if cooldown:
+                self._cooldown[key] = now + ERROR_COOLDOWN
+
+    def stats(self):
+        """font key -> backend -> attempt counts and average latency (ms)"""
+        with self._lock:
+            stats = {}
+            for (name, font_key), counts in self._counts.items():
+                latency = self._latency.get((name, font_key))
+                stats.setdefault(font_key, {})[name] = dict(
+                    counts, latency_ms=None if latency is None else round(latency * 1000, 2))
+            return stats
+
+def backend_route(backend, server=None, route=DEFAULT_ROUTE):
+    """Backends a conversion mode goes through.
+
+    'remote' uses the public endpoint, or the daemon at server (which owns the cache and
+    rate limiter shared by its clients); 'offline' only the offline table; 'auto' every
+    backend in route, fastest first.
+    """
+    if backend not in BACKEND_MODES:
+        raise ValueError(f"Unknown backend mode: {backend} (choose from {', '.join(BACKEND_MODES)})")
+    if backend == 'offline':
+        return ('offline',)
+    if backend == 'auto':
+        return tuple(route)
+    return ('server',) if server else ('remote',)
+
+def build_router(route=DEFAULT_ROUTE, cache=None, server=None, record_file=None):
+    """Router over the backends named in route that can be built from the given parts.
+
+    The cache and daemon backends are left out without a cache or server URL. Endpoint
+    (and daemon) answers are recorded to record_file when given, never the offline
+    table's own output.
+    """
+    factories = {
+        'cache': lambda: CacheBackend(cache) if cache is not None else None,
+        'offline': lambda: TableBackend(fallback=len(route) > 1),
+        'server': lambda: DaemonBackend(server, record_file) if server else None,
+        'remote': lambda: EndpointBackend(cache, record_file),
+    }
+    unknown = [name for name in route if name not in factories]
+    if unknown:
+        raise ValueError(f"Unknown backend: {', '.join(unknown)} (choose from {', '.join(factories)})")
+    return BackendRouter(backend for backend in (factories[name]() for name in route) if backend is not None)
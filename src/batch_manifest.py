@@ -0,0 +1,104 @@
+# Append-only manifest of a directory batch run (JSONL, one record per finished file)
+import json
+import os
+import threading
+from datetime import datetime
+from pathlib import Path
+
+MANIFEST_NAME = 'manifest.jsonl'
+
+def manifest_path(output_dir):
+    """Manifest file kept in the batch output directory"""
+    return Path(output_dir) / MANIFEST_NAME
+
+def file_signature(input_file):
+    """Size and modification time used to tell whether an input changed since it was converted"""
+    stat = Path(input_file).stat()
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+class RunManifest:
+    """Per-file status, timings and output paths of a batch run.
+
+    Every finished file appends one record, so recording costs O(1) no matter how many
+    files the run has; the latest record of an input wins on load. A torn last line is
+    trimmed on load. Safe to use from several worker threads.
+    """
+
+    def __init__(self, path, input_dir):
+        self.path = Path(path)
+        # Inputs are recorded relative to the input directory, so the run can be repeated from anywhere
+        self.input_dir = Path(input_dir).resolve()
+        self.records = {}
+        self._lock = threading.Lock()
+        self._file = None
+
+    @classmethod
+    def for_output_dir(cls, output_dir, input_dir):
+        """Manifest for a batch output directory (<output_dir>/manifest.jsonl)"""
+        return cls(manifest_path(output_dir), input_dir)
+
+    def input_key(self, input_file):
+        """Name under which an input file is recorded"""
+        return Path(input_file).resolve().relative_to(self.input_dir).as_posix()
+
+    def load(self):
+        """Read the manifest and return the latest record of every input"""
+        self.records = {}
+        if not self.path.exists():
+            return self.records
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    break
+                good_end += len(line)
+                self.records[record['input']] = record
+        if good_end < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+        return self.records
+
+    def is_done(self, input_file, job):
+        """Check whether input_file was already converted with the same job settings"""
+        record = self.records.get(self.input_key(input_file))
+        if not record or record.get('status') != 'done':
+            return False
+        if any(record.get(key) != value for key, value in job.items()):
+            return False
+        if any(record.get(key) != value for key, value in file_signature(input_file).items()):
+            return False
+        return all(Path(output).exists() for output in record['outputs'].values())
+
+    def record(self, input_file, status, outputs, seconds, **job):
+        """Append the result of one file"""
+        record = dict(job, input=self.input_key(input_file), status=status, outputs=outputs,
+                      seconds=round(seconds, 3), finished=datetime.now().isoformat())
+        if Path(input_file).exists():
+            record.update(file_signature(input_file))
+        with self._lock:
+            if self._file is None:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                self._file = open(self.path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self.records[record['input']] = record
+        return record
+
+    def summary(self):
+        """Count files per status"""
+        counts = {}
+        for record in self.records.values():
+            counts[record['status']] = counts.get(record['status'], 0) + 1
+        return counts
+
+    def close(self):
+        """Close the manifest file"""
+        with self._lock:
+            if self._file:
+                self._file.close()
+                self._file = None
@@ -1,23 +1,16 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import requests
-import time
-import random
 import json
-import threading
 from pathlib import Path
 from datetime import datetime
-from font_mapping import GUJARATI_FONTS, get_font_list, get_font_info
+from font_mapping import GUJARATI_FONTS, get_font_list, get_font_info, registry, resolve_font
+from server_client import DEFAULT_SERVER_URL
+from gui_controller import BACKENDS, MAX_DELAY, MIN_DELAY, OUTAGE_FALLBACKS, ConversionController
 
-# Settings
-CHUNK_SIZE = 200
-MIN_DELAY = 2
-MAX_DELAY = 5
-MAX_RETRIES = 3
-
-class ModernGujaratiConverterGUI:
-    def __init__(self, root):
-        self.root = root
+class ModernGujaratiConverterGUI(ConversionController):
+    def __init__(self, root, server_url=None):
+        super().__init__(root, server_url)
         self.root.title("🔤 Multi-Font Gujarati Converter - Professional")
         self.root.geometry("1100x850")
         self.root.minsize(900, 700)
@@ -35,10 +28,6 @@ class ModernGujaratiConverterGUI:
             'border': '#E0E0E0'        # Light Border
         }
         
-        self.conversion_running = False
-        self.session = None
-        self.current_font = 'shree0768'
-        
         self.setup_styles()
         self.setup_ui()
         
@@ -221,6 +210,10 @@ class ModernGujaratiConverterGUI:
                   command=self.load_from_file,
                   style='Action.TButton').pack(side="left", padx=(0, 10))
         
+        ttk.Button(button_frame, text="📂 Convert File", 
+                  command=self.convert_file_to_file,
+                  style='Action.TButton').pack(side="left", padx=(0, 10))
+        
         ttk.Button(button_frame, text="📝 Sample Text", 
                   command=self.add_sample_text,
                   style='Action.TButton').pack(side="left", padx=(0, 10))
@@ -264,13 +257,36 @@ class ModernGujaratiConverterGUI:
         # Chunk size
         ttk.Label(settings_grid, text="Chunk Size:",
                  style='Heading.TLabel').grid(row=0, column=4, sticky="w", padx=(0, 10))
-        self.chunk_size_var = tk.StringVar(value=str(CHUNK_SIZE))
+        self.chunk_size_var = tk.StringVar(value=str(get_font_info(self.current_font)['max_payload']))
         ttk.Entry(settings_grid, textvariable=self.chunk_size_var, 
                  width=8, font=('Segoe UI', 10)).grid(row=0, column=5)
         
+        # Backend
+        ttk.Label(settings_grid, text="Backend:",
+                 style='Heading.TLabel').grid(row=1, column=0, sticky="w", padx=(0, 10), pady=(10, 0))
+        self.backend_var = tk.StringVar(value='Online API')
+        ttk.Combobox(settings_grid, textvariable=self.backend_var,
+                    values=list(BACKENDS), state='readonly',
+                    width=17, font=('Segoe UI', 10)).grid(row=1, column=1, sticky="w", padx=(0, 30), pady=(10, 0))
+        
+        # Parallel requests
+        ttk.Label(settings_grid, text="Parallel Requests:",
+                 style='Heading.TLabel').grid(row=1, column=2, sticky="w", padx=(0, 10), pady=(10, 0))
+        self.concurrency_var = tk.StringVar(value='1')
+        ttk.Entry(settings_grid, textvariable=self.concurrency_var, 
+                 width=8, font=('Segoe UI', 10)).grid(row=1, column=3, padx=(0, 30), pady=(10, 0))
+        
+        # Endpoint outages
+        ttk.Label(settings_grid, text="If API Down:",
+                 style='Heading.TLabel').grid(row=1, column=4, sticky="w", padx=(0, 10), pady=(10, 0))
+        self.outage_var = tk.StringVar(value='Wait and Retry')
+        ttk.Combobox(settings_grid, textvariable=self.outage_var,
+                    values=list(OUTAGE_FALLBACKS), state='readonly',
+                    width=14, font=('Segoe UI', 10)).grid(row=1, column=5, sticky="w", pady=(10, 0))
+        
         # Info text
         info_label = ttk.Label(settings_frame,
-                              text="💡 Higher delays reduce the chance of IP bans but make conversion slower",
+                              text="💡 Min delay caps the request rate; conversion slows toward max delay when the server pushes back",
                               style='Info.TLabel')
         info_label.pack(anchor="w", pady=(15, 0))
         
@@ -285,6 +301,13 @@ class ModernGujaratiConverterGUI:
                                      style='Convert.TButton')
         self.convert_btn.pack(anchor="center")
         
+        self.pause_btn = ttk.Button(button_frame, 
+                                   text="⏸️ Pause", 
+                                   command=self.pause_conversion,
+                                   style='Action.TButton',
+                                   state='disabled')
+        self.pause_btn.pack(anchor="center", pady=(10, 0))
+        
     def create_progress_section(self, parent):
         """Create progress section"""
         progress_frame = ttk.LabelFrame(parent, text="📊 Progress", padding="20")
@@ -345,29 +368,22 @@ class ModernGujaratiConverterGUI:
                                            style='Info.TLabel')
         self.output_stats_label.pack(side="right")
         
-    def update_char_count(self, event=None):
-        """Update character count"""
-        text = self.input_text.get('1.0', tk.END).strip()
-        count = len(text)
-        self.char_count_label.config(text=f"Characters: {count:,}")
-        
     def on_font_change(self, event=None):
         """Handle font selection change"""
         selected = self.font_combo.get()
         if '(' in selected:
-            font_key = selected.split('(')[1].rstrip(')')
-            self.current_font = font_key
-            
-            # Update font preview
-            font_info = get_font_info(font_key)
-            self.font_preview.config(text=font_info['font_family'])
-            
-            # Update output text font
-            try:
-                first_font = font_info['font_family'].replace('"', '').split(',')[0].strip()
-                self.output_text.config(font=(first_font, 12))
-            except:
-                self.output_text.config(font=('Courier New', 12))
+            font_key = resolve_font(selected.rsplit('(', 1)[1].rstrip(')'))
+            if font_key is not None:
+                self.select_font(font_key)
+                
+    def show_running(self, running):
+        """Switch the convert and pause buttons between a running conversion and idle"""
+        if running:
+            self.convert_btn.config(text="⏳ Converting...", state='disabled')
+            self.pause_btn.config(state='normal')
+        else:
+            self.convert_btn.config(text="🔄 Convert Text", state='normal')
+            self.pause_btn.config(state='disabled')
                 
     def show_font_info(self):
         """Show detailed font information"""
@@ -450,6 +466,11 @@ class ModernGujaratiConverterGUI:
         
     def save_to_file(self):
         """Save output to file"""
+        if self.output_file:
+            messagebox.showinfo("Info", f"The converted file is already saved: {self.output_file}\n"
+                                        "The output box only shows its beginning and end.")
+            return
+            
         if not self.output_text.get('1.0', tk.END).strip():
             messagebox.showwarning("Warning", "No converted text to save!")
             return
@@ -535,147 +556,15 @@ class ModernGujaratiConverterGUI:
                   command=preview_window.destroy,
                   style='Action.TButton').pack(anchor="center")
         
-    def start_conversion(self):
-        """Start the conversion process"""
-        if self.conversion_running:
-            messagebox.showwarning("Warning", "⚠️ Conversion already in progress!")
-            return
-            
-        input_text = self.input_text.get('1.0', tk.END).strip()
-        if not input_text:
-            messagebox.showwarning("Warning", "⚠️ Please enter some text to convert!")
-            return
-            
-        # Start conversion in separate thread
-        self.conversion_running = True
-        self.convert_btn.config(text="⏳ Converting...", state='disabled')
-        self.output_text.delete('1.0', tk.END)
-        
-        thread = threading.Thread(target=self.convert_text, args=(input_text,))
-        thread.daemon = True
-        thread.start()
-        
-    def convert_text(self, text):
-        """Convert text using API"""
-        try:
-            chunks = self.chunk_text(text)
-            total_chunks = len(chunks)
-            font_info = get_font_info(self.current_font)
-            
-            self.root.after(0, lambda: self.progress.config(maximum=total_chunks, value=0))
-            self.root.after(0, lambda: self.status_label.config(
-                text=f"🔄 Converting {total_chunks} chunks using {font_info['name']}..."))
-            
-            results = []
-            
-            with requests.Session() as session:
-                for i, chunk in enumerate(chunks):
-                    try:
-                        # Update UI
-                        self.root.after(0, lambda i=i: self.progress.config(value=i))
-                        self.root.after(0, lambda i=i, total=total_chunks: self.status_label.config(
-                            text=f"🔄 Processing chunk {i+1}/{total} - {((i+1)/total)*100:.1f}% complete"))
-                        
-                        converted = self.convert_chunk_with_session(session, chunk, font_info['url'])
-                        results.append(converted)
-                        
-                        # Add converted text to output progressively
-                        self.root.after(0, lambda conv=converted: 
-                                      self.output_text.insert(tk.END, conv))
-                        
-                        # Update output stats
-                        current_length = len("".join(results))
-                        self.root.after(0, lambda length=current_length: 
-                                      self.output_stats_label.config(text=f"Output: {length:,} characters"))
-                        
-                    except Exception as e:
-                        error_msg = f"❌ Failed to convert chunk {i+1}: {e}"
-                        self.root.after(0, lambda msg=error_msg: messagebox.showerror("Conversion Error", msg))
-                        break
-                        
-            # Final update
-            final_text = "".join(results)
-            self.root.after(0, lambda: self.progress.config(value=total_chunks))
-            self.root.after(0, lambda: self.status_label.config(
-                text=f"✅ Conversion complete! {len(final_text):,} characters converted to {font_info['name']}"))
-            
-        except Exception as e:
-            self.root.after(0, lambda e=e: messagebox.showerror("Error", f"❌ Conversion failed: {e}"))
-            self.root.after(0, lambda: self.status_label.config(text="❌ Conversion failed"))
-        finally:
-            self.conversion_running = False
-            self.root.after(0, lambda: self.convert_btn.config(text="🔄 Convert Text", state='normal'))
-            
-    def chunk_text(self, text):
-        """Split text into chunks"""
-        chunk_size = int(self.chunk_size_var.get())
-        return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-        
-    def convert_chunk_with_session(self, session, chunk, api_url):
-        """Convert a single chunk using the specified API URL"""
-        min_delay = float(self.min_delay_var.get())
-        max_delay = float(self.max_delay_var.get())
-        
-        for retry in range(MAX_RETRIES):
-            try:
-                # Add delay
-                delay = random.uniform(min_delay, max_delay)
-                if retry > 0:
-                    delay = delay * (2 ** retry)
-                time.sleep(delay)
-                
-                # User agents
-                user_agents = [
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
-                    'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-                ]
-                
-                headers = {
-                    'User-Agent': random.choice(user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
-                }
-                
-                resp = session.post(api_url, data={"modify_string": chunk}, headers=headers, timeout=30)
-                
-                if resp.status_code == 200:
-                    # Ensure proper encoding
-                    resp.encoding = 'utf-8'
-                    converted_text = resp.text
-                    
-                    # Validate response
-                    if len(converted_text.strip()) == 0:
-                        return chunk  # Fallback
-                    elif any(ord(char) < 32 and char not in '\n\r\t' for char in converted_text[:50]):
-                        # Try different decoding
-                        try:
-                            converted_text = resp.content.decode('utf-8')
-                        except:
-                            return chunk  # Fallback
-                    
-                    return converted_text
-                    
-                elif resp.status_code in [403, 429]:  # IP ban or rate limit
-                    if retry == MAX_RETRIES - 1:
-                        raise RuntimeError(f"Rate limited/IP banned after {MAX_RETRIES} attempts")
-                    continue
-                else:
-                    if retry == MAX_RETRIES - 1:
-                        raise RuntimeError(f"API error {resp.status_code}")
-                    continue
-                    
-            except requests.exceptions.RequestException as e:
-                if retry == MAX_RETRIES - 1:
-                    raise RuntimeError(f"Network error: {e}")
-                continue
-                
-        return chunk  # Fallback to original
-
 def main():
+    parser = argparse.ArgumentParser(description='Gujarati Unicode to Non-Unicode Converter')
+    parser.add_argument('--server', nargs='?', const=DEFAULT_SERVER_URL, metavar='URL',
+                        help=f'Send remote conversions through a conversion daemon (default URL: {DEFAULT_SERVER_URL})')
+    args = parser.parse_args()
+    registry.load_user_files()
+    
     root = tk.Tk()
-    app = ModernGujaratiConverterGUI(root)
+    app = ModernGujaratiConverterGUI(root, server_url=args.server)
     root.mainloop()
 
 if __name__ == "__main__":
@@ -0,0 +1,189 @@
+# Load-test harness: drive the CLI and GUI conversion engines against mock_upstream.py
+import argparse
+import contextlib
+import io
+import json
+import os
+import tempfile
+import threading
+import time
+import endpoint_client
+import multi_font_converter
+from font_mapping import get_font_info, registry, resolve_font, use_api_base
+from backends import backend_route, build_router
+from script_runs import convert_gujarati_runs, pack_gujarati_chunks
+from async_engine import ChunkConversionError, run_conversion
+from rate_limiter import configure_rate_limits, get_rate_limiter
+from mock_upstream import MockUpstream, add_fault_arguments, profile_from_args, start_mock
+from sample_text import sample_text
+
+# Engines the harness can drive: the CLI file pipeline and the GUIs' text conversion
+ENGINES = ['cli', 'gui']
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = max(1, -(-len(ordered) * pct // 100))
+    return ordered[int(rank) - 1]
+
+class LatencyRecorder:
+    """Wrap a chunk converter and record how long each call takes (including retries and waits)"""
+
+    def __init__(self):
+        self.latencies = []
+        self._lock = threading.Lock()
+
+    def wrap(self, fn):
+        def timed(*args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                elapsed = time.perf_counter() - started
+                with self._lock:
+                    self.latencies.append(elapsed)
+        return timed
+
+@contextlib.contextmanager
+def recording_requests(recorder):
+    """Time every endpoint request (every engine sends them through endpoint_client)"""
+    original = endpoint_client.convert_chunk_with_session
+    endpoint_client.convert_chunk_with_session = recorder.wrap(original)
+    try:
+        yield
+    finally:
+        endpoint_client.convert_chunk_with_session = original
+
+def run_cli_engine(text, font_key, concurrency, chunking, recorder):
+    """Convert text with multi_font_converter.convert_file; returns whether it completed"""
+    with recording_requests(recorder), tempfile.TemporaryDirectory() as workdir:
+        input_file = os.path.join(workdir, 'input.txt')
+        with open(input_file, 'w', encoding='utf-8', newline='') as f:
+            f.write(text)
+        return bool(multi_font_converter.convert_file(
+            input_file, os.path.join(workdir, 'output.txt'), font_key, cache=None,
+            concurrency=concurrency, resume=False, incremental=False, chunking=chunking))
+
+def run_gui_engine(text, font_key, concurrency, recorder):
+    """Convert text the way the GUIs do (gui_controller's chunks and remote router on the async engine)"""
+    router = build_router(backend_route('remote'))
+    size = registry.max_payload(font_key)
+    convert = lambda chunk: convert_gujarati_runs(chunk, lambda run: router.convert(run, font_key), size)
+    with recording_requests(recorder):
+        try:
+            run_conversion(pack_gujarati_chunks(text, size), convert, concurrency)
+        except ChunkConversionError:
+            return False
+    return True
+
+def run_benchmark(engine, text, font_key='shree0768', concurrency=4, chunking='fixed', verbose=False):
+    """Run one engine over text and return its throughput, latency and retry figures"""
+    recorder = LatencyRecorder()
+    limiter = get_rate_limiter(get_font_info(font_key)['url'])
+    throttles = limiter.throttles
+    # The converters log every chunk; keep the report readable unless asked otherwise
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    started = time.perf_counter()
+    with output:
+        if engine == 'cli':
+            completed = run_cli_engine(text, font_key, concurrency, chunking, recorder)
+        else:
+            completed = run_gui_engine(text, font_key, concurrency, recorder)
+    elapsed = time.perf_counter() - started
+    latencies = recorder.latencies
+    return {
+        "engine": engine,
+        "completed": completed,
+        "chunks": len(latencies),
+        "seconds": round(elapsed, 3),
+        "chunks_per_second": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "p50_ms": round(percentile(latencies, 50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 95) * 1000, 1),
+        "p99_ms": round(percentile(latencies, 99) * 1000, 1),
+        "retries": limiter.throttles - throttles,
+    }
+
+def print_report(results, upstream_stats=None):
+    print(f"\n{'engine':<10} {'ok':<4} {'chunks':>7} {'secs':>8} {'chunks/s':>9} "
+          f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'retries':>8}")
+    for r in results:
+        print(f"{r['engine']:<10} {'yes' if r['completed'] else 'no':<4} {r['chunks']:>7} {r['seconds']:>8.2f} "
+              f"{r['chunks_per_second']:>9.2f} {r['p50_ms']:>8.1f} {r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} "
+              f"{r['retries']:>8}")
+    if upstream_stats:
+        print(f"\nMock upstream: {upstream_stats}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the converter engines against a local mock upstream')
+    parser.add_argument('-e', '--engine', default='cli',
+                        help=f"Engines to run, comma separated or 'all' ({', '.join(ENGINES)}; default: cli)")
+    parser.add_argument('-i', '--input', help='Text file to convert (default: synthetic text)')
+    parser.add_argument('--size', type=int, default=20000,
+                        help='Characters of synthetic text when no input is given (default: 20000)')
+    parser.add_argument('-f', '--font', default='shree0768', help='Font key (default: shree0768)')
+    parser.add_argument('-j', '--concurrency', type=int, default=4,
+                        help='Chunks in flight (default: 4)')
+    parser.add_argument('--chunking', choices=['fixed', 'content'], default='fixed',
+                        help='Chunk boundaries for the CLI engine (default: fixed)')
+    parser.add_argument('--min-delay', type=float, default=0.0,
+                        help='Rate limiter minimum delay; 0 means unlimited (default: 0)')
+    parser.add_argument('--max-delay', type=float, default=1.0,
+                        help='Rate limiter maximum back-off delay (default: 1.0)')
+    parser.add_argument('--upstream', metavar='URL',
+                        help='Use an already running mock (e.g. http://127.0.0.1:8766/gujarati) '
+                             'instead of starting one')
+    parser.add_argument('--json', action='store_true', help='Print results as JSON')
+    parser.add_argument('-v', '--verbose', action='store_true', help='Show the converters\' own output')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    registry.load_user_files()
+
+    engines = ENGINES if args.engine == 'all' else [e.strip() for e in args.engine.split(',') if e.strip()]
+    for engine in engines:
+        if engine not in ENGINES:
+            parser.error(f"unknown engine: {engine}")
+    font_key = resolve_font(args.font)
+    if font_key is None:
+        parser.error(f"unknown font key: {args.font}")
+    args.font = font_key
+
+    if args.input:
+        with open(args.input, encoding='utf-8') as f:
+            text = f.read()
+    else:
+        text = sample_text(args.size, args.seed)
+
+    upstream = server = None
+    if args.upstream:
+        base_url = args.upstream
+    else:
+        upstream = MockUpstream(profile_from_args(args), seed=args.seed)
+        server, base_url = start_mock(upstream)
+    use_api_base(base_url)
+    configure_rate_limits(args.min_delay, args.max_delay)
+
+    results = []
+    try:
+        for engine in engines:
+            try:
+                results.append(run_benchmark(engine, text, args.font, args.concurrency, args.chunking,
+                                             args.verbose))
+            except ImportError as e:
+                print(f"Skipping {engine}: {e}")
+    finally:
+        if server is not None:
+            server.shutdown()
+            server.server_close()
+
+    upstream_stats = upstream.stats() if upstream else None
+    if args.json:
+        print(json.dumps({"results": results, "upstream": upstream_stats}, indent=2))
+    else:
+        print(f"🧪 {len(text):,} characters, font {args.font}, {args.concurrency} in flight, "
+              f"upstream {base_url}")
+        print_report(results, upstream_stats)
+
+if __name__ == "__main__":
+    main()
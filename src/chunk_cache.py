@@ -0,0 +1,151 @@
+# Persistent content-addressed cache of converted chunks
+import hashlib
+import sqlite3
+import threading
+import time
+import unicodedata
+from pathlib import Path
+
+DEFAULT_CACHE_PATH = Path.home() / '.gujarati_converter' / 'chunk_cache.db'
+DEFAULT_MAX_ENTRIES = 200000
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Cache hits whose access times are written in one statement
+TOUCH_BATCH = 256
+
+class Fallback(str):
+    """Text passed on in place of a clean conversion: the original text of an empty or
+    undecodable response, or text salvaged from a garbled one. It is written to the
+    output like any result, but never cached or stored.
+    """
+
+def normalize_chunk(text):
+    """Normalize chunk text so equivalent Unicode spellings share a cache entry"""
+    return unicodedata.normalize('NFC', text)
+
+def cache_key(api_url, text):
+    """Content address for a chunk converted by a given endpoint"""
+    data = api_url.encode('utf-8') + b'\0' + normalize_chunk(text).encode('utf-8')
+    return hashlib.sha256(data).hexdigest()
+
+class ChunkCache:
+    """SQLite-backed cache keyed on (endpoint URL, normalized chunk) with LRU eviction"""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_entries=DEFAULT_MAX_ENTRIES,
+                 max_bytes=DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        # key -> last access of hits not yet written to the database
+        self._touched = {}
+        self._conn = sqlite3.connect(str(self.path), check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("""
+            CREATE TABLE IF NOT EXISTS chunks (
+                key TEXT PRIMARY KEY,
+                endpoint TEXT NOT NULL,
+                converted TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_chunks_access ON chunks(last_access)")
+        self._conn.commit()
+        self._entries, self._bytes = self._conn.execute(
+            "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunks").fetchone()
+
+    def get(self, api_url, text):
+        """Return the cached conversion of a chunk, or None"""
+        key = cache_key(api_url, text)
+        with self._lock:
+            row = self._conn.execute("SELECT converted FROM chunks WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._touch(key)
+            return row[0]
+
+    def put(self, api_url, text, converted):
+        """Store a converted chunk, evicting least recently used entries over the limits"""
+        if isinstance(converted, Fallback):
+            return
+        key = cache_key(api_url, text)
+        size = len(converted.encode('utf-8'))
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            old = self._conn.execute("SELECT size FROM chunks WHERE key = ?", (key,)).fetchone()
+            if old:
+                self._entries -= 1
+                self._bytes -= old[0]
+            self._conn.execute(
+                "INSERT OR REPLACE INTO chunks (key, endpoint, converted, size, last_access) "
+                "VALUES (?, ?, ?, ?, ?)", (key, api_url, converted, size, self._now()))
+            self._entries += 1
+            self._bytes += size
+            self._touched.pop(key, None)
+            if self._entries > self.max_entries or self._bytes > self.max_bytes:
+                # Eviction order must see the latest hits
+                self._flush_touches()
+                self._evict()
+            self._conn.commit()
+
+    def _now(self):
+        """Access time recorded for a lookup or store"""
+        return time.time()
+
+    def _touch(self, key):
+        self._touched[key] = self._now()
+        if len(self._touched) >= TOUCH_BATCH:
+            self._flush_touches()
+            self._conn.commit()
+
+    def _flush_touches(self):
+        if self._touched:
+            self._conn.executemany("UPDATE chunks SET last_access = ? WHERE key = ?",
+                                   [(accessed, key) for key, accessed in self._touched.items()])
+            self._touched.clear()
+
+    def _evict(self):
+        while self._entries > self.max_entries or self._bytes > self.max_bytes:
+            rows = self._conn.execute(
+                "SELECT key, size FROM chunks ORDER BY last_access LIMIT 100").fetchall()
+            if not rows:
+                break
+            for key, size in rows:
+                self._conn.execute("DELETE FROM chunks WHERE key = ?", (key,))
+                self._entries -= 1
+                self._bytes -= size
+                if self._entries <= self.max_entries and self._bytes <= self.max_bytes:
+                    break
+
+    def stats(self):
+        """Get hit/miss counters and current size"""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": self._entries,
+            "bytes": self._bytes
+        }
+
+    def clear(self):
+        """Remove all cached entries"""
+        with self._lock:
+            self._conn.execute("DELETE FROM chunks")
+            self._conn.commit()
+            self._touched.clear()
+            self._entries = 0
+            self._bytes = 0
+
+    def close(self):
+        """Close the database connection"""
+        with self._lock:
+            self._flush_touches()
+            self._conn.commit()
+            self._conn.close()
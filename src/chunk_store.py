@@ -0,0 +1,58 @@
+# Per-document store of converted chunks, addressed by content fingerprint
+import hashlib
+import time
+from pathlib import Path
+from chunk_cache import ChunkCache, cache_key
+
+def store_path(output_file):
+    """Chunk store that belongs to one output file"""
+    return Path(f"{output_file}.chunks.db")
+
+def chunk_fingerprint(text):
+    """Fingerprint of the exact chunk text"""
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+def extend_digest(digest, fingerprint):
+    """Chain a chunk fingerprint onto the digest of all chunks before it"""
+    return hashlib.sha256(f"{digest}{fingerprint}".encode('ascii')).hexdigest()
+
+class ChunkStore(ChunkCache):
+    """Converted chunks of one document, kept for incremental re-conversion.
+
+    Unlike the shared cache nothing is evicted while a run is in progress: every chunk
+    of the latest revision stays available, so a re-run after an edit only sends the
+    chunks whose content changed. Usage is tracked in the database: every chunk a run
+    reads, stores or skips on resume gets an access time no earlier than the run's
+    start, and prune() drops everything older.
+    """
+
+    def __init__(self, path):
+        super().__init__(path, max_entries=float('inf'), max_bytes=float('inf'))
+        self.run_started = time.time()
+
+    @classmethod
+    def for_output(cls, output_file):
+        """Chunk store for an output file (<output>.chunks.db)"""
+        return cls(store_path(output_file))
+
+    def _now(self):
+        # A clock set back during the run must not make its chunks look stale
+        return max(time.time(), self.run_started)
+
+    def touch(self, api_url, text):
+        """Mark a chunk as used by this run without reading it (e.g. one a resume skips)"""
+        with self._lock:
+            self._touch(cache_key(api_url, text))
+
+    def prune(self):
+        """Remove chunks not used by this run; returns the number removed"""
+        with self._lock:
+            self._flush_touches()
+            removed, size = self._conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM chunks WHERE last_access < ?",
+                (self.run_started,)).fetchone()
+            self._conn.execute("DELETE FROM chunks WHERE last_access < ?", (self.run_started,))
+            self._conn.commit()
+            self._entries -= removed
+            self._bytes -= size
+        return removed
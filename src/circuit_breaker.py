@@ -0,0 +1,152 @@
+# Per-endpoint circuit breakers shared by all workers, so a down endpoint fails fast
+import threading
+import time
+from async_engine import ChunkDeferred, TransientConversionError
+from font_mapping import endpoint_name
+from offline_converter import get_offline_converter, has_offline_table
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half-open'
+
+# Consecutive failed requests (5xx, network errors) that open a circuit, and how long it stays open
+DEFAULT_FAILURE_THRESHOLD = 3
+DEFAULT_RESET_TIMEOUT = 30.0
+MAX_RESET_TIMEOUT = 300.0
+
+# Callers turned away while the half-open probe is in flight check back this soon
+PROBE_WAIT = 1.0
+
+# What happens to a chunk while its endpoint's circuit is open
+OUTAGE_FALLBACKS = ('defer', 'offline', 'cache')
+
+class CircuitOpenError(ChunkDeferred):
+    """Raised instead of sending a request while an endpoint's circuit is open"""
+
+    def __init__(self, endpoint, retry_in):
+        super().__init__(f"{endpoint} is unavailable (circuit open, next try in {retry_in:.0f}s)", retry_in)
+        self.endpoint = endpoint
+
+class CircuitBreaker:
+    """Closed/open/half-open circuit breaker of one endpoint.
+
+    failure_threshold consecutive failures open the circuit: every request is refused at
+    once for reset_timeout seconds. Then one probe request is let through (half-open);
+    success closes the circuit, failure opens it again for twice as long, up to
+    MAX_RESET_TIMEOUT. Any HTTP answer below 500, throttling included, counts as success:
+    the endpoint is up and the rate limiter deals with the rest.
+    """
+
+    def __init__(self, name, failure_threshold=DEFAULT_FAILURE_THRESHOLD, reset_timeout=DEFAULT_RESET_TIMEOUT):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.timeout = reset_timeout
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self.probing = False
+        self.opens = 0
+        self.rejected = 0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """Return if a request may be sent now, otherwise raise CircuitOpenError"""
+        with self._lock:
+            if self.state == CLOSED:
+                return
+            if self.state == OPEN:
+                wait = self.opened_at + self.timeout - time.monotonic()
+                if wait > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(self.name, wait)
+                self.state = HALF_OPEN
+                self.probing = False
+            if not self.probing:
+                self.probing = True
+                return
+            self.rejected += 1
+            raise CircuitOpenError(self.name, PROBE_WAIT)
+
+    def on_success(self):
+        """The endpoint answered: close the circuit"""
+        with self._lock:
+            self.state = CLOSED
+            self.failures = 0
+            self.timeout = self.reset_timeout
+            self.probing = False
+
+    def on_failure(self):
+        """A request failed with a 5xx or a network error"""
+        with self._lock:
+            self.failures += 1
+            if self.state == HALF_OPEN:
+                self.timeout = min(MAX_RESET_TIMEOUT, self.timeout * 2)
+                self._open()
+            elif self.state == CLOSED and self.failures >= self.failure_threshold:
+                self._open()
+
+    def _open(self):
+        self.state = OPEN
+        self.opened_at = time.monotonic()
+        self.probing = False
+        self.opens += 1
+
+    def stats(self):
+        """State and counters for reports"""
+        with self._lock:
+            return {"state": self.state, "failures": self.failures, "opens": self.opens,
+                    "rejected": self.rejected}
+
+_breakers = {}
+_settings = (DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT)
+_registry_lock = threading.Lock()
+
+def configure_circuit_breakers(failure_threshold, reset_timeout):
+    """Set the failure threshold and open time of every endpoint's breaker"""
+    global _settings
+    with _registry_lock:
+        _settings = (max(1, int(failure_threshold)), float(reset_timeout))
+        for breaker in _breakers.values():
+            breaker.failure_threshold, breaker.reset_timeout = _settings
+            breaker.timeout = breaker.reset_timeout
+
+def circuit_breaker_settings():
+    """The (failure_threshold, reset_timeout) every breaker uses"""
+    with _registry_lock:
+        return _settings
+
+def get_circuit_breaker(api_url):
+    """Get the breaker shared by every worker talking to an endpoint"""
+    with _registry_lock:
+        if api_url not in _breakers:
+            _breakers[api_url] = CircuitBreaker(endpoint_name(api_url), *_settings)
+        return _breakers[api_url]
+
+def circuit_stats():
+    """Endpoint -> breaker stats, for breakers that have ever opened"""
+    with _registry_lock:
+        breakers = list(_breakers.values())
+    stats = {breaker.name: breaker.stats() for breaker in breakers}
+    return {name: endpoint for name, endpoint in stats.items() if endpoint['opens']}
+
+def with_outage_fallback(convert_fn, fallback='defer', font_key=None):
+    """Wrap a chunk converter with what to do while its endpoint's circuit is open.
+
+    'defer' lets CircuitOpenError through, so the engine requeues the chunk until the
+    circuit half-opens. 'offline' converts the chunk with the font's offline table
+    (deferring when the font has none). 'cache' only uses what the cache and chunk
+    stores already hold: any other chunk fails at once.
+    """
+    if fallback == 'defer' or (fallback == 'offline' and not has_offline_table(font_key)):
+        return convert_fn
+    offline = get_offline_converter(font_key) if fallback == 'offline' else None
+
+    def convert(chunk):
+        try:
+            return convert_fn(chunk)
+        except CircuitOpenError as e:
+            if offline is None:
+                raise TransientConversionError(str(e)) from e
+            return offline.convert(chunk)
+    return convert
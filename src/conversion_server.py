@@ -0,0 +1,222 @@
+# Local conversion daemon: one shared pipeline (cache, rate limiter, offline tables) behind HTTP
+import argparse
+import json
+import math
+import threading
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+from font_mapping import GUJARATI_FONTS, get_font_info, registry, resolve_font
+from offline_converter import has_offline_table
+from segmenter import pack_chunks
+from backends import BACKEND_MODES, backend_route, build_router
+from rate_limiter import configure_rate_limits
+from circuit_breaker import (DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT, CircuitOpenError, circuit_stats,
+                             configure_circuit_breakers)
+from chunk_cache import ChunkCache, Fallback, cache_key, DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
+from server_client import DEFAULT_SERVER_URL
+from metrics import get_metrics
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = int(DEFAULT_SERVER_URL.rsplit(':', 1)[1])
+
+class RequestCoalescer:
+    """Merge identical in-flight calls: callers with the same key share one result"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._in_flight = {}
+        self.merged = 0
+
+    def run(self, key, fn):
+        """Return fn(), or the result of an identical call that is already running"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            leader = future is None
+            if leader:
+                future = self._in_flight[key] = Future()
+            else:
+                self.merged += 1
+        if not leader:
+            return future.result()
+        try:
+            result = fn()
+        except Exception as e:
+            future.set_exception(e)
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+class ConversionService:
+    """The conversion pipeline shared by every client of the daemon"""
+
+    def __init__(self, cache=None):
+        self.cache = cache
+        self.coalescer = RequestCoalescer()
+        # One router per backend mode; 'auto' tries the cache and offline tables before the
+        # endpoint, fastest first
+        self.routers = {backend: build_router(backend_route(backend), cache) for backend in BACKEND_MODES}
+        self.requests = 0
+        self._lock = threading.Lock()
+
+    def convert(self, text, font_key, backend='remote'):
+        """Convert text to font_key, splitting it into endpoint-sized chunks (a Fallback if any chunk was one)"""
+        with self._lock:
+            self.requests += 1
+        router = self.routers[backend]
+        if backend == 'offline':
+            # Offline tables have no payload limit
+            return router.convert(text, font_key)
+        api_url = get_font_info(font_key)['url']
+        # Only calls through the same backend mode are merged: 'remote' must not get an 'auto' answer
+        parts = [self.coalescer.run((backend, cache_key(api_url, chunk)),
+                                    lambda chunk=chunk: router.convert(chunk, font_key))
+                 for chunk in pack_chunks(text, registry.max_payload(font_key))]
+        converted = ''.join(parts)
+        # Clients must not cache or store text that holds a fallback
+        return Fallback(converted) if any(isinstance(part, Fallback) for part in parts) else converted
+
+    def fonts(self):
+        """Font key -> font info, including whether an offline table is available"""
+        return {font_key: registry.capabilities(font_key) for font_key in GUJARATI_FONTS}
+
+    def stats(self):
+        """Request, coalescing, circuit breaker, backend and cache counters"""
+        stats = {"requests": self.requests, "coalesced": self.coalescer.merged,
+                 "endpoints": get_metrics().summary(), "circuits": circuit_stats(),
+                 "backends": self.routers['auto'].stats()}
+        if self.cache is not None:
+            stats["cache"] = self.cache.stats()
+        return stats
+
+class ConversionRequestHandler(BaseHTTPRequestHandler):
+    """HTTP front end: GET /fonts, GET /stats, GET /metrics and POST /convert"""
+
+    service = None
+
+    def do_GET(self):
+        path = urlparse(self.path).path
+        if path == '/fonts':
+            self.send_json(200, self.service.fonts())
+        elif path == '/stats':
+            self.send_json(200, self.service.stats())
+        elif path == '/metrics':
+            body = get_metrics().to_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+            self.send_header('Content-Length', str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+        else:
+            self.send_json(404, {"error": f"Unknown path: {path}"})
+
+    def do_POST(self):
+        path = urlparse(self.path).path
+        if path != '/convert':
+            self.send_json(404, {"error": f"Unknown path: {path}"})
+            return
+        try:
+            length = int(self.headers.get('Content-Length', 0))
+            request = json.loads(self.rfile.read(length).decode('utf-8'))
+            text = request['text']
+            font_label = request.get('font', 'shree0768')
+            backend = request.get('backend', 'remote')
+        except (ValueError, KeyError, TypeError) as e:
+            self.send_json(400, {"error": f"Bad request: {e}"})
+            return
+        # Display names and aliases are accepted as well as keys
+        font_key = resolve_font(str(font_label))
+        if font_key is None:
+            self.send_json(400, {"error": f"Unknown font key: {font_label}"})
+            return
+        if backend not in BACKEND_MODES:
+            self.send_json(400, {"error": f"Unknown backend: {backend}"})
+            return
+        if backend == 'offline' and not has_offline_table(font_key):
+            self.send_json(400, {"error": f"No offline table available for font: {font_key}"})
+            return
+        try:
+            converted = self.service.convert(text, font_key, backend)
+        except CircuitOpenError as e:
+            # Clients defer the chunk instead of failing it
+            self.send_json(503, {"error": str(e), "retry_in": e.retry_in},
+                           headers={'Retry-After': str(math.ceil(e.retry_in))})
+            return
+        except Exception as e:
+            self.send_json(502, {"error": str(e)})
+            return
+        self.send_json(200, {"converted": converted, "font": font_key,
+                             "fallback": isinstance(converted, Fallback)})
+
+    def send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        self.send_response(status)
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        print(f"  {self.address_string()} {format % args}")
+
+def create_server(service, host=DEFAULT_HOST, port=DEFAULT_PORT):
+    """HTTP server for service; each request is handled on its own thread"""
+    handler = type('BoundConversionRequestHandler', (ConversionRequestHandler,), {'service': service})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Gujarati conversion daemon')
+    parser.add_argument('--host', default=DEFAULT_HOST,
+                        help=f'Address to listen on, 0.0.0.0 for the LAN (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT,
+                        help=f'Port to listen on (default: {DEFAULT_PORT})')
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH),
+                        help=f'Chunk cache database (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the chunk cache')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='Maximum chunk cache size in MB (default: %(default)s)')
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help='Maximum number of cached chunks (default: %(default)s)')
+    parser.add_argument('--min-delay', type=float, default=2.0,
+                        help='Minimum delay between upstream requests, i.e. the maximum request rate (default: 2.0)')
+    parser.add_argument('--max-delay', type=float, default=5.0,
+                        help='Maximum delay the rate limiter backs off to when throttled (default: 5.0)')
+    parser.add_argument('--circuit-threshold', type=int, default=DEFAULT_FAILURE_THRESHOLD,
+                        help=f'Consecutive failed requests that mark an endpoint as down '
+                             f'(default: {DEFAULT_FAILURE_THRESHOLD})')
+    parser.add_argument('--circuit-cooldown', type=float, default=DEFAULT_RESET_TIMEOUT,
+                        help=f'Seconds before a down endpoint is tried again (default: {DEFAULT_RESET_TIMEOUT:g})')
+    args = parser.parse_args()
+    registry.load_user_files()
+
+    configure_rate_limits(args.min_delay, args.max_delay)
+    configure_circuit_breakers(args.circuit_threshold, args.circuit_cooldown)
+    cache = None
+    if not args.no_cache:
+        cache = ChunkCache(args.cache, max_entries=args.cache_max_entries,
+                           max_bytes=int(args.cache_max_mb * 1024 * 1024))
+
+    server = create_server(ConversionService(cache), args.host, args.port)
+    print(f"🌐 Conversion server listening on http://{args.host}:{args.port}")
+    print("   POST /convert {\"text\": ..., \"font\": ..., \"backend\": \"remote\"|\"offline\"}")
+    print("   GET  /fonts, GET /stats, GET /metrics (Prometheus)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\nShutting down...")
+    finally:
+        server.server_close()
+        if cache is not None:
+            cache.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,174 @@
+# Client for the public conversion endpoints: one form POST per chunk
+import random
+import time
+import requests
+from rate_limiter import get_rate_limiter, parse_retry_after
+from circuit_breaker import get_circuit_breaker
+from metrics import get_metrics
+from chunk_cache import Fallback
+from async_engine import TransientConversionError
+
+MAX_RETRIES = 3  # Maximum retry attempts per chunk
+
+# Output detail: 0 quiet, 1 normal, 2 per-request detail (--quiet / --verbose)
+VERBOSITY = 1
+
+def set_verbosity(verbosity):
+    """Set the output detail of log()"""
+    global VERBOSITY
+    VERBOSITY = verbosity
+
+def get_verbosity():
+    """The output detail of log()"""
+    return VERBOSITY
+
+def log(message, level=1):
+    """Print message if the verbosity setting allows it (0 quiet, 1 normal, 2 per-request detail)"""
+    if VERBOSITY >= level:
+        print(message)
+
+def is_clean_response(resp):
+    """Whether a response body is valid UTF-8 without control characters, i.e. safe to cache"""
+    try:
+        text = resp.content.decode('utf-8')
+    except UnicodeDecodeError:
+        return False
+    return not any(ord(char) < 32 and char not in '\n\r\t' for char in text)
+
+def convert_chunk_with_session(session, chunk, api_url, attempt=1, cache=None):
+    """Send one chunk to the API using session with retry logic (cache is consulted first).
+    
+    When the endpoint answers without a usable conversion the result is a Fallback.
+    """
+    metrics = get_metrics()
+    if cache is not None:
+        cached = cache.get(api_url, chunk)
+        metrics.record_cache(api_url, cached is not None)
+        if cached is not None:
+            log(f"  💾 Cache hit", 2)
+            return cached
+    
+    # Requests to the host are spaced by a shared adaptive limiter instead of fixed sleeps
+    limiter = get_rate_limiter(api_url)
+    # While the endpoint is down every worker fails fast instead of sleeping through retries
+    breaker = get_circuit_breaker(api_url)
+    
+    for retry in range(MAX_RETRIES):
+        try:
+            breaker.allow()
+            delay = limiter.acquire()
+            metrics.record_sleep(api_url, delay)
+            if retry > 0:
+                metrics.record_retry(api_url)
+                log(f"  Retry {retry + 1}/{MAX_RETRIES} after {delay:.1f}s delay...")
+            
+            # Rotate user agents to appear as different browsers
+            user_agents = [
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
+                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
+                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/91.0.864.59'
+            ]
+            
+            headers = {
+                'User-Agent': random.choice(user_agents),
+                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
+                'Accept-Language': 'en-US,en;q=0.5',
+                'Accept-Encoding': 'gzip, deflate, br',
+                'Connection': 'keep-alive',
+                'Upgrade-Insecure-Requests': '1',
+                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
+            }
+            
+            # Ensure proper encoding for the request
+            data = {"modify_string": chunk}
+            
+            started = time.monotonic()
+            try:
+                resp = session.post(api_url, data=data, headers=headers, timeout=30)
+            except requests.exceptions.RequestException:
+                metrics.record_request(api_url, 'error', time.monotonic() - started,
+                                       bytes_sent=len(chunk.encode('utf-8')))
+                breaker.on_failure()
+                raise
+            metrics.record_request(api_url, resp.status_code, time.monotonic() - started,
+                                   bytes_sent=len(chunk.encode('utf-8')), bytes_received=len(resp.content))
+            if resp.status_code >= 500:
+                breaker.on_failure()
+            else:
+                breaker.on_success()
+            
+            if resp.status_code == 200:
+                limiter.on_success()
+                
+                # Debug: Check response content type and encoding
+                log(f"  Response encoding: {resp.encoding}", 2)
+                log(f"  Content type: {resp.headers.get('content-type', 'unknown')}", 2)
+                
+                # Try to decode properly
+                try:
+                    # First try with response encoding
+                    if resp.encoding:
+                        resp.encoding = 'utf-8'  # Force UTF-8 encoding
+                    
+                    converted_text = resp.text
+                    
+                    # Validate that we got actual text (not binary)
+                    if len(converted_text.strip()) == 0:
+                        log(f"  ⚠️ Empty response received")
+                        converted_text = Fallback(chunk)
+                    elif any(ord(char) < 32 and char not in '\n\r\t' for char in converted_text[:100]):
+                        log(f"  ⚠️ Response contains binary/control characters")
+                        # Try different encoding approaches
+                        try:
+                            converted_text = resp.content.decode('utf-8')
+                        except UnicodeDecodeError:
+                            try:
+                                converted_text = resp.content.decode('latin1')
+                            except UnicodeDecodeError:
+                                log(f"  ❌ Could not decode response, using original text")
+                                converted_text = Fallback(chunk)
+                    
+                    log(f"  ✅ Converted text sample: {converted_text[:50]}...", 2)
+                    if not isinstance(converted_text, Fallback) and not is_clean_response(resp):
+                        # Text salvaged from a garbled body must not outlive this run
+                        log(f"  ⚠️ Response did not decode cleanly, not caching it")
+                        converted_text = Fallback(converted_text)
+                    if cache is not None:
+                        cache.put(api_url, chunk, converted_text)
+                    return converted_text
+                    
+                except Exception as decode_error:
+                    log(f"  ❌ Decoding error: {decode_error}")
+                    return Fallback(chunk)
+                    
+            elif resp.status_code == 429:  # Too Many Requests
+                log(f"  Rate limited (429), attempt {retry + 1}/{MAX_RETRIES}")
+                limiter.on_throttle(parse_retry_after(resp.headers.get('Retry-After')))
+                if retry == MAX_RETRIES - 1:
+                    raise TransientConversionError(f"Rate limited after {MAX_RETRIES} attempts")
+                continue
+            elif resp.status_code == 403:  # Forbidden (IP ban)
+                log(f"  IP banned (403), attempt {retry + 1}/{MAX_RETRIES}")
+                limiter.on_throttle(parse_retry_after(resp.headers.get('Retry-After')))
+                if retry == MAX_RETRIES - 1:
+                    raise TransientConversionError(f"IP banned after {MAX_RETRIES} attempts. Try using VPN or wait.")
+                continue
+            else:
+                log(f"  API error {resp.status_code}: {resp.text}")
+                if resp.status_code >= 500:
+                    limiter.on_throttle(parse_retry_after(resp.headers.get('Retry-After')))
+                if retry == MAX_RETRIES - 1:
+                    # Server errors pass; anything else (e.g. a removed endpoint) needs a fix first
+                    error_type = TransientConversionError if resp.status_code >= 500 else RuntimeError
+                    raise error_type(f"API error {resp.status_code}: {resp.text}")
+                continue
+                
+        except requests.exceptions.RequestException as e:
+            log(f"  Network error on attempt {retry + 1}/{MAX_RETRIES}: {e}")
+            limiter.on_throttle()
+            if retry == MAX_RETRIES - 1:
+                raise TransientConversionError(f"Network error after {MAX_RETRIES} attempts: {e}")
+            continue
+    
+    raise TransientConversionError(f"Failed to convert chunk after {MAX_RETRIES} attempts")
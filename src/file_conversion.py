@@ -0,0 +1,84 @@
+# File-to-file conversion for the GUIs: stream to disk and show only a preview of the output
+from pathlib import Path
+from async_engine import ChunkConversionError, ChunkDeferred, TransientConversionError
+from multi_font_converter import convert_file
+from gui_checkpoint import ConversionStopped
+
+# Characters of output shown from the start and from the end of a converted file
+PREVIEW_CHARS = 2000
+
+MB = 1024 * 1024
+
+class OutputPreview:
+    """Head and tail of a converted stream; everything in between is only counted"""
+
+    def __init__(self, limit=PREVIEW_CHARS):
+        self.limit = limit
+        self.total = 0
+        self.head_length = 0
+        self.tail = ''
+
+    def add(self, text):
+        """Record the next piece of output; returns the part of it that belongs to the head"""
+        self.total += len(text)
+        self.tail = (self.tail + text)[-self.limit:]
+        head = text[:max(0, self.limit - self.head_length)]
+        self.head_length += len(head)
+        return head
+
+    def ending(self):
+        """Text to show after the head once the stream is complete"""
+        remaining = self.total - self.head_length
+        if remaining <= 0:
+            return ''
+        tail = self.tail[-remaining:]
+        hidden = remaining - len(tail)
+        if hidden:
+            return f"\n\n… [{hidden:,} characters not shown] …\n\n{tail}"
+        return tail
+
+def convert_file_with_preview(input_file, output_file, font_key, updates, stop_event=None, **options):
+    """Convert input_file to output_file on the CLI streaming path, reporting to a UIUpdateChannel.
+
+    The converted text is written to disk chunk by chunk and never held in a widget: only
+    the first and last PREVIEW_CHARS characters are appended to updates, together with
+    progress (input bytes read) and running stats. Setting stop_event pauses the run after
+    the current chunk; paused and interrupted runs resume on the next call with the same
+    files. Returns (error, preview): error is None once the file is converted, otherwise
+    the exception that stopped the run (ConversionStopped for a pause, see can_resume).
+    """
+    total_bytes = max(1, Path(input_file).stat().st_size)
+    preview = OutputPreview()
+    chunks = 0
+
+    def on_chunk(font_key, converted, input_bytes):
+        nonlocal chunks
+        chunks += 1
+        head = preview.add(converted)
+        if head:
+            updates.append(head)
+        # Compressed input reads more bytes than the file holds, so clamp the bar
+        updates.progress(min(input_bytes, total_bytes), total_bytes)
+        updates.status(f"📂 {input_bytes / MB:,.1f} MB read · {chunks:,} chunks · "
+                       f"{preview.total:,} characters written")
+        if stop_event is not None and stop_event.is_set():
+            # Everything written so far is journalled; the run ends here
+            raise ConversionStopped()
+
+    # Never ask on the console: the journal only resumes a run of the same input and settings
+    try:
+        convert_file(input_file, output_file, font_key, resume=True, on_chunk=on_chunk,
+                     raise_errors=True, **options)
+    except Exception as e:
+        return e, preview
+    ending = preview.ending()
+    if ending:
+        updates.append(ending)
+    return None, preview
+
+def can_resume(error):
+    """Whether a run stopped by error is worth resuming: a pause, or a chunk that failed
+    for a reason that passes (throttling, network errors, an endpoint that is down)"""
+    if isinstance(error, ChunkConversionError):
+        error = error.error
+    return isinstance(error, (ConversionStopped, ChunkDeferred, TransientConversionError))
@@ -1,4 +1,28 @@
-# Font mapping extracted from the JavaScript API file
+# Font mapping extracted from the JavaScript API file, indexed by a loadable font registry
+import json
+import os
+from pathlib import Path
+
+try:
+    import tomllib
+except ImportError:  # Python < 3.11: JSON font files only
+    tomllib = None
+
+# Offline mapping tables, one JSON file per API endpoint
+OFFLINE_TABLE_DIR = Path(__file__).parent / 'offline_tables'
+
+# Extra font definitions loaded at startup (JSON or TOML); GUJARATI_FONTS_FILE overrides the path
+USER_FONTS_FILES = [Path.home() / '.gujarati_converter' / 'fonts.json',
+                    Path.home() / '.gujarati_converter' / 'fonts.toml']
+
+# Payload limit of the conversion endpoints unless a font definition says otherwise (characters)
+DEFAULT_MAX_PAYLOAD = 200
+
+# Per-endpoint payload limits measured by payload_calibration.py; GUJARATI_PAYLOAD_LIMITS_FILE
+# overrides the path
+PAYLOAD_LIMITS_FILE = Path.home() / '.gujarati_converter' / 'payload_limits.json'
+
+# Built-in font definitions
 GUJARATI_FONTS = {
     'gopika': {
         'name': 'Gopika',
@@ -177,10 +201,193 @@ GUJARATI_FONTS = {
     }
 }
 
+def payload_limits_path():
+    """Payload limits file applied at startup (GUJARATI_PAYLOAD_LIMITS_FILE or the default)"""
+    return Path(os.environ.get('GUJARATI_PAYLOAD_LIMITS_FILE') or PAYLOAD_LIMITS_FILE)
+
+def endpoint_name(api_url):
+    """Short label for an endpoint URL (e.g. GetShree0768Text)"""
+    return api_url.rstrip('/').rsplit('/', 1)[-1]
+
+class FontRegistry:
+    """Font definitions with O(1) lookup by key, display name, alias and endpoint.
+
+    Every entry is a dict with the font's name, url and font_family plus capability
+    metadata: endpoint (the endpoint group shared by fonts that convert identically),
+    max_payload (characters one request may carry) and aliases. Capabilities that
+    depend on files, such as an offline table, are not stored: capabilities() computes
+    them on each read. The entries dict is
+    GUJARATI_FONTS itself, so fonts loaded from a file are visible to every module.
+    Only the built-in fonts are known until an entry point calls load_user_files().
+    """
+
+    def __init__(self, fonts):
+        self.fonts = fonts
+        self._by_name = {}
+        self._by_endpoint = {}
+        self._payload_limits = {}
+        self._font_list = None
+        for key, font in list(fonts.items()):
+            self.add(key, **font)
+
+    def add(self, key, name, url, font_family, aliases=(), max_payload=None, **metadata):
+        """Add or replace a font definition and index it"""
+        if key in self.fonts and self.fonts[key].get('endpoint'):
+            self._unindex(key)
+        endpoint = endpoint_name(url)
+        font = dict(metadata, name=name, url=url, font_family=font_family, aliases=list(aliases),
+                    endpoint=endpoint,
+                    max_payload=int(max_payload or self._payload_limits.get(endpoint, DEFAULT_MAX_PAYLOAD)))
+        if key in self.fonts:
+            # Keep the same dict object: callers may hold on to it
+            self.fonts[key].clear()
+            self.fonts[key].update(font)
+        else:
+            self.fonts[key] = font
+        for label in (key, name, *font['aliases']):
+            self._by_name[label.lower()] = key
+        self._by_endpoint.setdefault(endpoint, []).append(key)
+        self._font_list = None
+        return self.fonts[key]
+
+    def _unindex(self, key):
+        font = self.fonts[key]
+        for label in (key, font['name'], *font.get('aliases', ())):
+            if self._by_name.get(label.lower()) == key:
+                del self._by_name[label.lower()]
+        self._by_endpoint[font['endpoint']].remove(key)
+        if not self._by_endpoint[font['endpoint']]:
+            del self._by_endpoint[font['endpoint']]
+
+    def get(self, key):
+        """Font definition of a key, or None"""
+        return self.fonts.get(key)
+
+    def resolve(self, label):
+        """Font key for a key, display name or alias (case-insensitive), or None"""
+        if label in self.fonts:
+            return label
+        return self._by_name.get(label.strip().lower())
+
+    def by_endpoint(self, endpoint):
+        """Font keys served by an endpoint (name or URL), in definition order"""
+        return list(self._by_endpoint.get(endpoint_name(endpoint), ()))
+
+    def endpoints(self):
+        """Endpoint name -> font keys"""
+        return {endpoint: list(keys) for endpoint, keys in self._by_endpoint.items()}
+
+    def max_payload(self, key):
+        """Characters one request for this font may carry"""
+        return self.fonts[key]['max_payload']
+
+    def set_max_payload(self, endpoint, max_payload):
+        """Set the payload limit of every font on an endpoint (e.g. from a calibration)"""
+        self._payload_limits[endpoint_name(endpoint)] = int(max_payload)
+        for key in self.by_endpoint(endpoint):
+            self.fonts[key]['max_payload'] = int(max_payload)
+
+    def offline_table_path(self, key):
+        """Offline mapping table of a font (shared by every font on its endpoint)"""
+        return OFFLINE_TABLE_DIR / f"{self.fonts[key]['endpoint']}.json"
+
+    def has_offline(self, key):
+        """Whether a font can be converted offline; checked on each call, so a table
+        built while the program runs is picked up"""
+        return key in self.fonts and self.offline_table_path(key).exists()
+
+    def capabilities(self, key):
+        """Font definition plus the capabilities that depend on files on disk"""
+        return dict(self.fonts[key], offline=self.has_offline(key))
+
+    def font_list(self):
+        """(key, name) of every font for display, built once per change"""
+        if self._font_list is None:
+            self._font_list = [(key, font['name']) for key, font in self.fonts.items()]
+        return self._font_list
+
+    def load(self, path):
+        """Load font definitions from a JSON or TOML file.
+
+        The file holds a "fonts" table mapping font keys to definitions. New keys need
+        name, url and font_family; for existing keys any subset of fields (e.g. aliases
+        or max_payload) is merged into the built-in definition. Returns the keys loaded.
+        """
+        path = Path(path)
+        if path.suffix.lower() == '.toml':
+            if tomllib is None:
+                raise ValueError(f"Reading {path} needs Python 3.11+ (tomllib); use a JSON file instead")
+            with open(path, 'rb') as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+        loaded = []
+        for key, definition in data.get('fonts', {}).items():
+            current = self.fonts.get(key, {})
+            fields = {field: value for field, value in current.items() if field != 'endpoint'}
+            fields.update(definition)
+            missing = [field for field in ('name', 'url', 'font_family') if field not in fields]
+            if missing:
+                raise ValueError(f"Font '{key}' in {path} is missing {', '.join(missing)}")
+            self.add(key, **fields)
+            loaded.append(key)
+        return loaded
+
+    def load_payload_limits(self, path=None):
+        """Apply calibrated per-endpoint payload limits; a missing or broken file is ignored"""
+        path = path or payload_limits_path()
+        try:
+            with open(path, encoding='utf-8') as f:
+                endpoints = json.load(f).get('endpoints', {})
+        except (OSError, ValueError):
+            return
+        for endpoint, result in endpoints.items():
+            if result.get('max_payload'):
+                self.set_max_payload(endpoint, result['max_payload'])
+
+    def load_user_fonts(self):
+        """Load the user's font file if there is one; problems are reported, not raised"""
+        env_path = os.environ.get('GUJARATI_FONTS_FILE')
+        for path in ([Path(env_path)] if env_path else USER_FONTS_FILES):
+            if path.exists():
+                try:
+                    self.load(path)
+                except (OSError, ValueError) as e:
+                    print(f"⚠️ Could not load fonts from {path}: {e}")
+
+    def load_user_files(self):
+        """Load the user's calibrated payload limits and font file (done by each entry point)"""
+        # Explicit font definitions win over calibrated limits
+        self.load_payload_limits()
+        self.load_user_fonts()
+
+    def use_api_base(self, base_url):
+        """Point every font at another server offering the same endpoints (e.g. mock_upstream.py)"""
+        for font in self.fonts.values():
+            font['url'] = f"{base_url.rstrip('/')}/{font['endpoint']}"
+
+registry = FontRegistry(GUJARATI_FONTS)
+
 def get_font_list():
     """Get a list of all available fonts for display in GUI"""
-    return [(key, font['name']) for key, font in GUJARATI_FONTS.items()]
+    return registry.font_list()
 
 def get_font_info(font_key):
     """Get font information by key"""
-    return GUJARATI_FONTS.get(font_key, GUJARATI_FONTS['shree0768'])  # Default to Shree
\ No newline at end of file
+    return GUJARATI_FONTS.get(font_key, GUJARATI_FONTS['shree0768'])  # Default to Shree
+
+def resolve_font(label):
+    """Font key for a key, display name or alias, or None"""
+    return registry.resolve(label)
+
+def use_api_base(base_url):
+    """Point every font at another server offering the same endpoints (e.g. mock_upstream.py)"""
+    registry.use_api_base(base_url)
+
+def plan_endpoints(font_keys):
+    """Group font keys by API endpoint so each endpoint is called only once per chunk"""
+    plan = {}
+    for font_key in font_keys:
+        plan.setdefault(get_font_info(font_key)['url'], []).append(font_key)
+    return plan
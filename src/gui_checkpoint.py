@@ -0,0 +1,88 @@
+# Checkpoints of GUI text conversions, so an interrupted conversion resumes where it stopped
+import hashlib
+from pathlib import Path
+from chunk_cache import DEFAULT_CACHE_PATH
+from chunk_store import ChunkStore
+from progress_journal import ProgressJournal
+
+DEFAULT_CHECKPOINT_DIR = DEFAULT_CACHE_PATH.parent / 'gui_progress'
+
+class ConversionStopped(Exception):
+    """Raised at a chunk boundary when the user pauses a conversion"""
+
+    def __init__(self, message="Conversion paused"):
+        super().__init__(message)
+
+def job_id(api_url, chunk_size, text):
+    """Identity of one GUI conversion: the same text, endpoint and chunk size"""
+    data = f"{api_url}\0{chunk_size}\0{text}".encode('utf-8')
+    return hashlib.sha256(data).hexdigest()[:32]
+
+class ConversionCheckpoint:
+    """Converted chunks of one GUI conversion, kept on disk until it completes.
+
+    Every converted chunk goes into a chunk store as soon as it arrives, and the journal
+    counts the chunks completed in order. Resuming runs the conversion again: chunks
+    already in the store are returned without a request, so paid upstream work is never
+    repeated, even for chunks that finished ahead of a failed one.
+    """
+
+    def __init__(self, api_url, chunk_size, text, directory=DEFAULT_CHECKPOINT_DIR):
+        self.api_url = api_url
+        self.job = {"api_url": api_url, "chunk_size": chunk_size}
+        base = Path(directory) / job_id(api_url, chunk_size, text)
+        # Chunks are slow and rate-limited, so every record is synced
+        self.journal = ProgressJournal(f"{base}.journal.jsonl", fsync_every=1)
+        self.store_path = Path(f"{base}.chunks.db")
+        self.store = None
+
+    def completed(self):
+        """Chunks completed by a previous run of this job (0 if there is nothing to resume)"""
+        header, state = self.journal.load()
+        if not (header and state and self.store_path.exists()):
+            return 0
+        if any(header.get(key) != value for key, value in self.job.items()):
+            return 0
+        return state['completed_chunks']
+
+    def open(self, resume=True):
+        """Start recording; without resume the stored chunks are discarded first"""
+        if not resume:
+            self.discard()
+        self.journal.start(**self.job)
+        self.store = ChunkStore(self.store_path)
+
+    def wrap(self, convert_one, stop_event=None):
+        """Chunk converter that answers from the store, stores new results and honours pauses"""
+        def convert(chunk):
+            converted = self.store.get(self.api_url, chunk)
+            if converted is not None:
+                return converted
+            # Queued chunks must not start new requests once a pause is requested
+            if stop_event is not None and stop_event.is_set():
+                raise ConversionStopped()
+            converted = convert_one(chunk)
+            # Fallbacks are never stored (see chunk_cache.Fallback)
+            self.store.put(self.api_url, chunk, converted)
+            return converted
+        return convert
+
+    def record(self, completed_chunks):
+        """Record that the first completed_chunks chunks are done"""
+        # The converted text lives in the store, not in an output file
+        self.journal.record_chunk(completed_chunks, 0)
+
+    def close(self):
+        """Close the journal and store, keeping them for a later resume"""
+        self.journal.close()
+        if self.store is not None:
+            self.store.close()
+            self.store = None
+
+    def discard(self):
+        """Delete the checkpoint (after a successful run or when starting fresh)"""
+        self.close()
+        self.journal.remove()
+        for path in (self.store_path, Path(f"{self.store_path}-wal"), Path(f"{self.store_path}-shm")):
+            if path.exists():
+                path.unlink()
@@ -0,0 +1,344 @@
+# Conversion logic shared by the two GUIs; they only add their widgets on top
+import abc
+import tkinter as tk
+from tkinter import filedialog, messagebox
+import threading
+from pathlib import Path
+from font_mapping import get_font_info
+from chunk_cache import ChunkCache
+from rate_limiter import configure_rate_limits
+from backends import BACKEND_MODES, backend_route, build_router
+from circuit_breaker import CircuitOpenError, with_outage_fallback
+from async_engine import ChunkConversionError, run_conversion
+from ui_updates import UIUpdateChannel
+from file_conversion import can_resume, convert_file_with_preview
+from gui_checkpoint import ConversionCheckpoint, ConversionStopped
+from script_runs import convert_gujarati_runs, pack_gujarati_chunks
+
+# Settings
+MIN_DELAY = 2
+MAX_DELAY = 5
+
+# Conversion backends (display name -> backend key)
+BACKENDS = {'Online API': 'remote', 'Offline Table': 'offline', 'Fastest Available': 'auto'}
+# What happens to chunks while the endpoint is down
+OUTAGE_FALLBACKS = {'Wait and Retry': 'defer', 'Offline Table': 'offline', 'Cached Only': 'cache'}
+
+class ConversionController(abc.ABC):
+    """Conversion state and actions of a converter window.
+
+    A GUI subclasses this and builds the widgets the actions use: input_text, output_text,
+    output_stats_label, char_count_label, font_preview, status_label, progress, pause_btn,
+    and min_delay_var, max_delay_var, chunk_size_var, backend_var, concurrency_var and
+    outage_var. show_running() switches its buttons between running and idle.
+    """
+
+    def __init__(self, root, server_url=None):
+        self.root = root
+        self.conversion_running = False
+        self.session = None
+        self.current_font = 'shree0768'
+        
+        # Remote conversions go through this conversion daemon when set
+        self.server_url = server_url
+        
+        # Set while the output box only previews a file converted straight to disk
+        self.output_file = None
+        
+        # Set to pause the running conversion at the next chunk boundary
+        self.stop_event = threading.Event()
+        
+        # Persistent chunk cache shared across conversions
+        try:
+            self.cache = ChunkCache()
+        except Exception:
+            self.cache = None
+        
+        # One router per backend; 'Fastest Available' tries the cache, offline table, daemon
+        # and endpoint, learning their latencies across conversions
+        self.routers = {backend: build_router(backend_route(backend, self.server_url), self.cache, self.server_url)
+                        for backend in BACKEND_MODES}
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
+        
+    @abc.abstractmethod
+    def show_running(self, running):
+        """Switch the convert and pause buttons between a running conversion and idle"""
+        
+    def update_char_count(self, event=None):
+        """Update character count"""
+        text = self.input_text.get('1.0', tk.END).strip()
+        count = len(text)
+        self.char_count_label.config(text=f"Characters: {count:,}")
+        
+    def select_font(self, font_key):
+        """Make font_key the conversion target and show it in the output box"""
+        self.current_font = font_key
+        
+        # Update font preview
+        font_info = get_font_info(font_key)
+        self.font_preview.config(text=font_info['font_family'])
+        # Start from the endpoint's (calibrated) payload limit
+        self.chunk_size_var.set(str(font_info['max_payload']))
+        
+        # Update output text font
+        try:
+            first_font = font_info['font_family'].replace('"', '').split(',')[0].strip()
+            self.output_text.config(font=(first_font, 12))
+        except:
+            self.output_text.config(font=('Courier New', 12))
+            
+    def start_conversion(self):
+        """Start the conversion process"""
+        if self.conversion_running:
+            messagebox.showwarning("Warning", "⚠️ Conversion already in progress!")
+            return
+            
+        input_text = self.input_text.get('1.0', tk.END).strip()
+        if not input_text:
+            messagebox.showwarning("Warning", "⚠️ Please enter some text to convert!")
+            return
+            
+        # Offer to resume an earlier conversion of the same text
+        checkpoint = self.open_checkpoint(input_text)
+            
+        # Start conversion in separate thread
+        self.conversion_running = True
+        self.stop_event.clear()
+        self.show_running(True)
+        self.output_text.delete('1.0', tk.END)
+        self.output_file = None
+        
+        # Worker updates reach the widgets through a frame-rate-limited channel
+        updates = self.create_update_channel().start()
+        thread = threading.Thread(target=self.convert_text, args=(input_text, updates, checkpoint))
+        thread.daemon = True
+        thread.start()
+        
+    def open_checkpoint(self, text):
+        """Checkpoint for a remote conversion of text, resuming earlier progress if the user agrees"""
+        if self.get_backend() == 'offline':
+            # Offline conversion is local and fast; there is nothing worth saving
+            return None
+        try:
+            checkpoint = ConversionCheckpoint(get_font_info(self.current_font)['url'], self.get_chunk_size(), text)
+            completed = checkpoint.completed()
+            resume = bool(completed) and messagebox.askyesno(
+                "Resume Conversion",
+                f"🔄 A previous conversion of this text stopped after {completed} chunks.\n\n"
+                "Resume where it left off? Choose No to start over.")
+            checkpoint.open(resume)
+        except Exception:
+            # Without a checkpoint the conversion still runs, it just cannot be resumed
+            return None
+        return checkpoint
+        
+    def pause_conversion(self):
+        """Stop the running conversion at the next chunk boundary, keeping its progress"""
+        if self.conversion_running:
+            self.stop_event.set()
+            self.pause_btn.config(state='disabled')
+            self.status_label.config(text="⏸️ Pausing after the chunks in flight...")
+            
+    def on_close(self):
+        """Ask before quitting mid-conversion; converted chunks stay saved for a resume"""
+        if self.conversion_running and not messagebox.askyesno(
+                "Quit", "⚠️ A conversion is running. Its progress is saved and can be resumed later.\n\n"
+                        "Quit anyway?"):
+            return
+        self.stop_event.set()
+        self.root.destroy()
+        
+    def convert_file_to_file(self):
+        """Convert a file straight to an output file without loading it into the editor"""
+        if self.conversion_running:
+            messagebox.showwarning("Warning", "⚠️ Conversion already in progress!")
+            return
+            
+        input_path = filedialog.askopenfilename(
+            title="Select Gujarati Text File To Convert",
+            filetypes=[("Text files", "*.txt *.gz *.xz"), ("All files", "*.*")]
+        )
+        if not input_path:
+            return
+        output_path = filedialog.asksaveasfilename(
+            title="Save Converted File As",
+            initialfile=f"{Path(input_path).stem}_{self.current_font}.txt",
+            defaultextension=".txt",
+            filetypes=[("Text files", "*.txt"), ("All files", "*.*")]
+        )
+        if not output_path:
+            return
+            
+        self.conversion_running = True
+        self.stop_event.clear()
+        self.show_running(True)
+        self.output_text.delete('1.0', tk.END)
+        self.output_file = output_path
+        
+        # Only a head/tail preview reaches the output box; the stats come with the status
+        updates = self.create_update_channel(show_length=False).start()
+        thread = threading.Thread(target=self.convert_file_worker, args=(input_path, output_path, updates))
+        thread.daemon = True
+        thread.start()
+        
+    def create_update_channel(self, show_length=True):
+        """Channel that applies progress, status and output updates at a fixed frame rate"""
+        def on_output(text, length):
+            self.output_text.insert(tk.END, text)
+            if show_length:
+                self.output_stats_label.config(text=f"Output: {length:,} characters")
+        
+        return UIUpdateChannel(
+            self.root,
+            on_progress=lambda value, maximum: self.progress.config(maximum=maximum, value=value),
+            on_status=lambda text: self.status_label.config(text=text),
+            on_output=on_output)
+        
+    def convert_text(self, text, updates, checkpoint=None):
+        """Convert text using API, reporting progress through updates.
+        
+        With a checkpoint every converted chunk is saved as it arrives, and a pause or
+        failure leaves it in place so the next conversion of the same text resumes.
+        """
+        try:
+            font_info = get_font_info(self.current_font)
+            backend = self.get_backend()
+            # Offline tables convert the whole text locally in one pass
+            chunks = [text] if backend == 'offline' else self.chunk_text(text)
+            total_chunks = len(chunks)
+            
+            updates.progress(0, total_chunks)
+            updates.status(f"🔄 Converting {total_chunks} chunks using {font_info['name']}...")
+            
+            convert_one = lambda chunk, router=self.routers[backend], font_key=self.current_font: (
+                router.convert(chunk, font_key))
+            if checkpoint:
+                # Chunks converted before a pause or failure come back from the checkpoint
+                convert_one = checkpoint.wrap(convert_one, self.stop_event)
+            if backend != 'offline':
+                # Only Gujarati runs are sent; English, digits, URLs and emoji are kept verbatim
+                convert_one = lambda chunk, send=convert_one, size=self.get_chunk_size(): (
+                    convert_gujarati_runs(chunk, send, size))
+                convert_one = self.with_outage_status(
+                    with_outage_fallback(convert_one, self.get_outage_fallback(), self.current_font), updates)
+            completed = 0
+            
+            def on_result(i, converted):
+                nonlocal completed
+                updates.progress(i + 1, total_chunks)
+                updates.status(f"🔄 Processing chunk {i+1}/{total_chunks} - {((i+1)/total_chunks)*100:.1f}% complete")
+                updates.append(converted)
+                completed = i + 1
+                if checkpoint:
+                    checkpoint.record(completed)
+                if self.stop_event.is_set():
+                    raise ConversionStopped()
+            
+            # Delay settings are the ceilings of the adaptive rate limiter
+            configure_rate_limits(float(self.min_delay_var.get()), float(self.max_delay_var.get()))
+            
+            try:
+                run_conversion(chunks, convert_one, self.get_concurrency(), on_result)
+            except (ChunkConversionError, ConversionStopped) as e:
+                if isinstance(e, ConversionStopped) or isinstance(e.error, ConversionStopped):
+                    updates.status(f"⏸️ Paused after {completed} of {total_chunks} chunks - "
+                                   f"press Convert to resume")
+                else:
+                    error_msg = f"❌ Failed to convert chunk {e.index + 1}: {e.error}"
+                    if checkpoint:
+                        error_msg += "\n\n💾 Progress is saved. Press Convert again to resume."
+                    self.root.after(0, lambda msg=error_msg: messagebox.showerror("Conversion Error", msg))
+                    updates.status(f"❌ Stopped at chunk {e.index + 1} of {total_chunks}")
+                return
+                        
+            # Final update
+            if checkpoint:
+                checkpoint.discard()
+            updates.progress(total_chunks, total_chunks)
+            updates.status(f"✅ Conversion complete! {updates.output_length:,} characters converted to {font_info['name']}")
+            
+        except Exception as e:
+            self.root.after(0, lambda e=e: messagebox.showerror("Error", f"❌ Conversion failed: {e}"))
+            updates.status("❌ Conversion failed")
+        finally:
+            if checkpoint:
+                checkpoint.close()
+            updates.close()
+            self.conversion_running = False
+            self.root.after(0, self.show_running, False)
+            
+    def convert_file_worker(self, input_path, output_path, updates):
+        """Stream input_path to output_path, showing only the start and end of the output"""
+        try:
+            font_info = get_font_info(self.current_font)
+            updates.progress(0, 1)
+            updates.status(f"📂 Converting {Path(input_path).name} to {font_info['name']}...")
+            
+            # Delay settings are the ceilings of the adaptive rate limiter
+            configure_rate_limits(float(self.min_delay_var.get()), float(self.max_delay_var.get()))
+            
+            error, preview = convert_file_with_preview(
+                input_path, output_path, self.current_font, updates,
+                backend=self.get_backend(), cache=self.cache,
+                concurrency=self.get_concurrency(), server=self.server_url, stop_event=self.stop_event,
+                on_outage=self.get_outage_fallback())
+            
+            self.root.after(0, lambda: self.output_stats_label.config(
+                text=f"Output: {preview.total:,} characters written"))
+            if error is None:
+                updates.status(f"🎉 Saved {preview.total:,} characters in {font_info['name']} to {Path(output_path).name}")
+            elif isinstance(error, ConversionStopped):
+                updates.status(f"⏸️ Paused after {preview.total:,} characters - "
+                               f"convert the same file again to resume")
+            elif can_resume(error):
+                updates.status("❌ File conversion stopped - convert the same file again to resume")
+                self.root.after(0, lambda: messagebox.showwarning(
+                    "Conversion Stopped", f"❌ {error}\n\nProgress is saved: convert the same file again to resume."))
+            else:
+                updates.status("❌ File conversion failed")
+                self.root.after(0, lambda: messagebox.showerror("Error", f"❌ Conversion failed: {error}"))
+            
+        except Exception as e:
+            self.root.after(0, lambda e=e: messagebox.showerror("Error", f"❌ Conversion failed: {e}"))
+            updates.status("❌ Conversion failed")
+        finally:
+            updates.close()
+            self.conversion_running = False
+            self.root.after(0, self.show_running, False)
+            
+    def get_concurrency(self):
+        """Get the number of chunks to convert in parallel"""
+        try:
+            return max(1, int(self.concurrency_var.get()))
+        except ValueError:
+            return 1
+            
+    def get_backend(self):
+        """Get the backend mode: 'remote', 'offline' or 'auto'"""
+        return BACKENDS.get(self.backend_var.get(), 'remote')
+            
+    def get_outage_fallback(self):
+        """Get what to do with chunks while the endpoint is down"""
+        return OUTAGE_FALLBACKS.get(self.outage_var.get(), 'defer')
+            
+    def with_outage_status(self, convert_one, updates):
+        """Show in the status line when chunks are waiting for the endpoint to come back"""
+        def convert(chunk):
+            try:
+                return convert_one(chunk)
+            except CircuitOpenError as e:
+                updates.status(f"⚡ {e} - waiting chunks do not block the workers")
+                raise
+        return convert
+            
+    def get_chunk_size(self):
+        """Get the chunk size, capped at the payload limit of the selected font's endpoint"""
+        max_payload = get_font_info(self.current_font)['max_payload']
+        try:
+            return max(1, min(int(self.chunk_size_var.get()), max_payload))
+        except ValueError:
+            return max_payload
+        
+    def chunk_text(self, text):
+        """Split text into chunks whose Gujarati runs fill one request, on akshara boundaries"""
+        return pack_gujarati_chunks(text, self.get_chunk_size())
@@ -0,0 +1,155 @@
+# Per-endpoint conversion metrics with Prometheus text and JSON export
+import json
+import threading
+from font_mapping import endpoint_name, registry
+
+# Upper bounds (seconds) of the request latency histogram buckets
+LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class EndpointMetrics:
+    """Counters and latency histogram of one endpoint"""
+
+    def __init__(self):
+        self.requests = 0
+        self.statuses = {}
+        self.retries = 0
+        self.errors = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.sleep_seconds = 0.0
+        self.latency_sum = 0.0
+        self.latency_max = 0.0
+        self.bucket_counts = [0] * (len(LATENCY_BUCKETS) + 1)
+
+    def observe_latency(self, seconds):
+        self.latency_sum += seconds
+        self.latency_max = max(self.latency_max, seconds)
+        for i, bound in enumerate(LATENCY_BUCKETS):
+            if seconds <= bound:
+                self.bucket_counts[i] += 1
+                return
+        self.bucket_counts[-1] += 1
+
+    def summary(self):
+        return {
+            "requests": self.requests,
+            "statuses": dict(self.statuses),
+            "retries": self.retries,
+            "errors": self.errors,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "cache_hits": self.cache_hits,
+            "cache_misses": self.cache_misses,
+            "sleep_seconds": round(self.sleep_seconds, 3),
+            "latency_seconds": {
+                "sum": round(self.latency_sum, 3),
+                "mean": round(self.latency_sum / self.requests, 3) if self.requests else 0.0,
+                "max": round(self.latency_max, 3),
+                "buckets": {str(bound): count for bound, count in
+                            zip((*LATENCY_BUCKETS, '+Inf'), self.bucket_counts)},
+            },
+        }
+
+class ConversionMetrics:
+    """Thread-safe per-endpoint metrics of upstream requests, retries, cache use and waits"""
+
+    def __init__(self):
+        self.endpoints = {}
+        self._lock = threading.Lock()
+
+    def _endpoint(self, api_url):
+        name = endpoint_name(api_url)
+        if name not in self.endpoints:
+            self.endpoints[name] = EndpointMetrics()
+        return self.endpoints[name]
+
+    def record_request(self, api_url, status, seconds, bytes_sent=0, bytes_received=0):
+        """One upstream request; status is the HTTP status code or 'error' for network failures"""
+        with self._lock:
+            endpoint = self._endpoint(api_url)
+            endpoint.requests += 1
+            endpoint.statuses[str(status)] = endpoint.statuses.get(str(status), 0) + 1
+            if status == 'error':
+                endpoint.errors += 1
+            endpoint.bytes_sent += bytes_sent
+            endpoint.bytes_received += bytes_received
+            endpoint.observe_latency(seconds)
+
+    def record_retry(self, api_url):
+        with self._lock:
+            self._endpoint(api_url).retries += 1
+
+    def record_cache(self, api_url, hit):
+        with self._lock:
+            endpoint = self._endpoint(api_url)
+            if hit:
+                endpoint.cache_hits += 1
+            else:
+                endpoint.cache_misses += 1
+
+    def record_sleep(self, api_url, seconds):
+        """Time spent waiting for the rate limiter before a request"""
+        if seconds > 0:
+            with self._lock:
+                self._endpoint(api_url).sleep_seconds += seconds
+
+    def summary(self):
+        """JSON-ready summary per endpoint, with the fonts that use each endpoint"""
+        fonts = registry.endpoints()
+        with self._lock:
+            return {name: dict(endpoint.summary(), fonts=fonts.get(name, []))
+                    for name, endpoint in sorted(self.endpoints.items())}
+
+    def to_json(self):
+        return json.dumps({"endpoints": self.summary()}, indent=2)
+
+    def to_prometheus(self):
+        """Prometheus text exposition format"""
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                label_text = ','.join(f'{key}="{val}"' for key, val in labels.items())
+                lines.append(f"{name}{{{label_text}}} {value}")
+
+        with self._lock:
+            endpoints = sorted(self.endpoints.items())
+            metric('gujarati_requests_total', 'counter', 'Upstream requests by status code',
+                   [({'endpoint': name, 'status': status}, count)
+                    for name, e in endpoints for status, count in sorted(e.statuses.items())])
+            for attr, help_text in (('retries', 'Retried upstream requests'),
+                                    ('bytes_sent', 'Payload bytes sent upstream'),
+                                    ('bytes_received', 'Response bytes received'),
+                                    ('cache_hits', 'Chunks served from the cache'),
+                                    ('cache_misses', 'Chunks not found in the cache')):
+                metric(f'gujarati_{attr}_total', 'counter', help_text,
+                       [({'endpoint': name}, getattr(e, attr)) for name, e in endpoints])
+            metric('gujarati_sleep_seconds_total', 'counter', 'Seconds spent waiting for the rate limiter',
+                   [({'endpoint': name}, round(e.sleep_seconds, 6)) for name, e in endpoints])
+            lines.append('# HELP gujarati_request_duration_seconds Upstream request latency')
+            lines.append('# TYPE gujarati_request_duration_seconds histogram')
+            for name, e in endpoints:
+                cumulative = 0
+                for bound, count in zip((*LATENCY_BUCKETS, '+Inf'), e.bucket_counts):
+                    cumulative += count
+                    lines.append(f'gujarati_request_duration_seconds_bucket{{endpoint="{name}",le="{bound}"}} '
+                                 f'{cumulative}')
+                lines.append(f'gujarati_request_duration_seconds_sum{{endpoint="{name}"}} {round(e.latency_sum, 6)}')
+                lines.append(f'gujarati_request_duration_seconds_count{{endpoint="{name}"}} {e.requests}')
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path, fmt='json'):
+        """Write the metrics to path as 'json' or 'prometheus' text"""
+        text = self.to_prometheus() if fmt == 'prometheus' else self.to_json()
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+
+_metrics = ConversionMetrics()
+
+def get_metrics():
+    """The metrics shared by every conversion in this process"""
+    return _metrics
@@ -0,0 +1,205 @@
+# Local stand-in for the fontconverter.online endpoints, with injectable latency and faults
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8766
+
+def parse_latency(spec):
+    """Parse a latency distribution in milliseconds into a sampler(rng) returning seconds.
+
+    Supported: fixed:MS, uniform:LO,HI, normal:MEAN,SD, lognormal:MEDIAN,SIGMA, exp:MEAN
+    """
+    kind, _, params = spec.partition(':')
+    try:
+        values = [float(value) for value in params.split(',')] if params else []
+        if kind == 'fixed':
+            ms, = values
+            sample = lambda rng: ms
+        elif kind == 'uniform':
+            low, high = values
+            sample = lambda rng: rng.uniform(low, high)
+        elif kind == 'normal':
+            mean, sd = values
+            sample = lambda rng: rng.gauss(mean, sd)
+        elif kind == 'lognormal':
+            median, sigma = values
+            sample = lambda rng: median * rng.lognormvariate(0, sigma)
+        elif kind == 'exp':
+            mean, = values
+            sample = lambda rng: rng.expovariate(1 / mean) if mean > 0 else 0.0
+        else:
+            raise ValueError(f"unknown distribution '{kind}'")
+    except ValueError as e:
+        raise ValueError(f"Bad latency spec '{spec}': {e}")
+    return lambda rng: max(0.0, sample(rng)) / 1000
+
+def parse_payload_limits(spec):
+    """Parse payload limits 'N' or 'N,Endpoint=N,...' into {endpoint or None: characters}"""
+    limits = {}
+    for item in filter(None, (item.strip() for item in (spec or '').split(','))):
+        endpoint, _, value = item.rpartition('=')
+        try:
+            limits[endpoint or None] = int(value)
+        except ValueError:
+            raise ValueError(f"Bad payload limit '{item}' in '{spec}'")
+    return limits
+
+class FaultProfile:
+    """How the mock misbehaves: latency distribution and per-request fault probabilities"""
+
+    def __init__(self, latency='fixed:0', throttle=0.0, ban=0.0, server_error=0.0, empty=0.0,
+                 garbled=0.0, retry_after=None, max_payload=None):
+        self.latency_spec = latency
+        self.latency = parse_latency(latency)
+        # Longer payloads come back truncated, like an endpoint that silently cuts its input
+        self.payload_limits = parse_payload_limits(max_payload)
+        # Checked in this order; the rest of the requests succeed
+        self.faults = [('429', throttle), ('403', ban), ('500', server_error),
+                       ('empty', empty), ('garbled', garbled)]
+        self.retry_after = retry_after
+
+    def payload_limit(self, endpoint):
+        """Characters the endpoint converts before cutting the payload, or None"""
+        return self.payload_limits.get(endpoint, self.payload_limits.get(None))
+
+class MockUpstream:
+    """Request counters and fault decisions shared by all handler threads"""
+
+    def __init__(self, profile=None, seed=None):
+        self.profile = profile or FaultProfile()
+        self.rng = random.Random(seed)
+        self.counts = {'requests': 0, 'ok': 0}
+        self._lock = threading.Lock()
+
+    def next_response(self):
+        """Pick the outcome and latency of the next request"""
+        with self._lock:
+            self.counts['requests'] += 1
+            latency = self.profile.latency(self.rng)
+            roll = self.rng.random()
+            outcome = 'ok'
+            for fault, probability in self.profile.faults:
+                if roll < probability:
+                    outcome = fault
+                    break
+                roll -= probability
+            self.counts[outcome] = self.counts.get(outcome, 0) + 1
+        return outcome, latency
+
+    def stats(self):
+        with self._lock:
+            return dict(self.counts)
+
+    @staticmethod
+    def convert(endpoint, text):
+        """Stand-in conversion: the endpoints' output is not reproduced, the text is echoed"""
+        return text
+
+class MockRequestHandler(BaseHTTPRequestHandler):
+    """POST /<path>/Get...Text with a modify_string form field, like the real endpoints"""
+
+    upstream = None
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length', 0))
+        form = parse_qs(self.rfile.read(length).decode('utf-8'), keep_blank_values=True)
+        text = form.get('modify_string', [''])[0]
+        endpoint = urlparse(self.path).path.rsplit('/', 1)[-1]
+        limit = self.upstream.profile.payload_limit(endpoint)
+        if limit is not None:
+            text = text[:limit]
+        outcome, latency = self.upstream.next_response()
+        if latency:
+            time.sleep(latency)
+        if outcome in ('429', '403', '500'):
+            headers = {}
+            if outcome != '500' and self.upstream.profile.retry_after is not None:
+                headers['Retry-After'] = str(self.upstream.profile.retry_after)
+            self.send_body(int(outcome), b'Injected error', headers)
+        elif outcome == 'empty':
+            self.send_body(200, b'')
+        elif outcome == 'garbled':
+            # UTF-16 bytes look like binary (NUL characters) to a UTF-8 client
+            self.send_body(200, self.upstream.convert(endpoint, text).encode('utf-16-le'))
+        else:
+            self.send_body(200, self.upstream.convert(endpoint, text).encode('utf-8'))
+
+    def do_GET(self):
+        if urlparse(self.path).path == '/stats':
+            self.send_body(200, json.dumps(self.upstream.stats()).encode('utf-8'),
+                           {'Content-Type': 'application/json'})
+        else:
+            self.send_body(404, b'Not found')
+
+    def send_body(self, status, body, headers=None):
+        self.send_response(status)
+        headers = dict({'Content-Type': 'text/html; charset=utf-8'}, **(headers or {}))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_mock(upstream, host=DEFAULT_HOST, port=0):
+    """Serve upstream on a background thread; returns (server, base URL for use_api_base)"""
+    handler = type('BoundMockRequestHandler', (MockRequestHandler,), {'upstream': upstream})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/gujarati"
+
+def add_fault_arguments(parser):
+    """Latency and fault injection options shared with benchmark.py"""
+    parser.add_argument('--latency', default='fixed:0',
+                        help='Latency distribution in ms: fixed:MS, uniform:LO,HI, normal:MEAN,SD, '
+                             'lognormal:MEDIAN,SIGMA or exp:MEAN (default: fixed:0)')
+    parser.add_argument('--p429', type=float, default=0.0, help='Probability of a 429 response')
+    parser.add_argument('--p403', type=float, default=0.0, help='Probability of a 403 response')
+    parser.add_argument('--p500', type=float, default=0.0, help='Probability of a 500 response')
+    parser.add_argument('--p-empty', type=float, default=0.0, help='Probability of an empty response')
+    parser.add_argument('--p-garbled', type=float, default=0.0,
+                        help='Probability of a wrongly encoded (UTF-16) response')
+    parser.add_argument('--retry-after', type=float,
+                        help='Retry-After seconds sent with 429/403 responses')
+    parser.add_argument('--max-payload', metavar='SPEC',
+                        help="Truncate payloads longer than this many characters: N, or per endpoint "
+                             "'N,GetKrishnaText=1000' (default: no limit)")
+    parser.add_argument('--seed', type=int, help='Random seed for reproducible runs')
+
+def profile_from_args(args):
+    """FaultProfile from the options added by add_fault_arguments()"""
+    return FaultProfile(latency=args.latency, throttle=args.p429, ban=args.p403, server_error=args.p500,
+                        empty=args.p_empty, garbled=args.p_garbled, retry_after=args.retry_after,
+                        max_payload=args.max_payload)
+
+def main():
+    parser = argparse.ArgumentParser(description='Mock Gujarati font converter endpoints for load testing')
+    parser.add_argument('--host', default=DEFAULT_HOST, help=f'Address to listen on (default: {DEFAULT_HOST})')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT, help=f'Port (default: {DEFAULT_PORT})')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    upstream = MockUpstream(profile_from_args(args), seed=args.seed)
+    server, base_url = start_mock(upstream, args.host, args.port)
+    print(f"🧪 Mock endpoints at {base_url}/<Endpoint> (latency {args.latency})")
+    print(f"   Stats: http://{args.host}:{server.server_address[1]}/stats")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        print(f"\nRequests: {upstream.stats()}")
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == "__main__":
+    main()
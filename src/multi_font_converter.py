@@ -1,120 +1,58 @@
-import requests
 from pathlib import Path
 import os
 import time
-import random
-import json
 import argparse
-from datetime import datetime
-from font_mapping import GUJARATI_FONTS, get_font_list, get_font_info
+import sys
+import shutil
+import itertools
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
+from font_mapping import GUJARATI_FONTS, get_font_list, get_font_info, plan_endpoints, registry, resolve_font
+from offline_converter import get_offline_converter, has_offline_table
+from segmenter import CHUNKERS
+from word_dedup import WordMap, dedup_convert
+from script_runs import convert_gujarati_runs, pack_gujarati_chunks
+from stream_io import is_compressed, iter_chunks, open_text
+from async_engine import ChunkConversionError, run_conversion
+from rate_limiter import configure_rate_limits, rate_limit_settings
+from backends import DEFAULT_ROUTE, backend_route, build_router
+from circuit_breaker import (DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT, OUTAGE_FALLBACKS,
+                             circuit_breaker_settings, circuit_stats, configure_circuit_breakers,
+                             with_outage_fallback)
+from progress_journal import ProgressJournal
+from server_client import DEFAULT_SERVER_URL
+from endpoint_client import get_verbosity, log, set_verbosity
+from metrics import get_metrics
+from chunk_store import ChunkStore, chunk_fingerprint, extend_digest
+from batch_manifest import RunManifest
+from chunk_cache import ChunkCache, DEFAULT_CACHE_PATH, DEFAULT_MAX_ENTRIES, DEFAULT_MAX_BYTES
 
 # Chunk size limit (API max = 200 chars)
 CHUNK_SIZE = 200
 
-# Rate limiting settings
-MIN_DELAY = 2  # Minimum seconds between requests
-MAX_DELAY = 5  # Maximum seconds between requests
-MAX_RETRIES = 3  # Maximum retry attempts per chunk
+# Block size for local work that has no API limit (offline tables, word dedup)
+BLOCK_SIZE = 64 * 1024
 
-def chunk_text(text, size=CHUNK_SIZE):
-    """Split text into fixed-size chunks (≤200 chars)."""
-    return [text[i:i+size] for i in range(0, len(text), size)]
+# Rate limiting settings (ceilings for the adaptive rate limiter)
+MIN_DELAY = 2  # Minimum seconds between requests (fastest allowed rate)
+MAX_DELAY = 5  # Maximum seconds between requests (slowest rate after backing off)
 
-def convert_chunk_with_session(session, chunk, api_url, attempt=1):
-    """Send one chunk to the API using session with retry logic."""
-    for retry in range(MAX_RETRIES):
-        try:
-            # Add random delay to avoid rate limiting
-            delay = random.uniform(MIN_DELAY, MAX_DELAY)
-            if retry > 0:
-                # Exponential backoff for retries
-                delay = delay * (2 ** retry)
-                print(f"  Retry {retry + 1}/{MAX_RETRIES} after {delay:.1f}s delay...")
-            
-            time.sleep(delay)
-            
-            # Rotate user agents to appear as different browsers
-            user_agents = [
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
-                'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/605.1.15 (KHTML, like Gecko) Version/14.1.1 Safari/605.1.15',
-                'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Edge/91.0.864.59'
-            ]
-            
-            headers = {
-                'User-Agent': random.choice(user_agents),
-                'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,image/webp,*/*;q=0.8',
-                'Accept-Language': 'en-US,en;q=0.5',
-                'Accept-Encoding': 'gzip, deflate, br',
-                'Connection': 'keep-alive',
-                'Upgrade-Insecure-Requests': '1',
-                'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
-            }
-            
-            # Ensure proper encoding for the request
-            data = {"modify_string": chunk}
-            
-            resp = session.post(api_url, data=data, headers=headers, timeout=30)
-            
-            if resp.status_code == 200:
-                # Debug: Check response content type and encoding
-                print(f"  Response encoding: {resp.encoding}")
-                print(f"  Content type: {resp.headers.get('content-type', 'unknown')}")
-                
-                # Try to decode properly
-                try:
-                    # First try with response encoding
-                    if resp.encoding:
-                        resp.encoding = 'utf-8'  # Force UTF-8 encoding
-                    
-                    converted_text = resp.text
-                    
-                    # Validate that we got actual text (not binary)
-                    if len(converted_text.strip()) == 0:
-                        print(f"  ⚠️ Empty response received")
-                        converted_text = chunk  # Fallback to original
-                    elif any(ord(char) < 32 and char not in '\n\r\t' for char in converted_text[:100]):
-                        print(f"  ⚠️ Response contains binary/control characters")
-                        # Try different encoding approaches
-                        try:
-                            converted_text = resp.content.decode('utf-8')
-                        except UnicodeDecodeError:
-                            try:
-                                converted_text = resp.content.decode('latin1')
-                            except UnicodeDecodeError:
-                                print(f"  ❌ Could not decode response, using original text")
-                                converted_text = chunk  # Fallback to original
-                    
-                    print(f"  ✅ Converted text sample: {converted_text[:50]}...")
-                    return converted_text
-                    
-                except Exception as decode_error:
-                    print(f"  ❌ Decoding error: {decode_error}")
-                    return chunk  # Fallback to original chunk
-                    
-            elif resp.status_code == 429:  # Too Many Requests
-                print(f"  Rate limited (429), attempt {retry + 1}/{MAX_RETRIES}")
-                if retry == MAX_RETRIES - 1:
-                    raise RuntimeError(f"Rate limited after {MAX_RETRIES} attempts")
-                continue
-            elif resp.status_code == 403:  # Forbidden (IP ban)
-                print(f"  IP banned (403), attempt {retry + 1}/{MAX_RETRIES}")
-                if retry == MAX_RETRIES - 1:
-                    raise RuntimeError(f"IP banned after {MAX_RETRIES} attempts. Try using VPN or wait.")
-                continue
-            else:
-                print(f"  API error {resp.status_code}: {resp.text}")
-                if retry == MAX_RETRIES - 1:
-                    raise RuntimeError(f"API error {resp.status_code}: {resp.text}")
-                continue
-                
-        except requests.exceptions.RequestException as e:
-            print(f"  Network error on attempt {retry + 1}/{MAX_RETRIES}: {e}")
-            if retry == MAX_RETRIES - 1:
-                raise RuntimeError(f"Network error after {MAX_RETRIES} attempts: {e}")
-            continue
+def get_chunker(chunking='fixed', passthrough=False):
+    """Chunk function for a chunking mode.
+    
+    With passthrough only Gujarati runs are sent, so fixed chunks are packed by the size
+    of their Gujarati runs and may carry any amount of other text.
+    """
+    if passthrough and chunking == 'fixed':
+        return pack_gujarati_chunks
+    return CHUNKERS[chunking]
+
+def chunk_text(text, size=CHUNK_SIZE, chunking='fixed', passthrough=False):
+    """Split text into chunks (≤200 chars) that never cut inside an akshara.
     
-    raise RuntimeError(f"Failed to convert chunk after {MAX_RETRIES} attempts")
+    chunking 'fixed' packs each chunk as full as possible; 'content' places boundaries
+    with a rolling hash so unchanged text keeps producing the same chunks after edits.
+    """
+    return get_chunker(chunking, passthrough)(text, size)
 
 def get_next_output_filename(font_name):
     """Generate next available output filename with font name"""
@@ -125,126 +63,520 @@ def get_next_output_filename(font_name):
             return filename
         counter += 1
 
-def save_progress(filename, completed_chunks, total_chunks, results):
-    """Save conversion progress to resume later if interrupted"""
-    progress_file = f"{filename}.progress.json"
-    progress_data = {
-        "completed_chunks": completed_chunks,
-        "total_chunks": total_chunks,
-        "results": results,
-        "timestamp": datetime.now().isoformat()
-    }
-    with open(progress_file, 'w', encoding='utf-8') as f:
-        json.dump(progress_data, f, ensure_ascii=False, indent=2)
-    print(f"Progress saved: {completed_chunks}/{total_chunks} chunks completed")
+def input_digest(input_file, chunk_size, count, chunking='fixed', passthrough=False):
+    """Chained fingerprint of the first count chunks of the input file"""
+    digest = ''
+    chunker = get_chunker(chunking, passthrough)
+    with open_text(input_file) as src:
+        for chunk in itertools.islice(iter_chunks(src, chunk_size, chunker=chunker), count):
+            digest = extend_digest(digest, chunk_fingerprint(chunk))
+    return digest
 
-def load_progress(filename):
-    """Load previous progress if exists"""
-    progress_file = f"{filename}.progress.json"
-    if Path(progress_file).exists():
-        with open(progress_file, 'r', encoding='utf-8') as f:
-            return json.load(f)
-    return None
+class EndpointTarget:
+    """One endpoint of a conversion run: its converter, output stream, journal and chunk store.
+    
+    The first font key of the endpoint is converted; the others share its output.
+    """
 
-def cleanup_progress(filename):
-    """Remove progress file after successful completion"""
-    progress_file = f"{filename}.progress.json"
-    if Path(progress_file).exists():
-        Path(progress_file).unlink()
-        print(f"Progress file cleaned up: {progress_file}")
+    def __init__(self, api_url, font_keys, outputs):
+        self.api_url = api_url
+        self.font_key = font_keys[0]
+        self.font_info = get_font_info(self.font_key)
+        self.output_file = outputs[self.font_key]
+        self.copies = {font_key: outputs[font_key] for font_key in font_keys[1:]}
+        self.journal = ProgressJournal.for_output(self.output_file)
+        self.convert_one = None
+        self.router = None
+        self.store = None
+        self.word_map = None
+        self.out = None
+        self.job = None
+        self.start_chunk = 0
+        self.completed = 0
+        self.output_bytes = 0
+        self.output_chars = 0
+        self.digest = ''
 
-def convert_file(input_file, output_file, font_key):
-    """Read input file, convert via API in chunks, save output file."""
-    try:
-        text = Path(input_file).read_text(encoding="utf-8")
+    def setup(self, backend, record_file, cache, dedup_words, incremental, server=None, passthrough=False,
+              on_outage='defer', route=DEFAULT_ROUTE):
+        """Build the chunk converter for this endpoint (through a conversion daemon if server is set).
         
-        if not text.strip():
-            print("Input file is empty!")
+        Every backend mode converts through a router (see backend_route): the 'auto' one
+        routes every payload to the fastest backend in route that can convert it, with
+        the public endpoint as the last resort.
+        """
+        api_url = self.api_url
+        font_key = self.font_key
+        router = self.router = build_router(backend_route(backend, server, route), cache, server, record_file)
+        convert = lambda payload: router.convert(payload, font_key)
+        if backend == 'offline':
+            # A font without a table fails here, before any output is opened
+            get_offline_converter(font_key)
+            # Offline conversion is local and fast: no API limit, delays or session needed
+            self.convert_one = convert
             return
+        payload_size = self.font_info['max_payload']
+        if dedup_words:
+            # Each block sends only words no earlier block converted and is rebuilt from the word map
+            word_map = self.word_map = WordMap()
+            convert_one = lambda block: dedup_convert(block, convert, payload_size, word_map=word_map)
+        elif passthrough:
+            # Only the Gujarati runs are sent; everything else is spliced back verbatim
+            convert_one = lambda chunk: convert_gujarati_runs(chunk, convert, payload_size)
+        else:
+            convert_one = convert
+        if incremental:
+            store = self.store = ChunkStore.for_output(self.output_file)
+            send_one = convert_one
+            def convert_one(payload):
+                converted = store.get(api_url, payload)
+                if converted is None:
+                    converted = send_one(payload)
+                    # Fallbacks are never stored (see chunk_cache.Fallback)
+                    store.put(api_url, payload, converted)
+                return converted
+        # Outermost, so offline stand-ins for a down endpoint never reach the chunk store
+        self.convert_one = with_outage_fallback(convert_one, on_outage, font_key)
+
+    def check_resume(self, input_file):
+        """Return the journalled state if this output can be resumed, otherwise None"""
+        header, state = self.journal.load()
+        if not (state and header and Path(self.output_file).exists()):
+            return None
+        print(f"\n🔄 Found previous progress for {self.output_file}:")
+        print(f"   Completed: {state['completed_chunks']} chunks ({state['output_bytes']:,} bytes)")
+        print(f"   Started: {header['timestamp']}")
         
-        font_info = get_font_info(font_key)
-        api_url = font_info['url']
-        
-        chunks = chunk_text(text)
-        print(f"Input file: {input_file}")
-        print(f"Output file: {output_file}")
-        print(f"Selected font: {font_info['name']} ({font_key})")
-        print(f"Font family: {font_info['font_family']}")
-        print(f"API URL: {api_url}")
-        print(f"Text length: {len(text)} characters")
-        print(f"Total chunks: {len(chunks)}")
-        print(f"First chunk preview: {chunks[0][:50]}...")
+        if any(header.get(key) != value for key, value in self.job.items()):
+            print("Previous run used different settings, starting fresh conversion...")
+        elif is_compressed(self.output_file):
+            print("Compressed output cannot be resumed, starting fresh conversion...")
+        elif Path(self.output_file).stat().st_size < state['output_bytes']:
+            print("Output file is shorter than the journal, starting fresh conversion...")
+        elif input_digest(input_file, self.job['chunk_size'], state['completed_chunks'],
+                          self.job['chunking'], self.job['passthrough']) != state.get('digest'):
+            print("Input changed since the previous run, starting fresh conversion...")
+        else:
+            return state
+        return None
 
-        # Check for existing progress
-        progress = load_progress(output_file)
-        if progress:
-            print(f"\n🔄 Resuming from previous progress:")
-            print(f"   Completed: {progress['completed_chunks']}/{progress['total_chunks']} chunks")
-            print(f"   Timestamp: {progress['timestamp']}")
-            
-            results = progress['results']
-            start_chunk = progress['completed_chunks']
-            
-            user_input = input("Resume from where you left off? (y/n): ").lower().strip()
-            if user_input != 'y':
-                print("Starting fresh conversion...")
-                results = []
-                start_chunk = 0
+    def open(self, state=None):
+        """Open the output for writing, continuing from a journalled state if given"""
+        if state:
+            self.start_chunk = self.completed = state['completed_chunks']
+            self.output_bytes = state['output_bytes']
+            self.digest = state['digest']
+            # Drop anything written after the last checkpoint, then append
+            with open(self.output_file, 'r+b') as f:
+                f.truncate(self.output_bytes)
+            self.out = open_text(self.output_file, 'a')
+            self.journal.reopen()
         else:
-            results = []
-            start_chunk = 0
+            Path(self.output_file).parent.mkdir(parents=True, exist_ok=True)
+            self.out = open_text(self.output_file, 'w')
+            self.journal.start(**self.job)
+        # Records must never point past data that is not yet on disk
+        self.journal.on_sync = self.sync_output
 
-        # Use session for better connection management
-        with requests.Session() as session:
-            for i in range(start_chunk, len(chunks)):
-                chunk = chunks[i]
-                chunk_num = i + 1
-                print(f"\n🔄 Converting chunk {chunk_num}/{len(chunks)} ({len(chunk)} chars)...")
-                print(f"  Sending: {chunk[:30]}...")
-                
-                try:
-                    converted = convert_chunk_with_session(session, chunk, api_url)
-                    results.append(converted)
-                    print(f"  ✅ Received: {converted[:30] if converted else 'EMPTY'}...")
-                    
-                    # Save progress every 5 chunks
-                    if chunk_num % 5 == 0:
-                        save_progress(output_file, chunk_num, len(chunks), results)
-                        
-                except Exception as e:
-                    print(f"  ❌ Failed to convert chunk {chunk_num}: {e}")
-                    print(f"  💾 Progress saved. You can resume later.")
-                    save_progress(output_file, i, len(chunks), results)
-                    return
+    def sync_output(self):
+        """Flush and fsync the output, so journal records synced after it are backed by data"""
+        self.out.flush()
+        os.fsync(self.out.fileno())
 
-        final_text = "".join(results)
-        print(f"\nFinal converted text length: {len(final_text)} characters")
+    def write(self, converted, fingerprint):
+        """Append the next converted chunk to the output (called in chunk order)"""
+        self.out.write(converted)
+        self.completed += 1
+        self.output_bytes += len(converted.encode('utf-8'))
+        self.output_chars += len(converted)
+        # The chained digest lets a resume detect edits to already converted input
+        self.digest = extend_digest(self.digest, fingerprint)
+        self.journal.record_chunk(self.completed, self.output_bytes, digest=self.digest)
+
+    def close(self):
+        """Close the journal, output and chunk store"""
+        # The journal flushes the output before its final sync
+        self.journal.close()
+        if self.out is not None:
+            self.out.close()
+            self.out = None
+        if self.store is not None:
+            self.store.close()
+
+def convert_file(input_file, output_file, font_key, backend='remote', record_file=None, cache=None,
+                 dedup_words=False, concurrency=1, resume=None, incremental=True,
+                 chunking='fixed', server=None, on_chunk=None, passthrough=True, on_outage='defer',
+                 route=DEFAULT_ROUTE, raise_errors=False):
+    """Stream input file through the converter in chunks, appending to output file as chunks complete.
+    
+    With incremental set, converted chunks are kept in a per-output chunk store so a
+    re-run after editing the input only sends the chunks whose content changed.
+    With chunking='content' chunk boundaries follow the text rather than fixed offsets,
+    so an insertion near the start does not change every later chunk.
+    With passthrough only Gujarati runs are sent upstream; other text (English, digits,
+    URLs, emoji, whitespace) is copied to the output unchanged.
+    on_outage picks what happens to chunks while an endpoint's circuit breaker is open
+    (see with_outage_fallback). With backend='auto' each chunk goes to the fastest of the
+    backends named in route (cache, offline table, daemon, public endpoint).
+    on_chunk(font_key, converted, input_bytes) is called after each chunk is written.
+    Errors are printed and None is returned, or with raise_errors they are raised to the
+    caller once progress is saved.
+    """
+    return convert_file_multi(input_file, {font_key: output_file}, backend=backend,
+                              record_file=record_file, cache=cache, dedup_words=dedup_words,
+                              concurrency=concurrency, resume=resume, incremental=incremental,
+                              chunking=chunking, server=server, on_chunk=on_chunk,
+                              passthrough=passthrough, on_outage=on_outage, route=route,
+                              raise_errors=raise_errors)
+
+def convert_file_multi(input_file, outputs, backend='remote', record_file=None, cache=None,
+                       dedup_words=False, concurrency=1, resume=None, incremental=True,
+                       chunking='fixed', server=None, on_chunk=None, passthrough=True, on_outage='defer',
+                       route=DEFAULT_ROUTE, raise_errors=False):
+    """Convert one input file to several fonts in a single pass.
+    
+    outputs maps font key -> output file. The input is read and segmented once and every
+    chunk is scheduled for all endpoints together; each endpoint's results are streamed
+    to its own output in order. Fonts sharing an endpoint differ only in font_family, so
+    the first font of each group is converted and its output is copied.
+    With server set, remote chunks are sent to a conversion daemon instead of upstream.
+    on_chunk(font_key, converted, input_bytes), if given, is called in order after each
+    chunk is written, with the UTF-8 size of the input read up to the end of that chunk;
+    an exception it raises (e.g. ConversionStopped) stops the run with progress saved.
+    With raise_errors the error that stopped a run is raised instead of only printed.
+    """
+    targets = []
+    try:
+        plan = plan_endpoints(outputs)
+        targets = [EndpointTarget(api_url, font_keys, outputs) for api_url, font_keys in plan.items()]
+        # Local work has no API limit (offline tables, word dedup); chunks shared by several
+        # endpoints must fit the smallest payload limit among them
+        if backend == 'offline' or dedup_words:
+            chunk_size = BLOCK_SIZE
+        else:
+            chunk_size = min(target.font_info['max_payload'] for target in targets)
+        # Word dedup already sends nothing but Gujarati words
+        passthrough = passthrough and backend != 'offline' and not dedup_words
+        mode = f"{backend}{'+dedup' if dedup_words and backend != 'offline' else ''}"
         
-        if final_text.strip():
-            print(f"Final text preview: {final_text[:100]}...")
-            
-            # Write to file
-            Path(output_file).write_text(final_text, encoding="utf-8")
+        print(f"Input file: {input_file}")
+        print(f"Input size: {Path(input_file).stat().st_size:,} bytes")
+        print(f"Backend: {backend}{' (word dedup)' if mode.endswith('+dedup') else ''}"
+              f"{' (Gujarati runs only)' if passthrough else ''}")
+        if server and backend != 'offline':
+            print(f"Conversion server: {server}")
+        if backend == 'auto':
+            print(f"Backend route: {' -> '.join(route)} (fastest first once timed)")
+        if backend != 'offline':
+            print(f"When an endpoint is down: {on_outage}")
+        print(f"Chunk size: {chunk_size} characters ({chunking} boundaries)")
+        if len(outputs) > 1:
+            print(f"📋 {len(outputs)} fonts share {len(plan)} endpoints")
+        for target in targets:
+            target.setup(backend, record_file, cache, dedup_words, incremental, server, passthrough, on_outage,
+                         route)
+            target.job = {
+                "input_file": str(input_file),
+                "font_key": target.font_key,
+                "mode": mode,
+                "chunk_size": chunk_size,
+                "chunking": chunking,
+                "passthrough": passthrough
+            }
+            print(f"\n🌐 Endpoint {target.api_url} -> {', '.join([target.font_key, *target.copies])}")
+            print(f"Output file: {target.output_file}")
+            print(f"Selected font: {target.font_info['name']} ({target.font_key})")
+            print(f"Font family: {target.font_info['font_family']}")
+            if target.store is not None:
+                print(f"Chunk store: {target.store.path} ({target.store.stats()['entries']} chunks)")
+        
+        # Check for existing progress (one question covers every resumable output)
+        states = {target.api_url: target.check_resume(input_file) for target in targets}
+        if any(states.values()):
+            if resume is None:
+                if sys.stdin.isatty():
+                    resume = input("Resume from where you left off? (y/n): ").lower().strip() == 'y'
+                else:
+                    resume = True
+            if not resume:
+                print("Starting fresh conversion...")
+        for target in targets:
+            target.open(states[target.api_url] if resume else None)
+        
+        first_chunk = min(target.start_chunk for target in targets)
+        tasks = {}
+        total_chunks = first_chunk
+        
+        def schedule(chunks):
+            """Yield one task per chunk and endpoint, skipping outputs that are already past it"""
+            nonlocal total_chunks
+            index = 0
+            input_bytes = 0
+            for i, chunk in enumerate(chunks):
+                input_bytes += len(chunk.encode('utf-8'))
+                # Chunks before the checkpoint are re-segmented but not converted again;
+                # they are still part of this revision, so the chunk store keeps them
+                for target in targets:
+                    if i < target.start_chunk and target.store is not None:
+                        target.store.touch(target.api_url, chunk)
+                if i < first_chunk:
+                    continue
+                total_chunks = i + 1
+                fingerprint = chunk_fingerprint(chunk)
+                for target in targets:
+                    if i >= target.start_chunk:
+                        tasks[index] = (target, fingerprint, input_bytes)
+                        index += 1
+                        yield target, chunk
+        
+        def convert_task(task):
+            target, chunk = task
+            return target.convert_one(chunk)
+        
+        def on_result(index, converted):
+            """Stream a converted chunk to its endpoint's output (called in task order)"""
+            target, fingerprint, input_bytes = tasks.pop(index)
+            target.write(converted, fingerprint)
+            log(f"  ✅ Chunk {target.completed} ({target.font_key}) received: "
+                f"{converted[:30] if converted else 'EMPTY'}...")
+            if on_chunk is not None:
+                on_chunk(target.font_key, converted, input_bytes)
+        
+        with open_text(input_file) as src:
+            chunks = iter_chunks(src, chunk_size, chunker=get_chunker(chunking, passthrough))
+            tasks_iter = schedule(chunks)
+            print(f"\n🔄 Converting from chunk {first_chunk + 1} ({concurrency} in flight)...")
+            try:
+                run_conversion(tasks_iter, convert_task, concurrency, on_result)
+                for target in targets:
+                    target.journal.sync()
+            except ChunkConversionError as e:
+                target = tasks[e.index][0]
+                print(f"  ❌ Failed to convert chunk {target.completed + 1} ({target.font_key}): {e.error}")
+                print(f"  💾 Progress saved ({', '.join(f'{t.font_key}: {t.completed}' for t in targets)} chunks). "
+                      f"You can resume later.")
+                if raise_errors:
+                    raise
+                return
+        
+        for target in targets:
+            target.journal.close()
+            target.out.close()
+        print(f"\nConverted text length: "
+              f"{', '.join(f'{t.font_key}: {t.output_chars:,}' for t in targets)} characters written this run")
+        if cache is not None:
+            stats = cache.stats()
+            print(f"Cache: {stats['hits']} hits, {stats['misses']} misses "
+                  f"({stats['hit_rate'] * 100:.1f}% hit rate, {stats['entries']} entries)")
+        for target in targets:
+            # Only the 'auto' backend has a choice worth reporting
+            if backend == 'auto':
+                for name, counts in target.router.stats().get(target.font_key, {}).items():
+                    latency = '-' if counts['latency_ms'] is None else f"{counts['latency_ms']:.1f} ms"
+                    print(f"Backend {name} ({target.font_key}): {counts['hits']} converted, "
+                          f"{counts['misses']} missed, {counts['errors']} failed, "
+                          f"{counts['deferred']} deferred, {latency} per attempt")
+        for target in targets:
+            if target.store is not None:
+                print(f"Chunk store ({target.font_key}): reused {target.store.hits} unchanged chunks, "
+                      f"sent {target.store.misses} new or edited chunks")
+        
+        if total_chunks == 0:
+            print("Input file is empty!")
+            for target in targets:
+                target.journal.remove()
+                Path(target.output_file).unlink()
+            return
+        
+        for target in targets:
+            file_size = Path(target.output_file).stat().st_size
+            print(f"✅ File created successfully! Size: {file_size} bytes")
+            print(f"✅ Output saved to: {target.output_file}")
+            print(f"✅ Font used: {target.font_info['name']}")
             
-            # Verify file was created
-            if Path(output_file).exists():
-                file_size = Path(output_file).stat().st_size
-                print(f"✅ File created successfully! Size: {file_size} bytes")
-                print(f"✅ Output saved to: {output_file}")
-                print(f"✅ Font used: {font_info['name']}")
-                
-                # Clean up progress file on success
-                cleanup_progress(output_file)
-            else:
-                print("❌ File was not created!")
-        else:
-            print("❌ No converted text to save (empty result)")
+            # Clean up progress journal on success; the chunk store is kept for the next revision
+            target.journal.remove()
+            print(f"Progress journal cleaned up: {target.journal.path}")
+            if target.store is not None:
+                removed = target.store.prune()
+                if removed:
+                    print(f"Chunk store: dropped {removed} chunks of older revisions")
+            for font_key, output_file in target.copies.items():
+                shutil.copyfile(target.output_file, output_file)
+                print(f"✅ Reused {target.font_key} output for {font_key}: {output_file}")
+        return True
         
+    except ChunkConversionError:
+        # Only raised with raise_errors, after the failure was reported above
+        raise
     except FileNotFoundError:
         print(f"Input file '{input_file}' not found!")
         print("Please create the input file with your Gujarati Unicode text.")
+        if raise_errors:
+            raise
     except Exception as e:
         print(f"Error: {e}")
+        if raise_errors:
+            raise
+    finally:
+        for target in targets:
+            target.close()
+
+def font_outputs(output_file, font_keys):
+    """Output file of every font key; with several fonts the key is added to the file name"""
+    if len(font_keys) == 1:
+        return {font_keys[0]: str(output_file)}
+    output = Path(output_file)
+    return {font_key: str(output.with_name(f"{output.stem}_{font_key}{output.suffix}"))
+            for font_key in font_keys}
+
+def default_output_dir(input_dir):
+    """Batch output directory next to the input directory (<input_dir>_converted)"""
+    input_dir = Path(input_dir).resolve()
+    return str(input_dir.with_name(f"{input_dir.name}_converted"))
+
+def find_batch_inputs(input_dir, pattern, output_dir):
+    """Input files matching pattern, skipping anything inside the output directory"""
+    output_dir = Path(output_dir).resolve()
+    inputs = []
+    for path in sorted(Path(input_dir).glob(pattern)):
+        if path.is_file() and output_dir not in path.resolve().parents:
+            inputs.append(path)
+    return inputs
+
+def convert_batch_file(input_file, outputs, options):
+    """Convert one file of a directory batch; returns (succeeded, seconds).
+    
+    Top-level so it can run in a worker process as well as a worker thread.
+    """
+    started = time.monotonic()
+    succeeded = convert_file_multi(input_file, outputs, **options)
+    return bool(succeeded), time.monotonic() - started
+
+def init_batch_worker(fonts, delays, circuit, verbosity):
+    """Give a batch worker process the parent's fonts and settings.
+    
+    Spawned workers (Windows, macOS) re-import this module, so fonts loaded from files,
+    calibrated limits and command line settings would otherwise be missing there.
+    """
+    set_verbosity(verbosity)
+    for key, font in fonts.items():
+        registry.add(key, **{field: value for field, value in font.items() if field != 'endpoint'})
+    configure_rate_limits(*delays)
+    configure_circuit_breakers(*circuit)
+
+def batch_process_pool(workers, mp_context=None):
+    """Process pool whose workers start with this process's fonts and settings"""
+    return ProcessPoolExecutor(max_workers=workers, mp_context=mp_context, initializer=init_batch_worker,
+                               initargs=(dict(GUJARATI_FONTS), rate_limit_settings(),
+                                         circuit_breaker_settings(), get_verbosity()))
+
+def convert_batch(input_dir, font_keys, pattern='*.txt', output_dir=None, workers=4, backend='remote',
+                  record_file=None, cache=None, dedup_words=False, concurrency=1, resume=None,
+                  incremental=True, chunking='fixed', server=None, passthrough=True, on_outage='defer',
+                  route=DEFAULT_ROUTE):
+    """Convert every file matching pattern in input_dir, several files at a time.
+    
+    Offline conversion is CPU bound and runs in a process pool. Remote conversion runs
+    files on worker threads of this process, so every request still goes through the
+    shared per-host rate limiter and chunk cache. Each finished file is recorded in
+    <output_dir>/manifest.jsonl; files already done with the same settings are skipped.
+    """
+    output_dir = output_dir or default_output_dir(input_dir)
+    inputs = find_batch_inputs(input_dir, pattern, output_dir)
+    job = {
+        "font_keys": list(font_keys),
+        "backend": backend,
+        "dedup_words": dedup_words,
+        "chunking": chunking,
+        "passthrough": passthrough
+    }
+    manifest = RunManifest.for_output_dir(output_dir, input_dir)
+    manifest.load()
+    
+    pending = []
+    for input_file in inputs:
+        if manifest.is_done(input_file, job):
+            continue
+        output_file = Path(output_dir) / input_file.relative_to(input_dir)
+        pending.append((input_file, font_outputs(output_file, font_keys)))
+    
+    print(f"📂 Batch: {len(inputs)} files matching '{pattern}' in {input_dir}")
+    print(f"   Output directory: {output_dir}")
+    print(f"   Manifest: {manifest.path}")
+    print(f"   Already done: {len(inputs) - len(pending)}, to convert: {len(pending)}")
+    
+    options = {
+        "backend": backend,
+        "record_file": record_file,
+        "dedup_words": dedup_words,
+        "concurrency": concurrency,
+        # Worker processes and threads cannot prompt, so a found journal is resumed
+        "resume": True if resume is None else resume,
+        "incremental": incremental,
+        "chunking": chunking,
+        "server": server,
+        "passthrough": passthrough,
+        "on_outage": on_outage,
+        "route": route
+    }
+    if backend == 'offline':
+        executor = batch_process_pool(workers)
+    else:
+        executor = ThreadPoolExecutor(max_workers=workers)
+        options["cache"] = cache
+    
+    failed = 0
+    try:
+        with executor:
+            futures = {executor.submit(convert_batch_file, str(input_file), outputs, options):
+                       (input_file, outputs) for input_file, outputs in pending}
+            for done, future in enumerate(as_completed(futures), 1):
+                input_file, outputs = futures[future]
+                try:
+                    succeeded, seconds = future.result()
+                    error = None
+                except Exception as e:
+                    succeeded, seconds, error = False, 0.0, str(e)
+                status = 'done' if succeeded else 'failed'
+                manifest.record(input_file, status, outputs, seconds, error=error, **job)
+                if not succeeded:
+                    failed += 1
+                print(f"[{done}/{len(pending)}] {'✅' if succeeded else '❌'} {input_file} ({seconds:.1f}s)")
+    finally:
+        manifest.close()
+    
+    print(f"\n📋 Batch finished: {len(pending) - failed} converted, {failed} failed, "
+          f"{len(inputs) - len(pending)} skipped")
+    print(f"📋 Manifest: {manifest.path}")
+    return failed == 0
+
+def print_metrics_summary():
+    """Per-endpoint request, retry, cache and wait totals of this run"""
+    summary = get_metrics().summary()
+    if not summary:
+        return
+    print("\n📊 Endpoint metrics:")
+    for name, endpoint in summary.items():
+        latency = endpoint['latency_seconds']
+        print(f"   {name} ({', '.join(endpoint['fonts'])}): {endpoint['requests']} requests, "
+              f"{endpoint['retries']} retries, {latency['sum']:.1f}s in requests "
+              f"(mean {latency['mean'] * 1000:.0f} ms), {endpoint['sleep_seconds']:.1f}s rate-limited, "
+              f"{endpoint['cache_hits']} cache hits, statuses {endpoint['statuses']}")
+    for name, breaker in circuit_stats().items():
+        print(f"   ⚡ {name}: circuit opened {breaker['opens']} times, {breaker['rejected']} requests "
+              f"refused while down (now {breaker['state']})")
+
+def export_metrics(json_file=None, prom_file=None):
+    """Print the metrics summary and write the requested metrics exports"""
+    print_metrics_summary()
+    metrics = get_metrics()
+    if json_file:
+        metrics.write(json_file, 'json')
+        print(f"📊 Metrics written to {json_file}")
+    if prom_file:
+        metrics.write(prom_file, 'prometheus')
+        print(f"📊 Metrics written to {prom_file}")
 
 def list_fonts():
     """List all available fonts"""
@@ -253,8 +585,12 @@ def list_fonts():
     
     for font_key, font_info in GUJARATI_FONTS.items():
         print(f"🔤 {font_info['name']} (key: {font_key})")
+        if font_info['aliases']:
+            print(f"   Aliases: {', '.join(font_info['aliases'])}")
         print(f"   Font Family: {font_info['font_family']}")
-        print(f"   API: {font_info['url']}")
+        print(f"   API: {font_info['url']} (endpoint group {font_info['endpoint']}, "
+              f"max payload {font_info['max_payload']} characters)")
+        print(f"   Offline table: {'yes' if has_offline_table(font_key) else 'no'}")
         print()
 
 def main():
@@ -263,44 +599,183 @@ def main():
                         help='Input file path (default: txts/input.txt)')
     parser.add_argument('-o', '--output', 
                         help='Output file path (auto-generated if not specified)')
+    parser.add_argument('--input-dir',
+                        help='Convert every file matching --glob in this directory (batch mode)')
+    parser.add_argument('--glob', default='*.txt',
+                        help="File pattern for --input-dir, e.g. '**/*.txt' (default: *.txt)")
+    parser.add_argument('--output-dir',
+                        help='Batch output directory (default: <input-dir>_converted)')
+    parser.add_argument('-w', '--workers', type=int, default=4,
+                        help='Files converted at the same time in batch mode (default: 4)')
     parser.add_argument('-f', '--font', default='shree0768', 
-                        help='Font key to use for conversion (default: shree0768)')
+                        help="Font key(s) to use for conversion, comma separated, or 'all' (default: shree0768)")
+    parser.add_argument('--fonts-file', metavar='FILE',
+                        help='Load extra font definitions (JSON, or TOML on Python 3.11+) '
+                             'in addition to ~/.gujarati_converter/fonts.json')
     parser.add_argument('-l', '--list-fonts', action='store_true',
                         help='List all available fonts and exit')
+    parser.add_argument('-b', '--backend', choices=['remote', 'offline', 'auto'], default='remote',
+                        help='Conversion backend: remote API, offline mapping table, or auto to use the '
+                             'fastest of --route for each chunk (default: remote)')
+    parser.add_argument('--route', default=','.join(DEFAULT_ROUTE),
+                        help=f'Backends the auto backend may use, in fallback order '
+                             f'(default: {",".join(DEFAULT_ROUTE)})')
+    parser.add_argument('--record', metavar='FILE',
+                        help='Append Unicode/converted pairs to a JSONL file for table_learner.py')
+    parser.add_argument('--dedup-words', action='store_true',
+                        help='Send each distinct word upstream once and rebuild the document locally')
+    parser.add_argument('--send-all', dest='passthrough', action='store_false',
+                        help='Send non-Gujarati text (English, digits, URLs, emoji, whitespace) upstream '
+                             'too instead of keeping it verbatim')
+    parser.add_argument('-j', '--concurrency', type=int, default=1,
+                        help='Number of chunks converted in parallel (default: 1)')
+    resume_group = parser.add_mutually_exclusive_group()
+    resume_group.add_argument('--resume', dest='resume', action='store_true', default=None,
+                              help='Resume from the progress journal without asking')
+    resume_group.add_argument('--no-resume', dest='resume', action='store_false',
+                              help='Ignore any progress journal and start fresh')
+    parser.add_argument('--no-incremental', dest='incremental', action='store_false',
+                        help='Do not keep a per-output chunk store for incremental re-conversion')
+    parser.add_argument('--chunking', choices=sorted(CHUNKERS), default='fixed',
+                        help='Chunk boundaries: fixed-size packing, or content-defined so edits '
+                             'only change nearby chunks (default: fixed)')
+    parser.add_argument('--server', nargs='?', const=DEFAULT_SERVER_URL, metavar='URL',
+                        help=f'Send remote conversions through a conversion daemon '
+                             f'(conversion_server.py, default URL: {DEFAULT_SERVER_URL})')
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH),
+                        help=f'Chunk cache database (default: {DEFAULT_CACHE_PATH})')
+    parser.add_argument('--no-cache', action='store_true',
+                        help='Disable the chunk cache')
+    parser.add_argument('--cache-max-mb', type=float, default=DEFAULT_MAX_BYTES / (1024 * 1024),
+                        help='Maximum chunk cache size in MB (default: %(default)s)')
+    parser.add_argument('--cache-max-entries', type=int, default=DEFAULT_MAX_ENTRIES,
+                        help='Maximum number of cached chunks (default: %(default)s)')
+    verbosity_group = parser.add_mutually_exclusive_group()
+    verbosity_group.add_argument('-v', '--verbose', dest='verbosity', action='store_const', const=2, default=1,
+                                 help='Print per-request details (encoding, content type, samples)')
+    verbosity_group.add_argument('-q', '--quiet', dest='verbosity', action='store_const', const=0,
+                                 help='Do not print per-chunk progress and retry messages')
+    parser.add_argument('--metrics-json', metavar='FILE',
+                        help='Write per-endpoint metrics as JSON at the end of the run')
+    parser.add_argument('--metrics-prom', metavar='FILE',
+                        help='Write per-endpoint metrics in Prometheus text format at the end of the run')
+    parser.add_argument('--on-outage', choices=OUTAGE_FALLBACKS, default='defer',
+                        help='While an endpoint is down: requeue its chunks until it recovers, convert them '
+                             'with the offline table, or only use cached chunks and fail the rest (default: defer)')
+    parser.add_argument('--circuit-threshold', type=int, default=DEFAULT_FAILURE_THRESHOLD,
+                        help=f'Consecutive failed requests that mark an endpoint as down '
+                             f'(default: {DEFAULT_FAILURE_THRESHOLD})')
+    parser.add_argument('--circuit-cooldown', type=float, default=DEFAULT_RESET_TIMEOUT,
+                        help=f'Seconds before a down endpoint is tried again (default: {DEFAULT_RESET_TIMEOUT:g})')
     parser.add_argument('--min-delay', type=float, default=2.0,
-                        help=f'Minimum delay between requests (default: 2.0)')
+                        help=f'Minimum delay between requests, i.e. the maximum request rate (default: 2.0)')
     parser.add_argument('--max-delay', type=float, default=5.0,
-                        help=f'Maximum delay between requests (default: 5.0)')
+                        help=f'Maximum delay the rate limiter backs off to when throttled (default: 5.0)')
     
     args = parser.parse_args()
+    registry.load_user_files()
+    
+    if args.fonts_file:
+        try:
+            print(f"🔤 Loaded fonts: {', '.join(registry.load(args.fonts_file))}")
+        except (OSError, ValueError) as e:
+            print(f"❌ Could not load fonts from {args.fonts_file}: {e}")
+            return
     
     if args.list_fonts:
         list_fonts()
         return
     
-    # Validate font
-    if args.font not in GUJARATI_FONTS:
-        print(f"❌ Unknown font key: {args.font}")
-        print("Use --list-fonts to see available fonts")
-        return
+    # Validate fonts
+    if args.font.strip().lower() == 'all':
+        font_keys = list(GUJARATI_FONTS)
+    else:
+        font_keys = []
+        # Keys, display names and aliases are all accepted
+        for label in (label.strip() for label in args.font.split(',')):
+            if not label:
+                continue
+            font_key = resolve_font(label)
+            if font_key is None:
+                print(f"❌ Unknown font key: {label}")
+                print("Use --list-fonts to see available fonts")
+                return
+            font_keys.append(font_key)
+    for font_key in font_keys:
+        if args.backend == 'offline' and not has_offline_table(font_key):
+            print(f"❌ No offline table available for font: {font_key}")
+            print("Use --list-fonts to see which fonts support offline conversion")
+            return
     
     # Update delay settings
     global MIN_DELAY, MAX_DELAY
+    set_verbosity(args.verbosity)
     MIN_DELAY = args.min_delay
     MAX_DELAY = args.max_delay
+    configure_rate_limits(MIN_DELAY, MAX_DELAY)
+    configure_circuit_breakers(args.circuit_threshold, args.circuit_cooldown)
+    route = tuple(name.strip() for name in args.route.split(',') if name.strip())
+    try:
+        build_router(route)
+    except ValueError as e:
+        print(f"❌ {e}")
+        return
     
-    # Generate output filename if not specified
-    if not args.output:
-        font_info = get_font_info(args.font)
-        args.output = f"txts/{get_next_output_filename(font_info['name'])}"
+    cache = None
+    # A conversion daemon keeps its own cache; the auto backend still answers from the local one first
+    if not args.no_cache and (not args.server or args.backend == 'auto'):
+        cache = ChunkCache(args.cache, max_entries=args.cache_max_entries,
+                           max_bytes=int(args.cache_max_mb * 1024 * 1024))
+    
+    if args.input_dir:
+        try:
+            convert_batch(args.input_dir, font_keys, pattern=args.glob, output_dir=args.output_dir,
+                          workers=args.workers, backend=args.backend, record_file=args.record,
+                          cache=cache, dedup_words=args.dedup_words, concurrency=args.concurrency,
+                          resume=args.resume, incremental=args.incremental, chunking=args.chunking,
+                          server=args.server, passthrough=args.passthrough,
+                          on_outage=args.on_outage, route=route)
+        finally:
+            if cache is not None:
+                cache.close()
+            export_metrics(args.metrics_json, args.metrics_prom)
+        return
+    
+    # Generate output filenames if not specified
+    if args.output:
+        outputs = font_outputs(args.output, font_keys)
+    else:
+        outputs = {}
+        for font_key in font_keys:
+            font_info = get_font_info(font_key)
+            outputs[font_key] = f"txts/{get_next_output_filename(font_info['name'])}"
     
     print(f"🚀 Starting conversion...")
     print(f"   Input: {args.input}")
-    print(f"   Output: {args.output}")
-    print(f"   Font: {get_font_info(args.font)['name']}")
+    print(f"   Output: {', '.join(outputs.values())}")
+    print(f"   Font: {', '.join(get_font_info(key)['name'] for key in font_keys)}")
+    print(f"   Backend: {args.backend}")
     print(f"   Delays: {MIN_DELAY}-{MAX_DELAY} seconds")
     
-    convert_file(args.input, args.output, args.font)
+    try:
+        if len(font_keys) == 1:
+            convert_file(args.input, outputs[font_keys[0]], font_keys[0], backend=args.backend,
+                         record_file=args.record, cache=cache, dedup_words=args.dedup_words,
+                         concurrency=args.concurrency, resume=args.resume,
+                         incremental=args.incremental, chunking=args.chunking,
+                         server=args.server, passthrough=args.passthrough,
+                         on_outage=args.on_outage, route=route)
+        else:
+            convert_file_multi(args.input, outputs, backend=args.backend,
+                               record_file=args.record, cache=cache, dedup_words=args.dedup_words,
+                               concurrency=args.concurrency, resume=args.resume,
+                               incremental=args.incremental, chunking=args.chunking,
+                               server=args.server, passthrough=args.passthrough,
+                               on_outage=args.on_outage, route=route)
+    finally:
+        if cache is not None:
+            cache.close()
+        export_metrics(args.metrics_json, args.metrics_prom)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
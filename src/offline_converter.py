@@ -0,0 +1,152 @@
+# Offline table-driven Unicode -> legacy Gujarati converter
+import json
+from font_mapping import OFFLINE_TABLE_DIR, registry
+from segmenter import VIRAMA, NUKTA, RA, ZWJ, ZWNJ, MODIFIERS, is_consonant, is_matra, is_gujarati, split_aksharas
+
+# Directory holding one mapping table per API endpoint (e.g. GetShree0768Text.json)
+TABLE_DIR = OFFLINE_TABLE_DIR
+
+class OfflineTableError(Exception):
+    """Raised when no usable offline table exists or text cannot be mapped"""
+
+class OfflineConverter:
+    """Convert Unicode Gujarati to a legacy glyph encoding using a mapping table.
+
+    Table format (JSON):
+        syllables       - whole-akshara mappings, tried first (longest match)
+        conjuncts       - consonant cluster mappings such as "ક્ષ" or "ત્ર"
+        glyphs          - single characters: consonants, vowels, matras, marks, digits
+        half_forms      - consonant -> half glyph used before another consonant
+        reph, rakar     - glyphs for a leading "ર્" and a trailing "્ર"
+        virama          - glyph for an explicit halant
+        pre_base_matras - matras drawn before the consonant cluster (usually "િ")
+        reph_position   - "end" (after matras) or "base" (right after the cluster)
+    """
+
+    def __init__(self, table):
+        self.name = table.get('name', 'unknown')
+        self.syllables = table.get('syllables', {})
+        self.conjuncts = table.get('conjuncts', {})
+        self.glyphs = table.get('glyphs', {})
+        self.half_forms = table.get('half_forms', {})
+        self.reph = table.get('reph')
+        self.rakar = table.get('rakar')
+        self.virama = table.get('virama', '')
+        self.pre_base_matras = set(table.get('pre_base_matras', ['િ']))
+        self.reph_position = table.get('reph_position', 'end')
+        self.max_conjunct = max((len(k) for k in self.conjuncts), default=0)
+        self._cache = {}
+
+    @classmethod
+    def from_file(cls, path):
+        """Load a converter from a JSON table file"""
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def convert(self, text, strict=True):
+        """Convert a Unicode string; non-Gujarati characters pass through unchanged"""
+        out = []
+        for akshara in split_aksharas(text):
+            key = (akshara, strict)
+            converted = self._cache.get(key)
+            if converted is None:
+                converted = self.convert_akshara(akshara, strict)
+                self._cache[key] = converted
+            out.append(converted)
+        return "".join(out)
+
+    def convert_akshara(self, akshara, strict=True):
+        """Convert one akshara, applying reph, half-form and pre-base matra reordering"""
+        if akshara in self.syllables:
+            return self.syllables[akshara]
+        if not is_gujarati(akshara[0]):
+            return self.glyphs.get(akshara, akshara)
+
+        # Separate the consonant cluster from trailing matras and modifiers
+        split = len(akshara)
+        while split > 0 and (is_matra(akshara[split - 1]) or akshara[split - 1] in MODIFIERS):
+            split -= 1
+        cluster, signs = akshara[:split], akshara[split:]
+        if cluster in self.syllables and not signs:
+            return self.syllables[cluster]
+
+        reph = ''
+        if (self.reph is not None and len(cluster) > 2 and cluster[0] == RA
+                and cluster[1] == VIRAMA and is_consonant(cluster[2])):
+            reph = self.reph
+            cluster = cluster[2:]
+
+        pre, post = [], []
+        for sign in signs:
+            glyph = self._glyph(sign, strict)
+            (pre if sign in self.pre_base_matras else post).append(glyph)
+
+        body = self._convert_cluster(cluster, strict)
+        if self.reph_position == 'base':
+            return "".join(pre) + body + reph + "".join(post)
+        return "".join(pre) + body + "".join(post) + reph
+
+    def _convert_cluster(self, cluster, strict):
+        out = []
+        i = 0
+        n = len(cluster)
+        while i < n:
+            # Longest known conjunct starting here
+            for length in range(min(self.max_conjunct, n - i), 1, -1):
+                piece = cluster[i:i + length]
+                if piece in self.conjuncts:
+                    out.append(self.conjuncts[piece])
+                    i += length
+                    break
+            else:
+                char = cluster[i]
+                if char in (ZWJ, ZWNJ):
+                    i += 1
+                    continue
+                if (i + 1 < n and cluster[i + 1] == NUKTA
+                        and cluster[i:i + 2] in self.glyphs):
+                    char = cluster[i:i + 2]
+                following = cluster[i + len(char):]
+                if following.startswith(VIRAMA):
+                    rest = following[1:].lstrip(ZWJ + ZWNJ)
+                    if rest[:1] == RA and self.rakar is not None and len(rest) == 1:
+                        out.append(self._glyph(char, strict) + self.rakar)
+                        i = n
+                        continue
+                    if rest and char in self.half_forms:
+                        out.append(self.half_forms[char])
+                    else:
+                        out.append(self._glyph(char, strict) + self.virama)
+                    i += len(char) + 1
+                else:
+                    out.append(self._glyph(char, strict))
+                    i += len(char)
+        return "".join(out)
+
+    def _glyph(self, char, strict):
+        if char in self.glyphs:
+            return self.glyphs[char]
+        if strict and is_gujarati(char):
+            raise OfflineTableError(f"No glyph for '{char}' (U+{ord(char):04X}) in table {self.name}")
+        return char
+
+_converters = {}
+
+def get_table_path(font_key):
+    """Get the table path for a font key (tables are shared by all fonts on one endpoint)"""
+    return registry.offline_table_path(font_key)
+
+def has_offline_table(font_key):
+    """Check whether a font key can be converted offline"""
+    return registry.has_offline(font_key)
+
+def get_offline_converter(font_key):
+    """Get a (cached) offline converter for a font key"""
+    path = get_table_path(font_key)
+    if path not in _converters:
+        if not path.exists():
+            raise OfflineTableError(
+                f"No offline table for '{font_key}' (expected {path}). "
+                "Record API results with --record and build one with table_learner.py")
+        _converters[path] = OfflineConverter.from_file(path)
+    return _converters[path]
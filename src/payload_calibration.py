@@ -0,0 +1,210 @@
+# Measure the largest payload each conversion endpoint converts correctly
+import argparse
+import json
+from datetime import datetime
+from pathlib import Path
+import requests
+from font_mapping import endpoint_name, payload_limits_path, registry, resolve_font, use_api_base
+from segmenter import pack_chunks
+from chunk_cache import ChunkCache, Fallback
+from rate_limiter import DEFAULT_MAX_DELAY, DEFAULT_MIN_DELAY, configure_rate_limits, get_rate_limiter, parse_retry_after
+from endpoint_client import convert_chunk_with_session
+from sample_text import sample_text
+
+# Largest payload tried and the granularity of the search (characters)
+DEFAULT_CEILING = 2000
+DEFAULT_STEP = 50
+
+# Throttled probes are asked again; anything else is an answer about the payload
+PROBE_ATTEMPTS = 3
+
+def normalize(text):
+    """Compare conversions without caring how the endpoint trims blanks and line ends"""
+    return ' '.join(text.split())
+
+def probe(session, api_url, payload):
+    """Send payload once; returns the converted text, or None if the endpoint failed on it"""
+    limiter = get_rate_limiter(api_url)
+    for _ in range(PROBE_ATTEMPTS):
+        limiter.acquire()
+        try:
+            resp = session.post(api_url, data={"modify_string": payload}, timeout=60)
+        except requests.exceptions.RequestException:
+            # Large bodies are often answered by dropping the connection
+            return None
+        if resp.status_code in (403, 429):
+            # Throttling says nothing about the payload, so wait and ask again
+            limiter.on_throttle(parse_retry_after(resp.headers.get('Retry-After')))
+            continue
+        if resp.status_code != 200:
+            return None
+        limiter.on_success()
+        resp.encoding = 'utf-8'
+        return resp.text
+    raise RuntimeError(f"{endpoint_name(api_url)} kept throttling the calibration")
+
+class EndpointCalibration:
+    """Binary search for the largest payload one endpoint converts correctly.
+
+    The sample is cut into pieces of about step characters, which are converted one by
+    one on the normal (cached) path as the reference. A probe sends the first k pieces
+    as one payload and passes when the endpoint answers with the reference conversion
+    of those pieces; truncated, empty and failed answers all count as too large.
+    """
+
+    def __init__(self, session, api_url, sample, step=DEFAULT_STEP, cache=None):
+        self.session = session
+        self.api_url = api_url
+        self.cache = cache
+        self.pieces = pack_chunks(sample, step)
+        self.reference = []
+        self.probes = []
+
+    def expected(self, count):
+        """Reference conversion of the first count pieces"""
+        while len(self.reference) < count:
+            piece = self.pieces[len(self.reference)]
+            converted = convert_chunk_with_session(self.session, piece, self.api_url, cache=self.cache)
+            if isinstance(converted, Fallback):
+                raise RuntimeError(f"{endpoint_name(self.api_url)} did not convert a {len(piece)} "
+                                   f"character reference piece")
+            self.reference.append(converted)
+        return ''.join(self.reference[:count])
+
+    def accepts(self, count):
+        """Whether the endpoint converts the first count pieces correctly in one payload"""
+        payload = ''.join(self.pieces[:count])
+        converted = probe(self.session, self.api_url, payload)
+        passed = converted is not None and normalize(converted) == normalize(self.expected(count))
+        self.probes.append((len(payload), passed))
+        print(f"  {'✅' if passed else '❌'} {len(payload):,} characters")
+        return passed
+
+    def run(self):
+        """Largest payload length (characters) that converted correctly, 0 if none did"""
+        good, bad = 0, len(self.pieces) + 1
+        # The full sample first: most endpoints take it and the search ends at once
+        if self.accepts(len(self.pieces)):
+            good = len(self.pieces)
+        else:
+            bad = len(self.pieces)
+        while bad - good > 1:
+            middle = (good + bad) // 2
+            if self.accepts(middle):
+                good = middle
+            else:
+                bad = middle
+        return len(''.join(self.pieces[:good]))
+
+def load_limits(path):
+    """Stored calibration results, {endpoint: result}"""
+    try:
+        with open(path, encoding='utf-8') as f:
+            return json.load(f).get('endpoints', {})
+    except (OSError, ValueError):
+        return {}
+
+def save_limits(results, path):
+    """Merge results into the stored limits (endpoints not calibrated now are kept)"""
+    endpoints = load_limits(path)
+    endpoints.update(results)
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(path.name + '.tmp')
+    with open(tmp, 'w', encoding='utf-8') as f:
+        json.dump({"endpoints": endpoints}, f, indent=2, sort_keys=True)
+    tmp.replace(path)
+
+def calibrate(endpoints, sample, step=DEFAULT_STEP, cache=None):
+    """Calibrate each endpoint (name -> URL); returns {endpoint: result} for those that converted"""
+    results = {}
+    session = requests.Session()
+    for endpoint, api_url in endpoints.items():
+        print(f"📏 {endpoint}")
+        calibration = EndpointCalibration(session, api_url, sample, step, cache)
+        try:
+            max_payload = calibration.run()
+        except RuntimeError as e:
+            print(f"  ⚠️ Skipped: {e}")
+            continue
+        if not max_payload:
+            print(f"  ⚠️ Not even {step} characters converted correctly; keeping the current limit")
+            continue
+        ceiling = len(''.join(calibration.pieces))
+        print(f"  ➡️ max payload {max_payload:,} characters"
+              f"{' (the whole sample; raise --ceiling to look further)' if max_payload >= ceiling else ''}")
+        results[endpoint] = {
+            "max_payload": max_payload,
+            "ceiling": ceiling,
+            "step": step,
+            "probes": len(calibration.probes),
+            "calibrated": datetime.now().isoformat(timespec='seconds')
+        }
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(
+        description='Find the largest payload each conversion endpoint converts correctly')
+    parser.add_argument('-f', '--font', default='all',
+                        help="Fonts whose endpoints to calibrate, comma separated or 'all' (default: all)")
+    parser.add_argument('--ceiling', type=int, default=DEFAULT_CEILING,
+                        help=f'Largest payload to try in characters (default: {DEFAULT_CEILING})')
+    parser.add_argument('--step', type=int, default=DEFAULT_STEP,
+                        help=f'Search granularity in characters (default: {DEFAULT_STEP})')
+    parser.add_argument('--sample', help='Gujarati text file to probe with (default: synthetic text)')
+    parser.add_argument('--min-delay', type=float, default=DEFAULT_MIN_DELAY,
+                        help=f'Minimum delay between requests (default: {DEFAULT_MIN_DELAY})')
+    parser.add_argument('--max-delay', type=float, default=DEFAULT_MAX_DELAY,
+                        help=f'Maximum back-off delay (default: {DEFAULT_MAX_DELAY})')
+    parser.add_argument('--upstream', metavar='URL',
+                        help='Calibrate another converter (e.g. a mock at http://127.0.0.1:8766/gujarati)')
+    parser.add_argument('--limits-file',
+                        help=f'Where results are stored (default: {payload_limits_path()}, the file the '
+                             f'converters apply; required with --upstream)')
+    parser.add_argument('--dry-run', action='store_true', help='Only print the results')
+    parser.add_argument('--no-cache', action='store_true', help='Do not use the chunk cache for reference pieces')
+    args = parser.parse_args()
+    registry.load_user_files()
+
+    if args.step < 1 or args.ceiling < args.step:
+        parser.error('--ceiling must be at least --step, and --step at least 1')
+    if args.upstream:
+        use_api_base(args.upstream)
+    configure_rate_limits(args.min_delay, args.max_delay)
+
+    endpoints = {}
+    labels = [label.strip() for label in args.font.split(',') if label.strip()]
+    for label in (list(registry.fonts) if args.font == 'all' else labels):
+        font_key = resolve_font(label)
+        if font_key is None:
+            parser.error(f"unknown font key: {label}")
+        # Fonts sharing an endpoint share its limit, so each endpoint is probed once
+        font_info = registry.get(font_key)
+        endpoints.setdefault(font_info['endpoint'], font_info['url'])
+
+    if args.sample:
+        with open(args.sample, encoding='utf-8') as f:
+            sample = f.read()[:args.ceiling]
+    else:
+        sample = sample_text(args.ceiling, seed=0)[:args.ceiling]
+
+    cache = None if args.no_cache else ChunkCache()
+    try:
+        results = calibrate(endpoints, sample, args.step, cache)
+    finally:
+        if cache is not None:
+            cache.close()
+    if not results or args.dry_run:
+        return
+    if args.upstream and not args.limits_file:
+        # Limits of another converter must not change the chunk size used for the real endpoints
+        print("⚠️ Not saved: results from --upstream are only stored with an explicit --limits-file")
+        return
+    limits_file = args.limits_file or payload_limits_path()
+    save_limits(results, limits_file)
+    print(f"💾 Saved {len(results)} endpoint limits to {limits_file}")
+    if Path(limits_file).resolve() != payload_limits_path().resolve():
+        print(f"   Set GUJARATI_PAYLOAD_LIMITS_FILE={limits_file} to convert with these limits")
+
+if __name__ == "__main__":
+    main()
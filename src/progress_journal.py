@@ -0,0 +1,140 @@
+# Append-only progress journal (JSONL, one record per completed chunk)
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+
+# Records appended between fsyncs, and between automatic compactions
+DEFAULT_FSYNC_EVERY = 20
+DEFAULT_COMPACT_EVERY = 10000
+
+def journal_path(output_file):
+    """Journal file that tracks the progress of one output file"""
+    return Path(f"{output_file}.journal.jsonl")
+
+class ProgressJournal:
+    """Crash-safe append-only journal of conversion progress.
+
+    The first record is a header describing the job; every completed chunk appends a
+    record with the cumulative output size. Appends cost O(1); records are fsynced in
+    batches and the journal is periodically compacted into a single snapshot record.
+    A torn last line (from a crash mid-write) is ignored and trimmed on load.
+    """
+
+    def __init__(self, path, fsync_every=DEFAULT_FSYNC_EVERY, compact_every=DEFAULT_COMPACT_EVERY,
+                 on_sync=None):
+        self.path = Path(path)
+        # Called before every fsync, e.g. to flush the output the records point into
+        self.on_sync = on_sync
+        self.fsync_every = fsync_every
+        self.compact_every = compact_every
+        self.header = None
+        self.state = None
+        self._file = None
+        self._unsynced = 0
+        self._records = 0
+
+    @classmethod
+    def for_output(cls, output_file, **kwargs):
+        """Journal for an output file (<output>.journal.jsonl)"""
+        return cls(journal_path(output_file), **kwargs)
+
+    def exists(self):
+        """Check whether a journal exists on disk"""
+        return self.path.exists()
+
+    def load(self):
+        """Read the journal and return (header, last state), trimming a torn tail"""
+        self.header = None
+        self.state = None
+        self._records = 0
+        if not self.path.exists():
+            return None, None
+        good_end = 0
+        with open(self.path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    record = json.loads(line.decode('utf-8'))
+                except (UnicodeDecodeError, json.JSONDecodeError):
+                    break
+                good_end += len(line)
+                self._records += 1
+                if record.get('type') == 'header':
+                    self.header = record
+                else:
+                    self.state = record
+        if good_end < self.path.stat().st_size:
+            with open(self.path, 'r+b') as f:
+                f.truncate(good_end)
+        return self.header, self.state
+
+    def start(self, **header):
+        """Start a new journal (discarding any previous one) with a header record"""
+        self.close()
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = open(self.path, 'w', encoding='utf-8')
+        self._records = 0
+        self.header = dict(header, type='header', timestamp=datetime.now().isoformat())
+        self.state = None
+        self._append(self.header)
+        self.sync()
+
+    def reopen(self):
+        """Continue appending to an existing journal after load()"""
+        self.close()
+        self._file = open(self.path, 'a', encoding='utf-8')
+
+    def record_chunk(self, completed_chunks, output_bytes, **extra):
+        """Append one completed-chunk record"""
+        self.state = dict(extra, type='chunk', completed_chunks=completed_chunks, output_bytes=output_bytes)
+        self._append(self.state)
+        if self._unsynced >= self.fsync_every:
+            self.sync()
+        if self._records >= self.compact_every:
+            self.compact()
+
+    def _append(self, record):
+        self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        self._unsynced += 1
+        self._records += 1
+
+    def sync(self):
+        """Flush and fsync pending records"""
+        if self._file and self._unsynced:
+            if self.on_sync:
+                self.on_sync()
+            self._file.flush()
+            os.fsync(self._file.fileno())
+            self._unsynced = 0
+
+    def compact(self):
+        """Rewrite the journal as its header plus one snapshot of the latest state"""
+        self.sync()
+        tmp = self.path.with_name(self.path.name + '.tmp')
+        with open(tmp, 'w', encoding='utf-8') as f:
+            for record in (self.header, self.state):
+                if record:
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        was_open = self._file is not None
+        self.close()
+        os.replace(tmp, self.path)
+        self._records = 2 if self.state else 1
+        if was_open:
+            self.reopen()
+
+    def close(self):
+        """Sync and close the journal file"""
+        if self._file:
+            self.sync()
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        """Delete the journal after a successful run"""
+        self.close()
+        if self.path.exists():
+            self.path.unlink()
@@ -0,0 +1,135 @@
+# Adaptive token-bucket rate limiting shared by all workers talking to one host
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+# Default ceilings, expressed as the delays the GUIs and CLI already expose
+DEFAULT_MIN_DELAY = 2.0  # fastest allowed spacing -> max rate 0.5 req/s
+DEFAULT_MAX_DELAY = 5.0  # slowest spacing AIMD backs off to -> min rate 0.2 req/s
+
+def rate_from_delay(delay):
+    """Convert a delay in seconds to a request rate (None means unlimited)"""
+    return 1.0 / delay if delay and delay > 0 else None
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds to wait"""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if when.tzinfo is None:
+        when = when.replace(tzinfo=timezone.utc)
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+class AdaptiveRateLimiter:
+    """Token bucket whose rate follows AIMD between min_rate and max_rate.
+
+    Successful responses raise the rate additively up to max_rate; 429/403/503
+    responses and network errors cut it multiplicatively down to min_rate, and a
+    Retry-After header blocks every worker until it expires. An idle bucket holds
+    `burst` tokens, so requests that the budget allows are sent without waiting.
+    Without a max_rate the bucket is unlimited until the first throttle, which drops
+    it to min_rate (or the default slowest rate) to climb back from there.
+    """
+
+    def __init__(self, max_rate=None, min_rate=None, burst=1, increase=0.05, decrease=0.5):
+        self.burst = burst
+        self.increase = increase
+        self.decrease = decrease
+        self.set_limits(max_rate, min_rate)
+        self.rate = self.max_rate
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.blocked_until = 0.0
+        self.total_wait = 0.0
+        self.throttles = 0
+        self._lock = threading.Lock()
+
+    def set_limits(self, max_rate, min_rate=None):
+        """Set the rate ceilings (requests per second; None for max_rate means unlimited)"""
+        self.max_rate = max_rate
+        if max_rate is None:
+            self.min_rate = min_rate
+        else:
+            self.min_rate = min(min_rate, max_rate) if min_rate else max_rate / 10
+        rate = getattr(self, 'rate', None)
+        if rate is not None and max_rate is not None:
+            self.rate = max(self.min_rate, min(rate, max_rate))
+        else:
+            self.rate = max_rate
+
+    def acquire(self):
+        """Wait until a request may be sent; returns the seconds waited"""
+        with self._lock:
+            now = time.monotonic()
+            wait = max(0.0, self.blocked_until - now)
+            if self.rate is not None:
+                self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+                self.last = now
+                # Reserve a token; a negative balance is the queue of waiting requests
+                self.tokens -= 1
+                if self.tokens < 0:
+                    wait = max(wait, -self.tokens / self.rate)
+            self.total_wait += wait
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def on_success(self):
+        """Additive increase after a successful response"""
+        with self._lock:
+            if self.rate is not None:
+                self.rate += self.increase
+                if self.max_rate is not None:
+                    self.rate = min(self.max_rate, self.rate)
+
+    def on_throttle(self, retry_after=None):
+        """Multiplicative decrease after a 429/403/503 or network error"""
+        with self._lock:
+            self.throttles += 1
+            floor = self.min_rate or rate_from_delay(DEFAULT_MAX_DELAY)
+            if self.rate is None:
+                # Unlimited so far: retries must not go out as fast as the requests that were refused
+                self.rate = floor
+                self.tokens = min(self.tokens, 0.0)
+                self.last = time.monotonic()
+            else:
+                self.rate = max(floor, self.rate * self.decrease)
+            if retry_after:
+                self.blocked_until = max(self.blocked_until, time.monotonic() + retry_after)
+
+_limiters = {}
+_delays = (DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY)
+_limits = (rate_from_delay(DEFAULT_MIN_DELAY), rate_from_delay(DEFAULT_MAX_DELAY))
+_registry_lock = threading.Lock()
+
+def configure_rate_limits(min_delay, max_delay):
+    """Set the rate ceilings for all hosts from the user's min/max delay settings"""
+    global _delays, _limits
+    with _registry_lock:
+        _delays = (min_delay, max_delay)
+        _limits = (rate_from_delay(min_delay), rate_from_delay(max_delay))
+        for limiter in _limiters.values():
+            limiter.set_limits(*_limits)
+
+def rate_limit_settings():
+    """The (min_delay, max_delay) last given to configure_rate_limits"""
+    with _registry_lock:
+        return _delays
+
+def get_rate_limiter(api_url):
+    """Get the limiter shared by every endpoint on the API's host"""
+    host = urlparse(api_url).netloc
+    with _registry_lock:
+        if host not in _limiters:
+            _limiters[host] = AdaptiveRateLimiter(*_limits)
+        return _limiters[host]
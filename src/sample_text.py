@@ -0,0 +1,16 @@
+# Synthetic Gujarati text for load tests and payload calibration
+import random
+
+SAMPLE_WORDS = ['ગુજરાતી', 'ભાષા', 'સ્ત્રી', 'ક્ષત્રિય', 'અને', 'પ્રેમ', 'રાષ્ટ્ર', 'હું', 'તમે',
+                'શાળામાં', 'વિદ્યાર્થી', 'દ્વારા', 'છે.', 'કમળ', 'નદી', '\n']
+
+def sample_text(size, seed=None):
+    """Synthetic Gujarati text of about size characters"""
+    rng = random.Random(seed)
+    words = []
+    length = 0
+    while length < size:
+        word = rng.choice(SAMPLE_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return ' '.join(words)
@@ -0,0 +1,87 @@
+# Send only Gujarati-script runs upstream; English, digits, URLs, emoji and whitespace stay local
+import re
+from segmenter import DEFAULT_CHUNK_SIZE, pack_chunks
+from word_dedup import DEFAULT_DELIMITER, WordDedupPlan
+
+# Gujarati-block characters (plus joiners), and the punctuation and blanks that may sit
+# between Gujarati words inside one run. Newlines always end a run: they delimit payloads.
+GUJARATI_CHARS = '[઀-૿‌‍]'
+RUN_GAP_CHARS = '[ \t,.;:!?\'"()\\-।॥]'
+MAX_RUN_GAP = 4
+RUN_RE = re.compile(f'({GUJARATI_CHARS}+(?:{RUN_GAP_CHARS}{{1,{MAX_RUN_GAP}}}{GUJARATI_CHARS}+)*)')
+
+# Characters of local text one chunk carries at most, so input without Gujarati still streams
+MAX_CHUNK_LENGTH = 16 * 1024
+
+class ScriptRunPlan(WordDedupPlan):
+    """Pack the Gujarati runs of a block into payloads; all other text is kept verbatim"""
+
+    def tokenize(self, text):
+        tokens = []
+        for i, token in enumerate(RUN_RE.split(text)):
+            if i % 2 and len(token) > self.size:
+                # Runs longer than a payload are cut like pack_chunks(), joined by empty separators
+                for j, piece in enumerate(pack_chunks(token, self.size)):
+                    if j:
+                        tokens.append('')
+                    tokens.append(piece)
+            else:
+                tokens.append(token)
+        return tokens
+
+    def stats(self):
+        """Get run, payload and local character counts"""
+        return {
+            "runs": len(self.words_in_text),
+            "distinct_runs": len(self.distinct),
+            "payloads": len(self.payloads),
+            "local_chars": sum(len(token) for token in self.tokens[0::2])
+        }
+
+def convert_gujarati_runs(text, convert_fn, size, delimiter=DEFAULT_DELIMITER):
+    """Convert a block of text, sending only its Gujarati runs upstream.
+
+    The block is a chunk_cache.Fallback when any of its runs came back as one, so the
+    rebuilt text is not stored as a conversion.
+    """
+    return ScriptRunPlan(text, size, delimiter).convert(convert_fn)
+
+def pack_gujarati_chunks(text, size=DEFAULT_CHUNK_SIZE, delimiter=DEFAULT_DELIMITER):
+    """Split text into chunks whose Gujarati runs fit in one payload of size characters.
+
+    Text outside the runs is never sent, so it does not count towards the limit: each
+    run costs its length plus a delimiter, and a chunk takes up to MAX_CHUNK_LENGTH
+    characters of local text around its runs. Runs longer than size are cut like
+    pack_chunks(). A boundary can depend on the run after it (a run cut short by the end
+    of a block may pack differently once complete), so iter_chunks() may cut a stream
+    in other places than one call on the whole text; its chunks keep the same limits.
+    """
+    chunks = []
+    current = []
+    cost = 0
+    length = 0
+    for i, token in enumerate(RUN_RE.split(text)):
+        if not i % 2:
+            while length + len(token) > MAX_CHUNK_LENGTH:
+                take = max(0, MAX_CHUNK_LENGTH - length)
+                current.append(token[:take])
+                chunks.append(''.join(current))
+                current = []
+                cost = length = 0
+                token = token[take:]
+            current.append(token)
+            length += len(token)
+            continue
+        for piece in (pack_chunks(token, size) if len(token) > size else [token]):
+            extra = len(piece) + (len(delimiter) if cost else 0)
+            if cost and cost + extra > size:
+                chunks.append(''.join(current))
+                current = []
+                cost = length = 0
+                extra = len(piece)
+            current.append(piece)
+            cost += extra
+            length += len(piece)
+    if length:
+        chunks.append(''.join(current))
+    return chunks
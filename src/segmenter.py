@@ -0,0 +1,172 @@
+# Akshara-aware text segmentation for API payloads
+import hashlib
+
+# Default payload limit of the conversion endpoints (characters)
+DEFAULT_CHUNK_SIZE = 200
+
+# Gujarati script character classes
+VIRAMA = '્'
+NUKTA = '઼'
+RA = 'ર'
+ZWJ = '‍'
+ZWNJ = '‌'
+MODIFIERS = 'ઁંઃ'  # candrabindu, anusvara, visarga
+
+def is_consonant(char):
+    """Check if a character is a Gujarati consonant"""
+    return 'ક' <= char <= 'હ' or char == 'ૹ'
+
+def is_matra(char):
+    """Check if a character is a Gujarati dependent vowel sign"""
+    return ('ા' <= char <= 'ૌ' and char != VIRAMA) or char in 'ૢૣ'
+
+def is_gujarati(char):
+    """Check if a character belongs to the Gujarati block"""
+    return '઀' <= char <= '૿'
+
+def iter_aksharas(text):
+    """Yield aksharas (syllables) so that no conjunct or matra is separated from its base"""
+    i = 0
+    n = len(text)
+    while i < n:
+        start = i
+        char = text[i]
+        i += 1
+        if is_consonant(char):
+            # Consonant cluster: C (nukta) (virama [ZWJ/ZWNJ] C (nukta))*
+            while i < n and text[i] == NUKTA:
+                i += 1
+            while i < n and text[i] == VIRAMA:
+                j = i + 1
+                while j < n and text[j] in (ZWJ, ZWNJ):
+                    j += 1
+                if j < n and is_consonant(text[j]):
+                    i = j + 1
+                    while i < n and text[i] == NUKTA:
+                        i += 1
+                else:
+                    # Dead consonant at the end of a word
+                    i = j if j > i + 1 else i + 1
+                    break
+        if is_consonant(char) or 'અ' <= char <= 'ઔ' or char in 'ૠૡ':
+            while i < n and is_matra(text[i]):
+                i += 1
+            while i < n and (text[i] in MODIFIERS or text[i] == NUKTA):
+                i += 1
+        yield text[start:i]
+
+def split_aksharas(text):
+    """Split text into a list of aksharas"""
+    return list(iter_aksharas(text))
+
+# Preferred chunk boundaries, best first
+SENTENCE_ENDS = '।॥\n.?!'
+
+def pack_chunks(text, size=DEFAULT_CHUNK_SIZE, sentence_fill=0.8):
+    """Split text into chunks of at most size characters without cutting inside an akshara.
+    
+    Each chunk is filled as close to size as possible. The cut is placed after the last
+    sentence end (danda, newline, full stop) if that keeps the chunk at least sentence_fill
+    full, otherwise after the last whitespace, otherwise at the last akshara boundary.
+    """
+    chunks = []
+    start = 0
+    pos = 0
+    last_sentence = last_space = last_akshara = 0
+    min_sentence = int(size * sentence_fill)
+    for akshara in iter_aksharas(text):
+        end = pos + len(akshara)
+        while end - start > size:
+            if last_sentence - start >= min_sentence:
+                cut = last_sentence
+            elif last_space > start:
+                cut = last_space
+            elif last_akshara > start:
+                cut = last_akshara
+            else:
+                # Single akshara longer than the limit: nothing better than a hard cut
+                cut = start + size
+            chunks.append(text[start:cut])
+            start = cut
+        pos = end
+        last_akshara = end
+        last_char = akshara[-1]
+        if last_char in SENTENCE_ENDS:
+            last_sentence = end
+        if last_char.isspace():
+            last_space = end
+    if start < len(text):
+        chunks.append(text[start:])
+    return chunks
+
+# Rolling (gear) hash for content-defined chunking: one pseudo-random 32-bit value per
+# low code point byte (the Gujarati block U+0A80-0AFF does not collide with ASCII)
+GEAR = [int.from_bytes(hashlib.sha256(bytes([i])).digest()[:4], 'big') for i in range(256)]
+HASH_BITS = 32
+HASH_LIMIT = (1 << HASH_BITS) - 1
+
+def boundary_mask(size, min_size):
+    """Hash mask giving roughly three content-defined cut chances between min_size and size.
+
+    The mask uses the high bits of the hash, which depend on the last ~32 characters
+    rather than only the last few.
+    """
+    bits = max(1, ((size - min_size) // 3).bit_length() - 1)
+    return ((1 << bits) - 1) << (HASH_BITS - bits)
+
+def content_defined_chunks(text, size=DEFAULT_CHUNK_SIZE, min_size=None):
+    """Split text into chunks whose boundaries depend on the content, not on offsets.
+
+    A rolling hash is computed over each chunk and the chunk is cut after the first
+    akshara (at least min_size into the chunk) where the hash matches the boundary mask.
+    Inserting or deleting text only changes the chunks around the edit: later chunks
+    resynchronise at the same content boundaries. If no boundary is found before the
+    chunk reaches size characters, it is cut like pack_chunks() (last whitespace,
+    otherwise last akshara). Like pack_chunks() the result never cuts inside an akshara.
+    """
+    if min_size is None:
+        min_size = size // 2
+    mask = boundary_mask(size, min_size)
+    chunks = []
+    start = 0
+    pos = 0
+    last_space = last_akshara = 0
+    candidate = False
+    digest = 0
+    for akshara in iter_aksharas(text):
+        # A boundary after the previous akshara is only final once the next one has started
+        if candidate:
+            chunks.append(text[start:pos])
+            start = pos
+            digest = 0
+        end = pos + len(akshara)
+        while end - start > size:
+            if last_space > start:
+                cut = last_space
+            elif last_akshara > start:
+                cut = last_akshara
+            else:
+                # Single akshara longer than the limit: nothing better than a hard cut
+                cut = start + size
+            chunks.append(text[start:cut])
+            start = cut
+            # The hash of the new chunk covers only its own text
+            digest = 0
+            for char in text[start:pos]:
+                digest = ((digest << 1) + GEAR[ord(char) & 0xFF]) & HASH_LIMIT
+        for char in akshara:
+            digest = ((digest << 1) + GEAR[ord(char) & 0xFF]) & HASH_LIMIT
+        pos = end
+        last_akshara = end
+        if akshara[-1].isspace():
+            last_space = end
+        candidate = end - start >= min_size and not digest & mask
+    if start < len(text):
+        chunks.append(text[start:])
+    return chunks
+
+# Chunking modes: fixed-size packing or content-defined boundaries
+CHUNKERS = {
+    'fixed': pack_chunks,
+    'content': content_defined_chunks,
+}
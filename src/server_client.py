@@ -0,0 +1,40 @@
+# Client for the local conversion daemon (conversion_server.py)
+import requests
+from async_engine import TransientConversionError
+from circuit_breaker import CircuitOpenError
+from chunk_cache import Fallback
+
+DEFAULT_SERVER_URL = 'http://127.0.0.1:8765'
+
+# The daemon may hold a request while its rate limiter waits for the upstream
+SERVER_TIMEOUT = 300
+
+def convert_via_server(session, server_url, font_key, text, backend='remote'):
+    """Convert text through a conversion daemon using session (a Fallback when the daemon had no clean conversion)"""
+    try:
+        resp = session.post(f"{server_url.rstrip('/')}/convert",
+                            json={"text": text, "font": font_key, "backend": backend},
+                            timeout=SERVER_TIMEOUT)
+    except requests.exceptions.RequestException as e:
+        raise TransientConversionError(f"Conversion server unreachable: {e}")
+    if resp.status_code != 200:
+        try:
+            body = resp.json()
+        except ValueError:
+            body = {}
+        error = body.get('error', resp.text)
+        if resp.status_code == 503 and 'retry_in' in body:
+            # The daemon's circuit for the endpoint is open: defer like a local breaker would
+            raise CircuitOpenError(f"{server_url} upstream", body['retry_in'])
+        # The daemon answers 4xx for requests it can never serve (e.g. an unknown font)
+        error_type = TransientConversionError if resp.status_code >= 500 else RuntimeError
+        raise error_type(f"Conversion server error {resp.status_code}: {error}")
+    body = resp.json()
+    # The daemon flags text it could not convert cleanly, so it is never cached or stored here
+    return Fallback(body['converted']) if body.get('fallback') else body['converted']
+
+def get_server_fonts(server_url):
+    """Fonts offered by a conversion daemon (font key -> font info)"""
+    resp = requests.get(f"{server_url.rstrip('/')}/fonts", timeout=30)
+    resp.raise_for_status()
+    return resp.json()
@@ -0,0 +1,45 @@
+# Streaming text I/O: compressed files and incremental akshara-safe segmentation
+import gzip
+import lzma
+from segmenter import pack_chunks
+
+# Characters read from the input per step
+READ_SIZE = 1 << 20
+
+COMPRESSED_SUFFIXES = ('.gz', '.xz')
+
+def is_compressed(path):
+    """Check if a path is handled as a compressed file"""
+    return str(path).lower().endswith(COMPRESSED_SUFFIXES)
+
+def open_text(path, mode='r'):
+    """Open a UTF-8 text file, transparently (de)compressing .gz and .xz.
+
+    Line endings are passed through unchanged (newline='').
+    """
+    path = str(path)
+    lower = path.lower()
+    if lower.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8', newline='')
+    if lower.endswith('.xz'):
+        return lzma.open(path, mode + 't', encoding='utf-8', newline='')
+    return open(path, mode, encoding='utf-8', newline='')
+
+def iter_chunks(stream, size, read_size=READ_SIZE, chunker=pack_chunks):
+    """Yield akshara-safe chunks from a text stream without reading it all into memory.
+
+    The last chunk of every block may end inside an akshara, so it is carried into the
+    next block. With pack_chunks() the result is identical to chunker() on the whole
+    text; other chunkers may cut differently next to a block end, but every chunk keeps
+    their size and akshara guarantees and the chunks always join up to the input.
+    """
+    carry = ''
+    while True:
+        block = stream.read(read_size)
+        if not block:
+            break
+        chunks = chunker(carry + block, size)
+        carry = chunks.pop()
+        yield from chunks
+    if carry:
+        yield carry
@@ -0,0 +1,201 @@
+# Learn offline mapping tables from recorded Unicode -> legacy API results
+import json
+import argparse
+import threading
+from collections import Counter, defaultdict
+from datetime import datetime
+from pathlib import Path
+from font_mapping import endpoint_name, registry
+from offline_converter import TABLE_DIR, OfflineConverter
+from segmenter import MODIFIERS, NUKTA, RA, VIRAMA, ZWJ, ZWNJ, split_aksharas, is_consonant, is_matra
+
+_record_lock = threading.Lock()
+
+def record_pair(record_file, api_url, source, converted):
+    """Append one Unicode -> legacy pair to a JSONL recording file"""
+    record = {
+        "endpoint": endpoint_name(api_url),
+        "source": source,
+        "converted": converted,
+        "timestamp": datetime.now().isoformat()
+    }
+    with _record_lock, open(record_file, 'a', encoding='utf-8') as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+def load_pairs(paths, endpoint):
+    """Load recorded (source, converted) pairs for one endpoint from JSONL files"""
+    pairs = []
+    for path in paths:
+        with open(path, 'r', encoding='utf-8') as f:
+            for line in f:
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                if record.get('endpoint') == endpoint:
+                    pairs.append((record['source'], record['converted']))
+    return pairs
+
+def starts_inside_akshara(text):
+    """Whether text begins with a mark that belongs to an akshara before it"""
+    return bool(text) and (is_matra(text[0]) or text[0] in (VIRAMA, NUKTA, ZWJ, ZWNJ) or text[0] in MODIFIERS)
+
+def ends_inside_akshara(text):
+    """Whether text ends in the middle of a conjunct"""
+    return bool(text) and text[-1] in (VIRAMA, ZWJ)
+
+def align_words(source, converted):
+    """Pair whitespace-separated words of a chunk with the words of its conversion.
+
+    The chunkers cut at akshara boundaries, so an edge word is dropped only when the
+    payload was cut inside an akshara (a hard cut of an over-long akshara). A word cut
+    between aksharas still converts akshara by akshara, so it is a usable pair.
+    """
+    src_words = source.split()
+    out_words = converted.split()
+    if len(src_words) != len(out_words):
+        return []
+    words = list(zip(src_words, out_words))
+    if words and starts_inside_akshara(source):
+        words = words[1:]
+    if words and ends_inside_akshara(source):
+        words = words[:-1]
+    return words
+
+def _vote(votes, min_count):
+    """Pick the most common candidate for each key"""
+    table = {}
+    for key, counter in votes.items():
+        value, count = counter.most_common(1)[0]
+        if count >= min_count:
+            table[key] = value
+    return table
+
+def learn_syllables(word_pairs, min_count=1, max_rounds=10):
+    """Infer an akshara-level table from aligned word pairs.
+
+    Single-akshara words map directly. For longer words, once every akshara but one
+    is known, the unknown one is whatever remains after stripping the known prefix
+    and suffix from the converted word. This repeats until nothing new is learned.
+    """
+    words = Counter(word_pairs)
+    syllables = {}
+    for _ in range(max_rounds):
+        votes = defaultdict(Counter)
+        for (word, out), count in words.items():
+            aksharas = split_aksharas(word)
+            unknown = [i for i, a in enumerate(aksharas) if a not in syllables]
+            if len(unknown) != 1:
+                continue
+            k = unknown[0]
+            prefix = "".join(syllables[a] for a in aksharas[:k])
+            suffix = "".join(syllables[a] for a in aksharas[k + 1:])
+            if out.startswith(prefix) and out.endswith(suffix) and len(out) > len(prefix) + len(suffix):
+                votes[aksharas[k]][out[len(prefix):len(out) - len(suffix)]] += count
+        learned = _vote(votes, min_count)
+        if not learned:
+            break
+        syllables.update(learned)
+    return syllables
+
+def derive_components(syllables):
+    """Derive glyph, matra, half-form and reph entries so unseen aksharas can be composed"""
+    glyphs = {a: out for a, out in syllables.items() if len(a) == 1}
+    matra_votes = defaultdict(Counter)
+    pre_base_votes = Counter()
+    half_votes = defaultdict(Counter)
+    reph_votes = Counter()
+    for akshara, out in syllables.items():
+        if len(akshara) == 2 and is_consonant(akshara[0]) and is_matra(akshara[1]):
+            base = glyphs.get(akshara[0])
+            if base and out.startswith(base):
+                matra_votes[akshara[1]][out[len(base):]] += 1
+            elif base and out.endswith(base):
+                matra_votes[akshara[1]][out[:-len(base)]] += 1
+                pre_base_votes[akshara[1]] += 1
+        elif len(akshara) == 3 and akshara[1] == VIRAMA and is_consonant(akshara[2]):
+            base = glyphs.get(akshara[2])
+            if not base:
+                continue
+            if akshara[0] == RA and out.startswith(base):
+                reph_votes[out[len(base):]] += 1
+            elif out.endswith(base):
+                half_votes[akshara[0]][out[:-len(base)]] += 1
+    for matra, glyph in _vote(matra_votes, 1).items():
+        glyphs.setdefault(matra, glyph)
+    return {
+        "glyphs": glyphs,
+        "half_forms": _vote(half_votes, 1),
+        "reph": reph_votes.most_common(1)[0][0] if reph_votes else None,
+        "pre_base_matras": sorted(pre_base_votes) or ['િ']
+    }
+
+def build_table(endpoint, pairs, min_count=1):
+    """Build a loadable offline table for one endpoint from recorded pairs"""
+    word_pairs = []
+    for source, converted in pairs:
+        word_pairs.extend(align_words(source, converted))
+    syllables = learn_syllables(word_pairs, min_count=min_count)
+    table = {
+        "name": endpoint,
+        "endpoint": endpoint,
+        "source": "learned",
+        "generated": datetime.now().isoformat(),
+        "syllables": syllables
+    }
+    table.update(derive_components(syllables))
+    if table['reph'] is None:
+        del table['reph']
+
+    # Measure how well the table reproduces the recorded words
+    converter = OfflineConverter(table)
+    correct = 0
+    for word, out in word_pairs:
+        try:
+            if converter.convert(word) == out:
+                correct += 1
+        except Exception:
+            pass
+    table['stats'] = {
+        "pairs": len(pairs),
+        "words": len(word_pairs),
+        "syllables": len(syllables),
+        "word_accuracy": round(correct / len(word_pairs), 4) if word_pairs else 0.0
+    }
+    return table
+
+def main():
+    registry.load_user_files()
+    endpoints = sorted(registry.endpoints())
+    parser = argparse.ArgumentParser(description='Learn an offline mapping table from recorded API results')
+    parser.add_argument('pairs', nargs='+',
+                        help='JSONL files recorded with multi_font_converter.py --record')
+    parser.add_argument('-e', '--endpoint', required=True, choices=endpoints,
+                        help='API endpoint to learn a table for')
+    parser.add_argument('-o', '--output',
+                        help='Output table path (default: offline_tables/<endpoint>.json)')
+    parser.add_argument('--min-count', type=int, default=1,
+                        help='Minimum observations before a syllable is accepted (default: 1)')
+    args = parser.parse_args()
+
+    pairs = load_pairs(args.pairs, args.endpoint)
+    if not pairs:
+        print(f"❌ No recorded pairs found for endpoint {args.endpoint}")
+        return
+
+    table = build_table(args.endpoint, pairs, min_count=args.min_count)
+    output = Path(args.output) if args.output else TABLE_DIR / f"{args.endpoint}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(table, f, ensure_ascii=False, indent=2)
+
+    stats = table['stats']
+    print(f"✅ Learned {stats['syllables']} syllables from {stats['words']} words ({stats['pairs']} pairs)")
+    print(f"✅ Word accuracy on recorded data: {stats['word_accuracy'] * 100:.1f}%")
+    print(f"✅ Table saved to: {output}")
+
+if __name__ == "__main__":
+    main()
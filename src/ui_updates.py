@@ -0,0 +1,67 @@
+# Frame-rate-limited channel for GUI updates coming from worker threads
+import threading
+
+# Tk updates applied per second at most
+DEFAULT_FPS = 30
+
+class UIUpdateChannel:
+    """Merge progress, status and output updates from worker threads into one Tk update per frame.
+
+    Workers call progress(), status() and append() as often as they like; only the latest
+    progress and status and the concatenation of all appends since the last frame are
+    applied, on the Tk thread, by a pump that runs every 1/fps seconds. The output length
+    is tracked incrementally.
+    """
+
+    def __init__(self, root, on_progress=None, on_status=None, on_output=None, fps=DEFAULT_FPS):
+        self.root = root
+        # on_progress(value, maximum), on_status(text), on_output(text, total_length)
+        self.on_progress = on_progress
+        self.on_status = on_status
+        self.on_output = on_output
+        self.interval = max(1, int(1000 / fps))
+        self.output_length = 0
+        self._lock = threading.Lock()
+        self._progress = None
+        self._status = None
+        self._appends = []
+        self._closed = False
+
+    def start(self):
+        """Start the pump (call on the Tk thread)"""
+        self.root.after(self.interval, self._pump)
+        return self
+
+    def progress(self, value, maximum=None):
+        with self._lock:
+            self._progress = (value, maximum)
+
+    def status(self, text):
+        with self._lock:
+            self._status = text
+
+    def append(self, text):
+        with self._lock:
+            self._appends.append(text)
+            self.output_length += len(text)
+
+    def close(self):
+        """Flush what is pending on the next frame, then stop the pump"""
+        with self._lock:
+            self._closed = True
+
+    def _pump(self):
+        with self._lock:
+            progress, self._progress = self._progress, None
+            status, self._status = self._status, None
+            appends, self._appends = self._appends, []
+            length = self.output_length
+            closed = self._closed
+        if progress is not None and self.on_progress:
+            self.on_progress(*progress)
+        if status is not None and self.on_status:
+            self.on_status(status)
+        if appends and self.on_output:
+            self.on_output(''.join(appends), length)
+        if not closed:
+            self.root.after(self.interval, self._pump)
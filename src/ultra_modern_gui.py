@@ -1,23 +1,16 @@
+import argparse
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox, scrolledtext
-import requests
-import time
-import random
 import json
-import threading
 from pathlib import Path
 from datetime import datetime
-from font_mapping import GUJARATI_FONTS, get_font_list, get_font_info
+from font_mapping import GUJARATI_FONTS, get_font_list, get_font_info, registry, resolve_font
+from server_client import DEFAULT_SERVER_URL
+from gui_controller import BACKENDS, MAX_DELAY, MIN_DELAY, OUTAGE_FALLBACKS, ConversionController
 
-# Settings
-CHUNK_SIZE = 200
-MIN_DELAY = 2
-MAX_DELAY = 5
-MAX_RETRIES = 3
-
-class UltraModernGujaratiGUI:
-    def __init__(self, root):
-        self.root = root
+class UltraModernGujaratiGUI(ConversionController):
+    def __init__(self, root, server_url=None):
+        super().__init__(root, server_url)
         self.root.title("🚀 Ultra-Modern Gujarati Font Converter Pro")
         self.root.geometry("1200x900")
         self.root.minsize(1000, 750)
@@ -43,9 +36,6 @@ class UltraModernGujaratiGUI:
             'shadow': '#0000001A'       # Soft Shadow
         }
         
-        self.conversion_running = False
-        self.session = None
-        self.current_font = 'shree0768'
         self.dark_mode = True
         
         self.setup_styles()
@@ -338,13 +328,56 @@ class UltraModernGujaratiGUI:
                 fg=self.colors['text_primary'],
                 bg=self.colors['bg_card']).grid(row=2, column=0, sticky="w")
         
-        self.chunk_size_var = tk.StringVar(value=str(CHUNK_SIZE))
+        self.chunk_size_var = tk.StringVar(value=str(get_font_info(self.current_font)['max_payload']))
         chunk_entry = ttk.Entry(settings_frame, 
                                textvariable=self.chunk_size_var,
                                style='Modern.TEntry',
                                width=8)
         chunk_entry.grid(row=2, column=1, sticky="ew", padx=(10, 0))
         
+        # Backend
+        tk.Label(settings_frame, text="Backend:", 
+                font=('Segoe UI', 9, 'bold'),
+                fg=self.colors['text_primary'],
+                bg=self.colors['bg_card']).grid(row=3, column=0, sticky="w", pady=(8, 0))
+        
+        self.backend_var = tk.StringVar(value='Online API')
+        backend_combo = ttk.Combobox(settings_frame,
+                                    textvariable=self.backend_var,
+                                    values=list(BACKENDS),
+                                    state='readonly',
+                                    style='Modern.TCombobox',
+                                    width=12)
+        backend_combo.grid(row=3, column=1, sticky="ew", padx=(10, 0), pady=(8, 0))
+        
+        # Parallel requests
+        tk.Label(settings_frame, text="Parallel:", 
+                font=('Segoe UI', 9, 'bold'),
+                fg=self.colors['text_primary'],
+                bg=self.colors['bg_card']).grid(row=4, column=0, sticky="w", pady=(8, 0))
+        
+        self.concurrency_var = tk.StringVar(value='1')
+        concurrency_entry = ttk.Entry(settings_frame, 
+                                     textvariable=self.concurrency_var,
+                                     style='Modern.TEntry',
+                                     width=8)
+        concurrency_entry.grid(row=4, column=1, sticky="ew", padx=(10, 0), pady=(8, 0))
+        
+        # Endpoint outages
+        tk.Label(settings_frame, text="If API Down:", 
+                font=('Segoe UI', 9, 'bold'),
+                fg=self.colors['text_primary'],
+                bg=self.colors['bg_card']).grid(row=5, column=0, sticky="w", pady=(8, 0))
+        
+        self.outage_var = tk.StringVar(value='Wait and Retry')
+        outage_combo = ttk.Combobox(settings_frame,
+                                   textvariable=self.outage_var,
+                                   values=list(OUTAGE_FALLBACKS),
+                                   state='readonly',
+                                   style='Modern.TCombobox',
+                                   width=12)
+        outage_combo.grid(row=5, column=1, sticky="ew", padx=(10, 0), pady=(8, 0))
+        
         settings_frame.columnconfigure(1, weight=1)
         
     def create_convert_section(self, parent):
@@ -361,7 +394,19 @@ class UltraModernGujaratiGUI:
                                     relief='flat',
                                     pady=20,
                                     cursor='hand2')
-        self.convert_btn.pack(fill="x", padx=25, pady=25)
+        self.convert_btn.pack(fill="x", padx=25, pady=(25, 10))
+        
+        self.pause_btn = tk.Button(convert_card,
+                                  text="⏸️ PAUSE",
+                                  command=self.pause_conversion,
+                                  bg=self.colors['bg_secondary'],
+                                  fg=self.colors['text_primary'],
+                                  font=('Segoe UI', 10, 'bold'),
+                                  relief='flat',
+                                  pady=8,
+                                  cursor='hand2',
+                                  state='disabled')
+        self.pause_btn.pack(fill="x", padx=25, pady=(0, 25))
         
         # Add smooth hover effects with transitions
         def on_enter(e):
@@ -425,6 +470,7 @@ class UltraModernGujaratiGUI:
         # Smooth buttons with hover effects
         buttons_data = [
             ("📁 Load File", self.load_from_file),
+            ("📂 Convert File", self.convert_file_to_file),
             ("📝 Sample Text", self.add_sample_text),
             ("💾 Save Output", self.save_to_file)
         ]
@@ -538,32 +584,21 @@ class UltraModernGujaratiGUI:
         self.dark_mode = not self.dark_mode
         messagebox.showinfo("Theme", "Theme toggle feature coming soon! 🚀")
         
-    def update_char_count(self, event=None):
-        """Update character count"""
-        text = self.input_text.get('1.0', tk.END).strip()
-        count = len(text)
-        self.char_count_label.config(text=f"Characters: {count:,}")
-        
     def on_font_change(self, event=None):
         """Handle font selection change"""
         selected = self.font_combo.get()
         
-        # Find the font key based on the display name
-        for key, name in get_font_list():
-            if name == selected:
-                self.current_font = key
-                break
-                
-        # Update font preview
-        font_info = get_font_info(self.current_font)
-        self.font_preview.config(text=font_info['font_family'])
-        
-        # Update output text font
-        try:
-            first_font = font_info['font_family'].replace('"', '').split(',')[0].strip()
-            self.output_text.config(font=(first_font, 12))
-        except:
-            self.output_text.config(font=('Courier New', 12))
+        # Display names are indexed by the font registry
+        self.select_font(resolve_font(selected) or self.current_font)
+            
+    def show_running(self, running):
+        """Switch the convert and pause buttons between a running conversion and idle"""
+        if running:
+            self.convert_btn.config(text="⏳ CONVERTING...", state='disabled', bg=self.colors['warning'])
+            self.pause_btn.config(state='normal')
+        else:
+            self.convert_btn.config(text="🚀 CONVERT TEXT", state='normal', bg=self.colors['secondary'])
+            self.pause_btn.config(state='disabled')
             
     def add_sample_text(self):
         """Add sample Gujarati text"""
@@ -599,6 +634,11 @@ class UltraModernGujaratiGUI:
                 
     def save_to_file(self):
         """Save output to file"""
+        if self.output_file:
+            messagebox.showinfo("Info", f"The converted file is already saved: {self.output_file}\n"
+                                        "The output box only shows its beginning and end.")
+            return
+            
         if not self.output_text.get('1.0', tk.END).strip():
             messagebox.showwarning("Warning", "No converted text to save!")
             return
@@ -619,144 +659,15 @@ class UltraModernGujaratiGUI:
             except Exception as e:
                 messagebox.showerror("Error", f"Could not save file: {e}")
                 
-    def start_conversion(self):
-        """Start the conversion process"""
-        if self.conversion_running:
-            messagebox.showwarning("Warning", "⚠️ Conversion already in progress!")
-            return
-            
-        input_text = self.input_text.get('1.0', tk.END).strip()
-        if not input_text:
-            messagebox.showwarning("Warning", "⚠️ Please enter some text to convert!")
-            return
-            
-        # Start conversion
-        self.conversion_running = True
-        self.convert_btn.config(text="⏳ CONVERTING...", state='disabled', bg=self.colors['warning'])
-        self.output_text.delete('1.0', tk.END)
-        
-        thread = threading.Thread(target=self.convert_text, args=(input_text,))
-        thread.daemon = True
-        thread.start()
-        
-    def convert_text(self, text):
-        """Convert text using API"""
-        try:
-            chunks = self.chunk_text(text)
-            total_chunks = len(chunks)
-            font_info = get_font_info(self.current_font)
-            
-            self.root.after(0, lambda: self.progress.config(maximum=total_chunks, value=0))
-            self.root.after(0, lambda: self.status_label.config(
-                text=f"🚀 Converting {total_chunks} chunks using {font_info['name']}..."))
-            
-            results = []
-            
-            with requests.Session() as session:
-                for i, chunk in enumerate(chunks):
-                    try:
-                        # Update UI
-                        self.root.after(0, lambda i=i: self.progress.config(value=i))
-                        self.root.after(0, lambda i=i, total=total_chunks: self.status_label.config(
-                            text=f"⚡ Processing chunk {i+1}/{total} - {((i+1)/total)*100:.1f}% complete"))
-                        
-                        converted = self.convert_chunk_with_session(session, chunk, font_info['url'])
-                        results.append(converted)
-                        
-                        # Add converted text to output progressively
-                        self.root.after(0, lambda conv=converted: 
-                                      self.output_text.insert(tk.END, conv))
-                        
-                        # Update output stats
-                        current_length = len("".join(results))
-                        self.root.after(0, lambda length=current_length: 
-                                      self.output_stats_label.config(text=f"Output: {length:,} characters"))
-                        
-                    except Exception as e:
-                        error_msg = f"❌ Failed to convert chunk {i+1}: {e}"
-                        self.root.after(0, lambda msg=error_msg: messagebox.showerror("Conversion Error", msg))
-                        break
-                        
-            # Final update
-            final_text = "".join(results)
-            self.root.after(0, lambda: self.progress.config(value=total_chunks))
-            self.root.after(0, lambda: self.status_label.config(
-                text=f"🎉 Conversion complete! {len(final_text):,} characters converted to {font_info['name']}"))
-            
-        except Exception as e:
-            self.root.after(0, lambda e=e: messagebox.showerror("Error", f"❌ Conversion failed: {e}"))
-            self.root.after(0, lambda: self.status_label.config(text="❌ Conversion failed"))
-        finally:
-            self.conversion_running = False
-            self.root.after(0, lambda: self.convert_btn.config(
-                text="🚀 CONVERT TEXT", 
-                state='normal', 
-                bg=self.colors['secondary']))
-            
-    def chunk_text(self, text):
-        """Split text into chunks"""
-        chunk_size = int(self.chunk_size_var.get())
-        return [text[i:i+chunk_size] for i in range(0, len(text), chunk_size)]
-        
-    def convert_chunk_with_session(self, session, chunk, api_url):
-        """Convert a single chunk using the specified API URL"""
-        min_delay = float(self.min_delay_var.get())
-        max_delay = float(self.max_delay_var.get())
-        
-        for retry in range(MAX_RETRIES):
-            try:
-                delay = random.uniform(min_delay, max_delay)
-                if retry > 0:
-                    delay = delay * (2 ** retry)
-                time.sleep(delay)
-                
-                user_agents = [
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36',
-                    'Mozilla/5.0 (Windows NT 10.0; Win64; x64; rv:89.0) Gecko/20100101 Firefox/89.0',
-                ]
-                
-                headers = {
-                    'User-Agent': random.choice(user_agents),
-                    'Accept': 'text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8',
-                    'Accept-Language': 'en-US,en;q=0.5',
-                    'Content-Type': 'application/x-www-form-urlencoded; charset=UTF-8'
-                }
-                
-                resp = session.post(api_url, data={"modify_string": chunk}, headers=headers, timeout=30)
-                
-                if resp.status_code == 200:
-                    resp.encoding = 'utf-8'
-                    converted_text = resp.text
-                    
-                    if len(converted_text.strip()) == 0:
-                        return chunk
-                    elif any(ord(char) < 32 and char not in '\n\r\t' for char in converted_text[:50]):
-                        try:
-                            converted_text = resp.content.decode('utf-8')
-                        except:
-                            return chunk
-                    
-                    return converted_text
-                    
-                elif resp.status_code in [403, 429]:
-                    if retry == MAX_RETRIES - 1:
-                        raise RuntimeError(f"Rate limited/IP banned after {MAX_RETRIES} attempts")
-                    continue
-                else:
-                    if retry == MAX_RETRIES - 1:
-                        raise RuntimeError(f"API error {resp.status_code}")
-                    continue
-                    
-            except requests.exceptions.RequestException as e:
-                if retry == MAX_RETRIES - 1:
-                    raise RuntimeError(f"Network error: {e}")
-                continue
-                
-        return chunk
-
 def main():
+    parser = argparse.ArgumentParser(description='Gujarati Unicode to Non-Unicode Converter')
+    parser.add_argument('--server', nargs='?', const=DEFAULT_SERVER_URL, metavar='URL',
+                        help=f'Send remote conversions through a conversion daemon (default URL: {DEFAULT_SERVER_URL})')
+    args = parser.parse_args()
+    registry.load_user_files()
+    
     root = tk.Tk()
-    app = UltraModernGujaratiGUI(root)
+    app = UltraModernGujaratiGUI(root, server_url=args.server)
     root.mainloop()
 
 if __name__ == "__main__":
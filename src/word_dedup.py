@@ -0,0 +1,151 @@
+# In-document word deduplication: send each distinct word upstream only once
+import re
+import threading
+from collections import OrderedDict
+from chunk_cache import Fallback
+
+# A word is a run of Gujarati-block characters (plus joiners); everything else is kept verbatim
+WORD_RE = re.compile('([઀-૿‌‍]+)')
+
+# Delimiter placed between words in a payload (the endpoints preserve newlines)
+DEFAULT_DELIMITER = '\n'
+
+# Converted words a WordMap keeps (least recently used words are dropped first)
+DEFAULT_WORD_MAP_SIZE = 50000
+
+class WordMap:
+    """Bounded word -> converted word map shared by the blocks of one document.
+
+    Blocks are converted concurrently, so lookups and updates are locked.
+    """
+
+    def __init__(self, max_words=DEFAULT_WORD_MAP_SIZE):
+        self.max_words = max_words
+        self._words = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def __len__(self):
+        return len(self._words)
+
+    def lookup(self, words):
+        """Converted form of each of words the map holds"""
+        found = {}
+        with self._lock:
+            for word in words:
+                if word in self._words:
+                    self._words.move_to_end(word)
+                    found[word] = self._words[word]
+            self.hits += len(found)
+        return found
+
+    def update(self, converted_words):
+        """Add word -> converted word pairs, dropping the least recently used beyond the bound"""
+        with self._lock:
+            for word, converted in converted_words.items():
+                self._words[word] = converted
+                self._words.move_to_end(word)
+            while len(self._words) > self.max_words:
+                self._words.popitem(last=False)
+
+class WordDedupPlan:
+    """Tokenize a document, pack its distinct words into payloads and rebuild the result.
+
+    With a word_map only the words it does not hold yet are sent; the new conversions
+    are added to it unless the block came back as a Fallback.
+    """
+
+    def __init__(self, text, size, delimiter=DEFAULT_DELIMITER, word_map=None):
+        self.delimiter = delimiter
+        self.size = size
+        self.word_map = word_map
+        # Even positions are separators, odd positions are words
+        self.tokens = self.tokenize(text)
+        self.words_in_text = self.tokens[1::2]
+        distinct = dict.fromkeys(self.words_in_text)
+        # A snapshot: words evicted while the block converts are still needed to rebuild it
+        self.known = word_map.lookup(distinct) if word_map is not None else {}
+        self.distinct = [word for word in distinct if word not in self.known]
+        self.payloads = self._pack(size)
+
+    def tokenize(self, text):
+        """Split text into alternating separators and words"""
+        return WORD_RE.split(text)
+
+    def _pack(self, size):
+        payloads = []
+        current = []
+        length = 0
+        for word in self.distinct:
+            extra = len(word) + (len(self.delimiter) if current else 0)
+            if current and length + extra > size:
+                payloads.append(self.delimiter.join(current))
+                current = []
+                extra = len(word)
+                length = 0
+            current.append(word)
+            length += extra
+        if current:
+            payloads.append(self.delimiter.join(current))
+        return payloads
+
+    def convert_payload(self, payload, convert_fn):
+        """Convert a payload, splitting it in half whenever the word count is not preserved"""
+        words = payload.split(self.delimiter)
+        converted = convert_fn(payload)
+        parts = converted.split(self.delimiter)
+        if len(parts) == len(words) + 1 and parts[-1] == '':
+            parts = parts[:-1]
+        if len(parts) == len(words):
+            return self.delimiter.join(parts)
+        if len(words) == 1:
+            return converted.replace(self.delimiter, '')
+        mid = len(words) // 2
+        return self.delimiter.join([
+            self.convert_payload(self.delimiter.join(words[:mid]), convert_fn),
+            self.convert_payload(self.delimiter.join(words[mid:]), convert_fn)
+        ])
+
+    def converted_words(self, converted_payloads):
+        """Word -> converted word for the words sent in the payloads"""
+        mapping = {}
+        for payload, converted in zip(self.payloads, converted_payloads):
+            mapping.update(zip(payload.split(self.delimiter), converted.split(self.delimiter)))
+        return mapping
+
+    def rebuild(self, converted_payloads):
+        """Rebuild the converted document from the converted payloads"""
+        mapping = dict(self.known)
+        mapping.update(self.converted_words(converted_payloads))
+        return "".join(mapping.get(t, t) if i % 2 else t for i, t in enumerate(self.tokens))
+
+    def convert(self, convert_fn):
+        """Convert the document; it is a Fallback if any payload came back as one"""
+        fallback = False
+        def send(payload):
+            nonlocal fallback
+            converted = convert_fn(payload)
+            fallback = fallback or isinstance(converted, Fallback)
+            return converted
+        converted_payloads = [self.convert_payload(payload, send) for payload in self.payloads]
+        if fallback:
+            return Fallback(self.rebuild(converted_payloads))
+        if self.word_map is not None:
+            self.word_map.update(self.converted_words(converted_payloads))
+        return self.rebuild(converted_payloads)
+
+    def stats(self):
+        """Get word and payload counts"""
+        return {
+            "words": len(self.words_in_text),
+            "distinct_words": len(self.distinct),
+            "payloads": len(self.payloads)
+        }
+
+def dedup_convert(text, convert_fn, size, delimiter=DEFAULT_DELIMITER, word_map=None):
+    """Convert a block of text, sending each of its distinct words upstream once.
+
+    Pass the same word_map for every block of a document so that words already
+    converted in an earlier block are not sent again.
+    """
+    return WordDedupPlan(text, size, delimiter, word_map).convert(convert_fn)
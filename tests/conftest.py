@@ -0,0 +1,31 @@
+import sys
+from pathlib import Path
+import pytest
+
+# The modules live flat in src/ and import each other by name
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent / 'src'))
+
+@pytest.fixture
+def mock_profile():
+    """Fault profile of the mock_api fixture; override to make the mock misbehave"""
+    from mock_upstream import FaultProfile
+    return FaultProfile()
+
+@pytest.fixture
+def mock_api(mock_profile):
+    """Every font's endpoint on a local echoing mock, without rate limiting"""
+    from font_mapping import GUJARATI_FONTS, use_api_base
+    from mock_upstream import MockUpstream, start_mock
+    from rate_limiter import DEFAULT_MAX_DELAY, DEFAULT_MIN_DELAY, configure_rate_limits
+    urls = {key: font['url'] for key, font in GUJARATI_FONTS.items()}
+    upstream = MockUpstream(mock_profile, seed=0)
+    server, base_url = start_mock(upstream)
+    upstream.base_url = base_url
+    use_api_base(base_url)
+    configure_rate_limits(0, 0.1)
+    yield upstream
+    configure_rate_limits(DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY)
+    for key, url in urls.items():
+        GUJARATI_FONTS[key]['url'] = url
+    server.shutdown()
+    server.server_close()
@@ -0,0 +1,58 @@
+import json
+import pytest
+from backends import BackendMiss, ConversionBackend, backend_route, build_router
+from chunk_cache import ChunkCache
+from conversion_server import ConversionService
+from font_mapping import get_font_info
+from offline_converter import OfflineTableError, get_offline_converter
+
+TEXT = 'ગુજરાતી ભાષા સુંદર છે.'
+
+def test_backends_must_implement_convert():
+    class Incomplete(ConversionBackend):
+        name = 'incomplete'
+
+    with pytest.raises(TypeError):
+        Incomplete()
+
+def test_backend_routes():
+    assert backend_route('remote') == ('remote',)
+    assert backend_route('remote', server='http://127.0.0.1:8765') == ('server',)
+    assert backend_route('offline', server='http://127.0.0.1:8765') == ('offline',)
+    assert backend_route('auto', route=('cache', 'remote')) == ('cache', 'remote')
+    with pytest.raises(ValueError):
+        backend_route('fastest')
+
+def test_offline_route_reports_what_the_table_lacks():
+    router = build_router(backend_route('offline'))
+    assert router.convert(TEXT, 'shree0768') == get_offline_converter('shree0768').convert(TEXT)
+    with pytest.raises(OfflineTableError):
+        router.convert(TEXT + ' ઌ', 'shree0768')
+    with pytest.raises(OfflineTableError):
+        router.convert(TEXT, 'krishna')
+
+def test_table_misses_when_other_backends_follow():
+    table = build_router(('offline', 'remote')).backends[0]
+    with pytest.raises(BackendMiss):
+        table.convert('ઌ', 'shree0768')
+    assert not table.available('krishna')
+
+def test_remote_route_uses_endpoint_client(tmp_path, mock_api):
+    cache = ChunkCache(tmp_path / 'cache.db')
+    record_file = tmp_path / 'pairs.jsonl'
+    api_url = get_font_info('krishna')['url']
+    router = build_router(backend_route('remote'), cache, record_file=str(record_file))
+    # The mock echoes its input
+    assert router.convert(TEXT, 'krishna') == TEXT
+    assert cache.get(api_url, TEXT) == TEXT
+    assert json.loads(record_file.read_text(encoding='utf-8'))['source'] == TEXT
+    assert mock_api.stats()['requests'] == 1
+    cache.close()
+
+def test_service_converts_every_mode(tmp_path, mock_api):
+    service = ConversionService(ChunkCache(tmp_path / 'cache.db'))
+    assert service.convert(TEXT, 'krishna') == TEXT
+    assert service.convert(TEXT, 'shree0768', 'offline') == get_offline_converter('shree0768').convert(TEXT)
+    assert service.convert(TEXT, 'shree0768', 'auto') == get_offline_converter('shree0768').convert(TEXT)
+    assert 'shree0768' in service.stats()['backends']
+    service.cache.close()
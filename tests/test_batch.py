@@ -0,0 +1,43 @@
+import multiprocessing
+import pytest
+import multi_font_converter
+from circuit_breaker import DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT, circuit_breaker_settings, configure_circuit_breakers
+from font_mapping import GUJARATI_FONTS, get_font_info, registry, resolve_font
+from rate_limiter import DEFAULT_MAX_DELAY, DEFAULT_MIN_DELAY, configure_rate_limits, rate_limit_settings
+
+@pytest.fixture
+def custom_font():
+    registry.add('batchtest', name='Batch Test', url=get_font_info('shree0768')['url'],
+                 font_family='BatchTest', aliases=['bt'], max_payload=123)
+    yield 'batchtest'
+    registry._unindex('batchtest')
+    del GUJARATI_FONTS['batchtest']
+
+def worker_state():
+    return (resolve_font('bt'), GUJARATI_FONTS.get('batchtest', {}).get('max_payload'),
+            rate_limit_settings(), circuit_breaker_settings())
+
+def test_spawned_workers_get_fonts_and_settings(custom_font):
+    configure_rate_limits(0.5, 3.0)
+    configure_circuit_breakers(7, 12.0)
+    try:
+        pool = multi_font_converter.batch_process_pool(1, mp_context=multiprocessing.get_context('spawn'))
+        with pool:
+            state = pool.submit(worker_state).result(timeout=60)
+    finally:
+        configure_rate_limits(DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY)
+        configure_circuit_breakers(DEFAULT_FAILURE_THRESHOLD, DEFAULT_RESET_TIMEOUT)
+    assert state == ('batchtest', 123, (0.5, 3.0), (7, 12.0))
+
+def test_offline_batch(tmp_path):
+    input_dir = tmp_path / 'in'
+    input_dir.mkdir()
+    for name in ('a.txt', 'b.txt'):
+        (input_dir / name).write_text('ક્ષમા ધર્મ\n', encoding='utf-8')
+    assert multi_font_converter.convert_batch(str(input_dir), ['shree0768'], workers=2, backend='offline',
+                                              incremental=False)
+    output_dir = tmp_path / 'in_converted'
+    assert (output_dir / 'a.txt').read_text(encoding='utf-8') == 'ûkBkk ÄkBko\n'
+    # Files already done with the same settings are skipped
+    assert multi_font_converter.convert_batch(str(input_dir), ['shree0768'], workers=2, backend='offline',
+                                              incremental=False)
@@ -0,0 +1,95 @@
+import sqlite3
+from types import SimpleNamespace
+import pytest
+import chunk_cache
+from chunk_cache import ChunkCache, Fallback, cache_key
+from async_engine import TransientConversionError
+from endpoint_client import convert_chunk_with_session
+from rate_limiter import DEFAULT_MAX_DELAY, DEFAULT_MIN_DELAY, configure_rate_limits
+
+API = 'http://cache.test/GetShree0768Text'
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = ChunkCache(tmp_path / 'cache.db')
+    yield cache
+    cache.close()
+
+def stored_access(path, key):
+    conn = sqlite3.connect(str(path))
+    try:
+        return conn.execute("SELECT last_access FROM chunks WHERE key = ?", (key,)).fetchone()[0]
+    finally:
+        conn.close()
+
+def test_round_trip_and_normalization(cache):
+    assert cache.get(API, 'કા') is None
+    cache.put(API, 'કા', 'fk')
+    assert cache.get(API, 'કા') == 'fk'
+    # Decomposed spellings share the entry of their NFC form
+    assert cache.get(API, 'કા') == 'fk'
+    assert cache.get('http://cache.test/Other', 'કા') is None
+    assert cache.stats()['hits'] == 2
+
+def test_hits_are_written_in_batches(cache, monkeypatch):
+    monkeypatch.setattr(chunk_cache, 'TOUCH_BATCH', 3)
+    cache.put(API, 'ક', 'f')
+    key = cache_key(API, 'ક')
+    written = stored_access(cache.path, key)
+    cache.get(API, 'ક')
+    cache.get(API, 'ક')
+    assert stored_access(cache.path, key) == written
+    for text in ('ખ', 'ગ'):
+        cache.put(API, text, 'x')
+        cache.get(API, text)
+    assert stored_access(cache.path, key) > written
+
+def test_eviction_sees_pending_hits(tmp_path):
+    cache = ChunkCache(tmp_path / 'cache.db', max_entries=2)
+    cache.put(API, 'a', '1')
+    cache.put(API, 'b', '2')
+    cache.get(API, 'a')
+    cache.put(API, 'c', '3')
+    assert cache.get(API, 'a') == '1'
+    assert cache.get(API, 'b') is None
+    cache.close()
+
+class FakeSession:
+    def __init__(self, body, status_code=200):
+        self.body = body
+        self.status_code = status_code
+
+    def post(self, url, data=None, headers=None, timeout=None):
+        return SimpleNamespace(status_code=self.status_code, content=self.body, headers={},
+                               text=self.body.decode('utf-8', 'replace'), encoding=None)
+
+@pytest.fixture
+def unthrottled():
+    configure_rate_limits(0, DEFAULT_MAX_DELAY)
+    yield
+    configure_rate_limits(DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY)
+
+@pytest.mark.parametrize('body', ['fk'.encode('utf-16-le'), 'ગુજરાતી'.encode('utf-16-le')])
+def test_garbled_responses_are_not_cached(cache, unthrottled, body):
+    api_url = 'http://garbled.test/GetShree0768Text'
+    assert isinstance(convert_chunk_with_session(FakeSession(body), 'કા', api_url, cache=cache), Fallback)
+    assert cache.get(api_url, 'કા') is None
+    convert_chunk_with_session(FakeSession('fk'.encode('utf-8')), 'કા', api_url, cache=cache)
+    assert cache.get(api_url, 'કા') == 'fk'
+
+def test_empty_responses_fall_back_uncached(cache, unthrottled):
+    api_url = 'http://empty.test/GetShree0768Text'
+    converted = convert_chunk_with_session(FakeSession(b''), 'કા', api_url, cache=cache)
+    assert converted == 'કા' and isinstance(converted, Fallback)
+    assert cache.get(api_url, 'કા') is None
+
+def test_only_passing_failures_are_transient():
+    configure_rate_limits(0, 0.01)
+    try:
+        with pytest.raises(TransientConversionError):
+            convert_chunk_with_session(FakeSession(b'busy', 503), 'કા', 'http://busy.test/GetShree0768Text')
+        with pytest.raises(RuntimeError) as raised:
+            convert_chunk_with_session(FakeSession(b'gone', 404), 'કા', 'http://gone.test/GetShree0768Text')
+        assert not isinstance(raised.value, TransientConversionError)
+    finally:
+        configure_rate_limits(DEFAULT_MIN_DELAY, DEFAULT_MAX_DELAY)
@@ -0,0 +1,80 @@
+import pytest
+import circuit_breaker
+from async_engine import TransientConversionError, run_conversion
+from circuit_breaker import CLOSED, HALF_OPEN, MAX_RESET_TIMEOUT, OPEN, CircuitBreaker, CircuitOpenError, with_outage_fallback
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(circuit_breaker.time, 'monotonic', clock)
+    return clock
+
+def test_opens_after_consecutive_failures(clock):
+    breaker = CircuitBreaker('GetTest', failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.allow()
+        breaker.on_failure()
+    breaker.allow()
+    breaker.on_success()
+    assert breaker.failures == 0
+    for _ in range(3):
+        breaker.allow()
+        breaker.on_failure()
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError) as raised:
+        breaker.allow()
+    assert raised.value.retry_in == pytest.approx(30)
+
+def test_half_open_lets_one_probe_through(clock):
+    breaker = CircuitBreaker('GetTest', failure_threshold=1, reset_timeout=30)
+    breaker.on_failure()
+    clock.now += 31
+    breaker.allow()
+    assert breaker.state == HALF_OPEN
+    with pytest.raises(CircuitOpenError):
+        breaker.allow()
+    breaker.on_success()
+    assert breaker.state == CLOSED
+    breaker.allow()
+
+def test_failed_probe_doubles_the_open_time(clock):
+    breaker = CircuitBreaker('GetTest', failure_threshold=1, reset_timeout=30)
+    breaker.on_failure()
+    for expected in (60, 120, 240, MAX_RESET_TIMEOUT, MAX_RESET_TIMEOUT):
+        clock.now += breaker.timeout + 1
+        breaker.allow()
+        breaker.on_failure()
+        assert breaker.state == OPEN
+        assert breaker.timeout == expected
+    clock.now += breaker.timeout + 1
+    breaker.allow()
+    breaker.on_success()
+    assert breaker.timeout == 30
+
+def test_outage_fallbacks():
+    def down(chunk):
+        raise CircuitOpenError('GetShree0768Text', 5)
+    with pytest.raises(CircuitOpenError):
+        with_outage_fallback(down, 'defer', 'shree0768')('ક')
+    with pytest.raises(TransientConversionError) as raised:
+        with_outage_fallback(down, 'cache', 'shree0768')('ક')
+    assert not isinstance(raised.value, CircuitOpenError)
+    assert with_outage_fallback(down, 'offline', 'shree0768')('કિ') == 'rf'
+
+def test_deferred_chunks_are_retried_in_order():
+    calls = {}
+
+    def flaky(chunk):
+        calls[chunk] = calls.get(chunk, 0) + 1
+        if chunk == 'b' and calls[chunk] == 1:
+            raise CircuitOpenError('GetTest', 0.01)
+        return chunk.upper()
+    assert run_conversion(['a', 'b', 'c'], flaky, 2) == ['A', 'B', 'C']
+    assert calls['b'] == 2
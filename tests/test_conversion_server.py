@@ -0,0 +1,38 @@
+import threading
+import pytest
+from conversion_server import ConversionService
+from mock_upstream import FaultProfile
+
+TEXT = 'ગુજરાતી ભાષા સુંદર છે.'
+
+@pytest.fixture
+def mock_profile():
+    # Slow enough for both callers to be in flight at once
+    return FaultProfile(latency='fixed:300')
+
+def convert_together(convert, callers=2):
+    barrier = threading.Barrier(callers)
+    results = []
+
+    def call():
+        barrier.wait()
+        results.append(convert())
+    threads = [threading.Thread(target=call) for _ in range(callers)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+def test_identical_chunks_are_requested_once(mock_api):
+    service = ConversionService()
+    # The mock echoes its input
+    assert convert_together(lambda: service.convert(TEXT, 'krishna')) == [TEXT, TEXT]
+    assert mock_api.stats()['requests'] == 1
+    assert service.coalescer.merged == 1
+
+def test_backend_modes_are_not_merged(mock_api):
+    service = ConversionService()
+    backends = iter(['remote', 'auto'])
+    convert_together(lambda: service.convert(TEXT, 'krishna', next(backends)))
+    assert service.coalescer.merged == 0
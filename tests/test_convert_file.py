@@ -0,0 +1,98 @@
+import os
+import sys
+import pytest
+from chunk_store import ChunkStore
+from gui_checkpoint import ConversionStopped
+from mock_upstream import FaultProfile
+from multi_font_converter import convert_file, convert_file_multi
+
+TEXT = 'ગુજરાતી ભાષા, English text 123.\nબીજી લીટી અહીં છે.\n' * 40
+
+def write_input(tmp_path, text=TEXT):
+    path = tmp_path / 'input.txt'
+    path.write_text(text, encoding='utf-8')
+    return str(path)
+
+def test_convert_file_through_endpoint(tmp_path, mock_api):
+    output = tmp_path / 'out.txt'
+    assert convert_file(write_input(tmp_path), str(output), 'shree0768', concurrency=4,
+                        incremental=False, resume=False)
+    # The mock echoes its input
+    assert output.read_text(encoding='utf-8') == TEXT
+    assert mock_api.stats()['ok'] > 0
+
+@pytest.mark.skipif(not sys.platform.startswith('linux'), reason='reads /proc/self/fd')
+def test_output_is_fsynced_before_journal_records(tmp_path, mock_api, monkeypatch):
+    synced = []
+    real_fsync = os.fsync
+
+    def fsync(fd):
+        # Which file was synced, in order
+        synced.append(os.path.basename(os.readlink(f'/proc/self/fd/{fd}')))
+        real_fsync(fd)
+    monkeypatch.setattr(os, 'fsync', fsync)
+    output = tmp_path / 'out.txt'
+    convert_file(write_input(tmp_path), str(output), 'shree0768', incremental=False, resume=False)
+    journal = 'out.txt.journal.jsonl'
+    assert journal in synced
+    # Every journal sync after the header is preceded by an output sync
+    for index, name in enumerate(synced):
+        if name == journal and index > synced.index(journal):
+            assert synced[index - 1] == 'out.txt'
+
+def stored_chunks(output):
+    store = ChunkStore.for_output(output)
+    try:
+        return store.stats()['entries']
+    finally:
+        store.close()
+
+@pytest.mark.parametrize('options', [{}, {'passthrough': False}, {'dedup_words': True}])
+def test_fallbacks_are_not_stored(tmp_path, mock_api, options):
+    input_file, output = write_input(tmp_path), str(tmp_path / 'out.txt')
+    # Empty answers fall back to the original text
+    mock_api.profile = FaultProfile(empty=1.0)
+    assert convert_file(input_file, output, 'shree0768', resume=False, **options)
+    assert stored_chunks(output) == 0
+    mock_api.profile = FaultProfile()
+    requests = mock_api.stats()['requests']
+    assert convert_file(input_file, output, 'shree0768', resume=False, **options)
+    # The healthy endpoint is asked again, and its answers are kept
+    assert mock_api.stats()['requests'] > requests
+    assert stored_chunks(output) > 0
+
+def test_resumed_run_keeps_skipped_chunks(tmp_path, mock_api):
+    input_file, output = write_input(tmp_path, TEXT * 5), str(tmp_path / 'out.txt')
+    written = []
+
+    def stop_after_20(font_key, converted, input_bytes):
+        written.append(converted)
+        if len(written) == 20:
+            raise ConversionStopped()
+    # Stopping reports the failure and keeps the progress for a resume
+    assert not convert_file(input_file, output, 'shree0768', resume=False, on_chunk=stop_after_20)
+    assert convert_file(input_file, output, 'shree0768', resume=True)
+    # The chunks skipped on resume survive the prune, so an unchanged re-run sends nothing
+    requests = mock_api.stats()['requests']
+    assert convert_file(input_file, output, 'shree0768', resume=False)
+    assert mock_api.stats()['requests'] == requests
+
+def test_prune_drops_chunks_of_older_revisions(tmp_path):
+    store = ChunkStore(tmp_path / 'out.txt.chunks.db')
+    store.put('url', 'old', 'OLD')
+    store.put('url', 'kept', 'KEPT')
+    store.close()
+    store = ChunkStore(tmp_path / 'out.txt.chunks.db')
+    assert store.get('url', 'kept') == 'KEPT'
+    store.put('url', 'new', 'NEW')
+    assert store.prune() == 1
+    assert store.get('url', 'old') is None
+    assert store.stats()['entries'] == 2
+    store.close()
+
+def test_auto_reports_backends_of_every_endpoint(tmp_path, mock_api, capsys):
+    outputs = {'shree0768': str(tmp_path / 'shree.txt'), 'krishna': str(tmp_path / 'krishna.txt')}
+    assert convert_file_multi(write_input(tmp_path), outputs, backend='auto', resume=False)
+    report = [line for line in capsys.readouterr().out.splitlines() if line.startswith('Backend ')]
+    for font_key in outputs:
+        assert any(f'({font_key}): ' in line for line in report)
@@ -0,0 +1,73 @@
+import threading
+import pytest
+from async_engine import ChunkConversionError, TransientConversionError
+from file_conversion import OutputPreview, can_resume, convert_file_with_preview
+from gui_checkpoint import ConversionStopped
+from offline_converter import OfflineTableError
+
+TEXT = 'ગુજરાતી ભાષા સુંદર છે. ' * 200
+
+class Updates:
+    def __init__(self):
+        self.text = ''
+        self.statuses = []
+
+    def append(self, text):
+        self.text += text
+
+    def progress(self, done, total):
+        pass
+
+    def status(self, message):
+        self.statuses.append(message)
+
+@pytest.fixture
+def input_file(tmp_path):
+    path = tmp_path / 'input.txt'
+    path.write_text(TEXT, encoding='utf-8')
+    return str(path)
+
+def test_converts_and_previews(tmp_path, input_file, mock_api):
+    output = tmp_path / 'out.txt'
+    updates = Updates()
+    error, preview = convert_file_with_preview(input_file, str(output), 'shree0768', updates,
+                                               incremental=False)
+    assert error is None
+    assert preview.total == len(TEXT)
+    assert output.read_text(encoding='utf-8') == TEXT
+    assert updates.text.startswith(TEXT[:100]) and updates.text.endswith(TEXT[-100:])
+
+def test_pause_is_returned_and_resumes(tmp_path, input_file, mock_api):
+    output = tmp_path / 'out.txt'
+    stop = threading.Event()
+    stop.set()
+    error, preview = convert_file_with_preview(input_file, str(output), 'shree0768', Updates(),
+                                               stop_event=stop, incremental=False)
+    assert isinstance(error, ConversionStopped)
+    assert can_resume(error)
+    assert 0 < preview.total < len(TEXT)
+    error, resumed = convert_file_with_preview(input_file, str(output), 'shree0768', Updates(),
+                                               incremental=False)
+    assert error is None
+    assert output.read_text(encoding='utf-8') == TEXT
+    # Chunks written before the pause are not converted again
+    assert resumed.total == len(TEXT) - preview.total
+
+def test_missing_offline_table_is_reported(tmp_path, input_file):
+    error, _ = convert_file_with_preview(input_file, str(tmp_path / 'out.txt'), 'krishna', Updates(),
+                                         backend='offline', incremental=False)
+    assert isinstance(error, OfflineTableError)
+    assert not can_resume(error)
+
+def test_can_resume():
+    assert can_resume(ChunkConversionError(3, TransientConversionError("Rate limited after 3 attempts")))
+    assert not can_resume(ChunkConversionError(3, RuntimeError("API error 404")))
+    assert not can_resume(ChunkConversionError(3, OfflineTableError("No glyph")))
+    assert not can_resume(ValueError("bad input"))
+
+def test_output_preview_keeps_head_and_tail():
+    preview = OutputPreview(limit=5)
+    shown = ''.join(preview.add(piece) for piece in ['abc', 'defg', 'hijklmnop'])
+    assert shown == 'abcde'
+    assert preview.ending().endswith('lmnop')
+    assert '[6 characters not shown]' in preview.ending()
@@ -0,0 +1,45 @@
+import json
+import font_mapping
+from font_mapping import GUJARATI_FONTS, FontRegistry, endpoint_name, plan_endpoints, registry
+
+def fresh_registry():
+    return FontRegistry({key: {field: font[field] for field in ('name', 'url', 'font_family')}
+                         for key, font in GUJARATI_FONTS.items()})
+
+def test_lookup_by_name_alias_and_endpoint():
+    assert registry.resolve('SHREE-GUJ-0768') == 'shree0768'
+    assert registry.resolve('no such font') is None
+    endpoint = registry.get('shree0768')['endpoint']
+    assert 'shree0768' in registry.by_endpoint(endpoint)
+    assert endpoint_name('https://example.com/gujarati/GetKrishnaText/') == 'GetKrishnaText'
+
+def test_user_files_are_loaded_only_when_asked(tmp_path, monkeypatch):
+    fonts_file = tmp_path / 'fonts.json'
+    fonts_file.write_text(json.dumps({'fonts': {
+        'shree0768': {'aliases': ['sg'], 'max_payload': 321},
+        'custom': {'name': 'Custom', 'url': 'https://example.com/GetCustomText', 'font_family': 'Custom'}}}))
+    monkeypatch.setenv('GUJARATI_FONTS_FILE', str(fonts_file))
+    monkeypatch.setenv('GUJARATI_PAYLOAD_LIMITS_FILE', str(tmp_path / 'missing.json'))
+    fonts = fresh_registry()
+    assert fonts.resolve('sg') is None
+    fonts.load_user_files()
+    assert fonts.resolve('sg') == 'shree0768'
+    assert fonts.max_payload('shree0768') == 321
+    assert fonts.by_endpoint('GetCustomText') == ['custom']
+
+def test_fonts_sharing_an_endpoint_are_planned_together():
+    endpoint_keys = next(keys for keys in registry.endpoints().values() if len(keys) > 1)
+    plan = plan_endpoints(endpoint_keys)
+    assert list(plan.values()) == [endpoint_keys]
+
+def test_offline_capability_is_read_from_disk(tmp_path, monkeypatch):
+    monkeypatch.setattr(font_mapping, 'OFFLINE_TABLE_DIR', tmp_path)
+    fonts = fresh_registry()
+    assert not fonts.has_offline('krishna')
+    assert fonts.capabilities('krishna')['offline'] is False
+    # A table built later is picked up without reloading the registry
+    (tmp_path / 'GetKrishnaText.json').write_text('{}')
+    assert fonts.has_offline('krishna')
+    assert fonts.capabilities('krishna')['offline'] is True
+    assert 'offline' not in fonts.get('krishna')
+    assert not fonts.has_offline('no such font')
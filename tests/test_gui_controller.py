@@ -0,0 +1,135 @@
+import pytest
+import gui_controller
+from chunk_cache import ChunkCache
+from font_mapping import get_font_info
+from gui_checkpoint import ConversionCheckpoint
+from gui_controller import ConversionController
+from offline_converter import get_offline_converter
+
+TEXT = 'ગુજરાતી ભાષા સુંદર છે. Hello 123. ' * 40
+
+class Var:
+    def __init__(self, value):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+class Root:
+    """Tk root stand-in: callbacks scheduled with after() are only recorded"""
+
+    def __init__(self):
+        self.scheduled = []
+
+    def after(self, ms, fn, *args):
+        self.scheduled.append((fn, args))
+
+    def protocol(self, name, fn):
+        pass
+
+class Updates:
+    def __init__(self):
+        self.text = ''
+        self.statuses = []
+        self.output_length = 0
+
+    def append(self, text):
+        self.text += text
+        self.output_length += len(text)
+
+    def progress(self, done, total):
+        pass
+
+    def status(self, message):
+        self.statuses.append(message)
+
+    def close(self):
+        pass
+
+class Controller(ConversionController):
+    def __init__(self, backend):
+        super().__init__(Root())
+        self.running = []
+        self.min_delay_var = Var('0')
+        self.max_delay_var = Var('0.1')
+        self.chunk_size_var = Var('200')
+        self.concurrency_var = Var('2')
+        self.backend_var = Var(backend)
+        self.outage_var = Var('Wait and Retry')
+
+    def show_running(self, running):
+        self.running.append(running)
+
+@pytest.fixture(autouse=True)
+def tmp_cache(tmp_path, monkeypatch):
+    monkeypatch.setattr(gui_controller, 'ChunkCache', lambda: ChunkCache(tmp_path / 'cache.db'))
+
+def test_offline_conversion():
+    controller = Controller('Offline Table')
+    updates = Updates()
+    controller.convert_text(TEXT, updates)
+    assert updates.text == get_offline_converter('shree0768').convert(TEXT)
+    assert updates.statuses[-1].startswith('✅ Conversion complete!')
+    assert (controller.show_running, (False,)) in controller.root.scheduled
+
+@pytest.mark.parametrize('backend', ['Online API', 'Fastest Available'])
+def test_remote_conversion(mock_api, backend):
+    controller = Controller(backend)
+    controller.current_font = 'krishna'
+    updates = Updates()
+    controller.convert_text(TEXT, updates)
+    # The mock echoes its input
+    assert updates.text == TEXT
+    assert updates.statuses[-1].startswith('✅ Conversion complete!')
+
+def test_pause_reports_progress(mock_api):
+    controller = Controller('Online API')
+    controller.stop_event.set()
+    updates = Updates()
+    controller.convert_text(TEXT, updates)
+    assert updates.statuses[-1].startswith('⏸️ Paused after')
+    assert not controller.conversion_running
+
+class PausingUpdates(Updates):
+    """Updates that press Pause once the first chunk is shown"""
+
+    def __init__(self, controller):
+        super().__init__()
+        self.controller = controller
+
+    def append(self, text):
+        super().append(text)
+        self.controller.stop_event.set()
+
+def test_paused_conversion_resumes_from_checkpoint(tmp_path, mock_api, monkeypatch):
+    # Distinct lines (numbered in Gujarati digits), so every payload is different
+    gujarati_digits = str.maketrans('0123456789', '૦૧૨૩૪૫૬૭૮૯')
+    text = ''.join(f'વાક્ય {i:03d} સુંદર છે. Line {i}.\n'.translate(gujarati_digits) for i in range(200))
+    controller = Controller('Online API')
+    controller.current_font = 'krishna'
+    sent = []
+    router = controller.routers[controller.get_backend()]
+    convert = router.convert
+    monkeypatch.setattr(router, 'convert', lambda chunk, font_key: sent.append(chunk) or convert(chunk, font_key))
+    checkpoint = lambda: ConversionCheckpoint(get_font_info('krishna')['url'], controller.get_chunk_size(), text,
+                                              tmp_path / 'progress')
+    paused = checkpoint()
+    paused.open(resume=False)
+    updates = PausingUpdates(controller)
+    controller.convert_text(text, updates, paused)
+    assert updates.statuses[-1].startswith('⏸️ Paused after')
+    sent_before_pause = len(sent)
+    resumed = checkpoint()
+    assert resumed.completed() > 0
+    resumed.open(resume=True)
+    controller.stop_event.clear()
+    updates = Updates()
+    controller.convert_text(text, updates, resumed)
+    # The mock echoes its input; payloads stored before the pause are not requested again
+    assert updates.text == text
+    assert 0 < sent_before_pause < len(sent)
+    assert len(sent) == len(set(sent))
+    assert not resumed.store_path.exists()
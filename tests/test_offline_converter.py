@@ -0,0 +1,44 @@
+import pytest
+from offline_converter import OfflineConverter, OfflineTableError, get_offline_converter, has_offline_table
+
+@pytest.fixture
+def shree():
+    return get_offline_converter('shree0768')
+
+def test_shree_table_is_shipped():
+    assert has_offline_table('shree0768')
+
+def test_conjunct(shree):
+    # ક્ષ has its own glyph instead of half ક + ષ
+    assert shree.convert('ક્ષમા') == 'ûk' + 'Bk' + 'k'
+
+def test_half_form(shree):
+    # સ loses its stem before another consonant
+    assert shree.convert('સ્ત') == 'M' + 'lk'
+
+def test_reph(shree):
+    # A leading ર્ is drawn after the cluster and its matras
+    assert shree.convert('ધર્મ') == 'Äk' + 'Bko'
+    assert shree.convert('ધર્મો') == 'Äk' + 'Bk' + 'ku' + 'o'
+
+def test_pre_base_matra(shree):
+    # િ goes before the whole consonant cluster
+    assert shree.convert('કિ') == 'rf'
+    assert shree.convert('સ્થિર') == 'r' + 'M' + 'Úk' + 'h'
+
+def test_rakar_and_virama(shree):
+    assert shree.convert('ગ્ર') == 'dk|'
+    assert shree.convert('ટ્') == 'xT'
+
+def test_non_gujarati_passes_through(shree):
+    assert shree.convert('ABC 123, ૧૨૩') == 'ABC 123, 123'
+
+def test_strict_rejects_unknown_characters():
+    converter = OfflineConverter({'name': 'tiny', 'glyphs': {'ક': 'f'}})
+    with pytest.raises(OfflineTableError):
+        converter.convert('કા')
+    assert converter.convert('કા', strict=False) == 'fા'
+
+def test_syllables_win_over_components():
+    converter = OfflineConverter({'syllables': {'કિ': 'K'}, 'glyphs': {'ક': 'f', 'િ': 'r'}})
+    assert converter.convert('કિકિ') == 'KK'
@@ -0,0 +1,40 @@
+import sys
+import pytest
+import payload_calibration
+from sample_text import sample_text
+from font_mapping import FontRegistry, GUJARATI_FONTS, get_font_info
+from mock_upstream import FaultProfile
+
+@pytest.fixture
+def mock_profile():
+    return FaultProfile(max_payload='300')
+
+def test_finds_the_mock_limit(mock_api):
+    endpoint = get_font_info('shree0768')['endpoint']
+    results = payload_calibration.calibrate({endpoint: get_font_info('shree0768')['url']},
+                                            sample_text(1000, seed=0), step=50)
+    assert 250 <= results[endpoint]['max_payload'] <= 300
+
+def test_upstream_results_need_an_explicit_limits_file(tmp_path, mock_api, monkeypatch, capsys):
+    limits = tmp_path / 'payload_limits.json'
+    monkeypatch.setenv('GUJARATI_PAYLOAD_LIMITS_FILE', str(limits))
+    args = ['payload_calibration.py', '--font', 'shree0768', '--ceiling', '600', '--step', '100',
+            '--min-delay', '0', '--no-cache', '--upstream', mock_api.base_url]
+    monkeypatch.setattr(sys, 'argv', args)
+    payload_calibration.main()
+    assert not limits.exists()
+    assert 'Not saved' in capsys.readouterr().out
+
+    custom = tmp_path / 'mock_limits.json'
+    monkeypatch.setattr(sys, 'argv', args + ['--limits-file', str(custom)])
+    payload_calibration.main()
+    assert payload_calibration.load_limits(custom)['GetShree0768Text']['max_payload'] <= 300
+
+def test_registry_applies_the_limits_file_from_the_environment(tmp_path, monkeypatch):
+    limits = tmp_path / 'limits.json'
+    payload_calibration.save_limits({'GetShree0768Text': {'max_payload': 450}}, limits)
+    monkeypatch.setenv('GUJARATI_PAYLOAD_LIMITS_FILE', str(limits))
+    registry = FontRegistry({key: {field: font[field] for field in ('name', 'url', 'font_family')}
+                             for key, font in GUJARATI_FONTS.items()})
+    registry.load_payload_limits()
+    assert registry.max_payload('shree0768') == 450
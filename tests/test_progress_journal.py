@@ -0,0 +1,73 @@
+import json
+from gui_checkpoint import ConversionStopped
+from multi_font_converter import convert_file
+from progress_journal import ProgressJournal
+
+TEXT = 'ગુજરાતી ભાષા, English text 123.\nબીજી લીટી અહીં છે.\n' * 200
+
+def test_torn_tail_is_trimmed(tmp_path):
+    journal = ProgressJournal(tmp_path / 'out.journal.jsonl')
+    journal.start(chunk_size=200)
+    for completed in range(1, 4):
+        journal.record_chunk(completed, completed * 10)
+    journal.close()
+    good_size = journal.path.stat().st_size
+    # A crash in the middle of writing the fourth record
+    with open(journal.path, 'a', encoding='utf-8') as f:
+        f.write('{"type": "chunk", "completed_chu')
+    header, state = journal.load()
+    assert header['chunk_size'] == 200
+    assert state['completed_chunks'] == 3
+    assert journal.path.stat().st_size == good_size
+    journal.reopen()
+    journal.record_chunk(4, 40)
+    journal.close()
+    assert journal.load()[1]['completed_chunks'] == 4
+
+def test_compaction_keeps_the_header_and_latest_state(tmp_path):
+    journal = ProgressJournal(tmp_path / 'out.journal.jsonl', compact_every=5)
+    journal.start(chunk_size=200)
+    for completed in range(1, 13):
+        journal.record_chunk(completed, completed * 10, digest=f'd{completed}')
+    journal.close()
+    lines = journal.path.read_text(encoding='utf-8').splitlines()
+    assert len(lines) < 12
+    assert json.loads(lines[0])['type'] == 'header'
+    header, state = ProgressJournal(journal.path).load()
+    assert header['chunk_size'] == 200
+    assert state == {'type': 'chunk', 'completed_chunks': 12, 'output_bytes': 120, 'digest': 'd12'}
+
+def stop_after(chunks):
+    written = []
+
+    def on_chunk(font_key, converted, input_bytes):
+        written.append(converted)
+        if len(written) == chunks:
+            raise ConversionStopped()
+    return on_chunk
+
+def test_resume_continues_unchanged_input(tmp_path, mock_api):
+    input_file, output = tmp_path / 'input.txt', tmp_path / 'out.txt'
+    input_file.write_text(TEXT, encoding='utf-8')
+    assert not convert_file(str(input_file), str(output), 'shree0768', incremental=False, resume=False,
+                            on_chunk=stop_after(5))
+    requests = mock_api.stats()['requests']
+    assert convert_file(str(input_file), str(output), 'shree0768', incremental=False, resume=True)
+    # The mock echoes its input
+    assert output.read_text(encoding='utf-8') == TEXT
+    fresh = mock_api.stats()['requests']
+    assert convert_file(str(input_file), str(output), 'shree0768', incremental=False, resume=False)
+    # Resuming skipped the chunks written before the stop
+    assert mock_api.stats()['requests'] - fresh > fresh - requests
+
+def test_resume_after_an_input_edit_starts_fresh(tmp_path, mock_api, capsys):
+    input_file, output = tmp_path / 'input.txt', tmp_path / 'out.txt'
+    input_file.write_text(TEXT, encoding='utf-8')
+    assert not convert_file(str(input_file), str(output), 'shree0768', incremental=False, resume=False,
+                            on_chunk=stop_after(5))
+    # An edit inside the already converted part changes the journalled digest
+    edited = TEXT.replace('English', 'Gujarati', 1)
+    input_file.write_text(edited, encoding='utf-8')
+    assert convert_file(str(input_file), str(output), 'shree0768', incremental=False, resume=True)
+    assert 'Input changed since the previous run' in capsys.readouterr().out
+    assert output.read_text(encoding='utf-8') == edited
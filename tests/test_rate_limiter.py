@@ -0,0 +1,50 @@
+import pytest
+from rate_limiter import AdaptiveRateLimiter, parse_retry_after, rate_from_delay
+
+def test_unlimited_until_throttled():
+    limiter = AdaptiveRateLimiter(max_rate=None, min_rate=rate_from_delay(5))
+    assert limiter.acquire() == 0
+    assert limiter.acquire() == 0
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(0.2)
+    # The retry waits for the throttled rate instead of going out at once
+    assert limiter.tokens <= 0
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(0.2)
+
+def test_unlimited_without_min_rate_still_backs_off():
+    limiter = AdaptiveRateLimiter(max_rate=None, min_rate=None)
+    limiter.on_throttle()
+    assert limiter.rate is not None and limiter.rate > 0
+    limiter.on_success()
+    assert limiter.rate == pytest.approx(rate_from_delay(5) + limiter.increase)
+
+def test_aimd_stays_between_limits():
+    limiter = AdaptiveRateLimiter(max_rate=1.0, min_rate=0.25)
+    limiter.on_throttle()
+    assert limiter.rate == pytest.approx(0.5)
+    for _ in range(5):
+        limiter.on_throttle()
+    assert limiter.rate == pytest.approx(0.25)
+    for _ in range(100):
+        limiter.on_success()
+    assert limiter.rate == pytest.approx(1.0)
+
+def test_set_limits_clamps_current_rate():
+    limiter = AdaptiveRateLimiter(max_rate=1.0, min_rate=0.5)
+    limiter.set_limits(0.8, 0.4)
+    assert limiter.rate == pytest.approx(0.8)
+    limiter.set_limits(None)
+    assert limiter.rate is None
+
+def test_retry_after_blocks():
+    limiter = AdaptiveRateLimiter(max_rate=100.0, min_rate=50.0)
+    limiter.on_throttle(retry_after=0.05)
+    assert limiter.acquire() >= 0.04
+
+def test_parse_retry_after():
+    assert parse_retry_after('3') == 3.0
+    assert parse_retry_after('-1') == 0.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+    assert parse_retry_after('soon') is None
@@ -0,0 +1,65 @@
+import io
+import random
+from chunk_cache import Fallback
+from script_runs import MAX_CHUNK_LENGTH, RUN_RE, convert_gujarati_runs, pack_gujarati_chunks
+from stream_io import iter_chunks
+from word_dedup import DEFAULT_DELIMITER
+
+MIXED = ['ગુજરાતી', 'ભાષા', 'સુંદર', 'છે', 'English', 'https://example.com', '2024', '😀', ' ', ' ', '\n', ', ']
+
+def random_text(rng, words):
+    return ''.join(rng.choice(MIXED) + rng.choice(['', ' ']) for _ in range(words))
+
+def payload_cost(chunk):
+    runs = RUN_RE.findall(chunk)
+    return sum(len(run) for run in runs) + len(DEFAULT_DELIMITER) * max(0, len(runs) - 1)
+
+def upper(payload):
+    # Stands in for an endpoint: marks every converted character and keeps delimiters
+    return ''.join(f'<{char}>' if char != DEFAULT_DELIMITER else char for char in payload)
+
+def test_only_gujarati_runs_are_sent():
+    sent = []
+    text = 'Visit https://example.com: ગુજરાતી ભાષા, 2024!\nબીજી લીટી 😀'
+
+    def convert(payload):
+        sent.append(payload)
+        return payload.upper()
+    assert convert_gujarati_runs(text, convert, 200) == text
+    assert sent == ['ગુજરાતી ભાષા\nબીજી લીટી']
+
+def test_runs_are_converted_in_place():
+    text = 'A ગુજ B ગુજ C'
+    assert convert_gujarati_runs(text, upper, 200) == 'A <ગ><ુ><જ> B <ગ><ુ><જ> C'
+
+def test_a_fallback_run_marks_the_block():
+    text = 'A ગુજ B\nભાષા C'
+    assert not isinstance(convert_gujarati_runs(text, upper, 200), Fallback)
+    converted = convert_gujarati_runs(text, Fallback, 200)
+    assert converted == text and isinstance(converted, Fallback)
+
+def test_chunks_fit_one_payload():
+    rng = random.Random(3)
+    for _ in range(200):
+        text = random_text(rng, rng.randint(0, 400))
+        size = rng.choice([10, 30, 200])
+        chunks = pack_gujarati_chunks(text, size)
+        assert ''.join(chunks) == text
+        for chunk in chunks:
+            assert payload_cost(chunk) <= size or len(RUN_RE.findall(chunk)) == 1
+
+def test_local_text_is_bounded():
+    text = 'x' * (3 * MAX_CHUNK_LENGTH + 5)
+    chunks = pack_gujarati_chunks(text, 200)
+    assert ''.join(chunks) == text
+    assert max(len(chunk) for chunk in chunks) <= MAX_CHUNK_LENGTH
+
+def test_streamed_chunks_fit_one_payload():
+    rng = random.Random(4)
+    for _ in range(100):
+        text = random_text(rng, rng.randint(0, 600))
+        chunks = list(iter_chunks(io.StringIO(text), 50, read_size=rng.choice([100, 1000]),
+                                  chunker=pack_gujarati_chunks))
+        assert ''.join(chunks) == text
+        for chunk in chunks:
+            assert payload_cost(chunk) <= 50 or len(RUN_RE.findall(chunk)) == 1
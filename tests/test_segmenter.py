@@ -0,0 +1,73 @@
+import io
+import random
+import pytest
+from segmenter import CHUNKERS, content_defined_chunks, pack_chunks, split_aksharas
+from stream_io import iter_chunks
+
+ALPHABET = list('કખગઘચજટડતદનપબમયરલવશસહઅઆઇાિીુૂેૈોૌંઃ્') + [' ', ' ', '\n', '.', '।', 'a', '1', ',']
+
+def random_text(rng, length):
+    return ''.join(rng.choice(ALPHABET) for _ in range(length))
+
+def akshara_boundaries(text):
+    boundaries, pos = {0}, 0
+    for akshara in split_aksharas(text):
+        pos += len(akshara)
+        boundaries.add(pos)
+    return boundaries
+
+def check_chunks(text, chunks, size):
+    assert ''.join(chunks) == text
+    assert all(chunks)
+    boundaries = akshara_boundaries(text)
+    pos = 0
+    for chunk in chunks:
+        assert len(chunk) <= size
+        pos += len(chunk)
+        assert pos in boundaries
+
+def test_aksharas_keep_conjuncts_and_matras():
+    assert split_aksharas('ક્ષમા') == ['ક્ષ', 'મા']
+    assert split_aksharas('સ્ત્રીઓ') == ['સ્ત્રી', 'ઓ']
+    assert split_aksharas('ધર્મ ') == ['ધ', 'ર્મ', ' ']
+    assert split_aksharas('કં.') == ['કં', '.']
+
+@pytest.mark.parametrize('chunking', sorted(CHUNKERS))
+def test_chunkers_respect_size_and_aksharas(chunking):
+    rng = random.Random(chunking)
+    for _ in range(200):
+        text = random_text(rng, rng.randint(0, 2000))
+        size = rng.choice([20, 50, 200])
+        check_chunks(text, CHUNKERS[chunking](text, size), size)
+
+@pytest.mark.parametrize('chunking', sorted(CHUNKERS))
+def test_streamed_chunks_keep_the_guarantees(chunking):
+    rng = random.Random(f"stream-{chunking}")
+    for _ in range(50):
+        text = random_text(rng, rng.randint(0, 5000))
+        size = rng.choice([20, 50, 200])
+        chunks = list(iter_chunks(io.StringIO(text), size, read_size=rng.choice([64, 1000]),
+                                  chunker=CHUNKERS[chunking]))
+        check_chunks(text, chunks, size)
+
+def test_pack_chunks_streams_identically():
+    rng = random.Random(5)
+    for _ in range(50):
+        text = random_text(rng, rng.randint(0, 5000))
+        streamed = list(iter_chunks(io.StringIO(text), 50, read_size=333, chunker=pack_chunks))
+        assert streamed == pack_chunks(text, 50)
+
+def test_pack_chunks_prefers_sentence_ends():
+    text = 'અ' * 90 + '। ' + 'આ' * 50
+    assert pack_chunks(text, 100)[0] == 'અ' * 90 + '।'
+
+def test_content_defined_chunks_resynchronise_after_an_edit():
+    rng = random.Random(7)
+    text = random_text(rng, 20000)
+    edited = text[:100] + 'નવું લખાણ ' + text[100:]
+    before = content_defined_chunks(text, 200)
+    after = content_defined_chunks(edited, 200)
+    # Only the chunks around the edit change; fixed-size chunks would all shift
+    assert len(before) > 100
+    assert len(set(before) - set(after)) <= 10
+    assert before[-50:] == after[-50:]
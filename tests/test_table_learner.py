@@ -0,0 +1,21 @@
+from offline_converter import get_offline_converter
+from table_learner import align_words, build_table
+
+def test_whole_word_payloads_keep_their_edge_words():
+    # Gujarati runs and deduplicated words are sent one per line
+    assert align_words('કમલ\nનયન', 'a\nb') == [('કમલ', 'a'), ('નયન', 'b')]
+    assert align_words('કમલ', 'a') == [('કમલ', 'a')]
+    assert align_words('કમલ નયન', 'a') == []
+
+def test_edge_words_cut_inside_an_akshara_are_dropped():
+    assert align_words('ાલ કમલ નયન ક્', 'a b c d') == [('કમલ', 'b'), ('નયન', 'c')]
+
+def test_build_table_from_synthetic_pairs():
+    converter = get_offline_converter('shree0768')
+    words = ['ક', 'કા', 'કિ', 'મ', 'મા', 'કમ', 'ગ', 'ગા', 'ગમ', 'માગ']
+    payloads = ['\n'.join(words[i:i + 3]) for i in range(0, len(words), 3)]
+    table = build_table('GetTestText', [(payload, converter.convert(payload)) for payload in payloads])
+    assert table['stats']['words'] == len(words)
+    assert table['stats']['word_accuracy'] == 1.0
+    for akshara in ('ક', 'કા', 'કિ', 'મ', 'ગા'):
+        assert table['syllables'][akshara] == converter.convert(akshara)
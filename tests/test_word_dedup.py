@@ -0,0 +1,56 @@
+from chunk_cache import Fallback
+from word_dedup import WordDedupPlan, WordMap, dedup_convert
+
+def reverse(payload):
+    return '\n'.join(word[::-1] for word in payload.split('\n'))
+
+def test_round_trip_sends_each_word_once():
+    sent = []
+    text = 'ગુજરાતી ભાષા, ગુજરાતી લોકો. ભાષા!'
+
+    def convert(payload):
+        sent.append(payload)
+        return reverse(payload)
+    result = dedup_convert(text, convert, 200)
+    gujarati, bhasha, loko = 'ગુજરાતી'[::-1], 'ભાષા'[::-1], 'લોકો'[::-1]
+    assert result == f'{gujarati} {bhasha}, {gujarati} {loko}. {bhasha}!'
+    assert sent == ['ગુજરાતી\nભાષા\nલોકો']
+
+def test_payloads_respect_size():
+    plan = WordDedupPlan(' '.join(f'શબ્દ{chr(0x0AE6 + i)}' for i in range(10)), 12)
+    assert all(len(payload) <= 12 for payload in plan.payloads)
+    assert plan.stats() == {"words": 10, "distinct_words": 10, "payloads": len(plan.payloads)}
+
+def test_payloads_are_split_when_the_word_count_changes():
+    calls = []
+
+    def merging(payload):
+        calls.append(payload)
+        # An endpoint that swallows delimiters of payloads with more than one word
+        return payload.replace('\n', '') if '\n' in payload else payload.upper()
+    assert dedup_convert('ક ખ ગ', merging, 200) == 'ક ખ ગ'
+    assert calls[0] == 'ક\nખ\nગ'
+    assert {'ક', 'ખ', 'ગ'} <= set(calls)
+
+def test_word_map_is_shared_across_blocks():
+    sent = []
+
+    def convert(payload):
+        sent.append(payload)
+        return reverse(payload)
+    word_map = WordMap(max_words=3)
+    assert dedup_convert('ગુજરાતી ભાષા', convert, 200, word_map=word_map) == 'ીતારજુગ ાષાભ'
+    assert dedup_convert('ભાષા લોકો ગુજરાતી', convert, 200, word_map=word_map) == 'ાષાભ ોકોલ ીતારજુગ'
+    # The second block only sends the word the first one did not have
+    assert sent == ['ગુજરાતી\nભાષા', 'લોકો']
+    assert word_map.hits == 2
+    dedup_convert('નવો', convert, 200, word_map=word_map)
+    # The least recently used word is dropped beyond the bound
+    assert len(word_map) == 3
+    assert word_map.lookup(['ભાષા']) == {}
+
+def test_fallback_words_stay_out_of_the_word_map():
+    word_map = WordMap()
+    result = dedup_convert('ગુજરાતી', lambda payload: Fallback(payload), 200, word_map=word_map)
+    assert isinstance(result, Fallback)
+    assert len(word_map) == 0